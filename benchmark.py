@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Throughput benchmarks for generatekey.py
+# Kullanim: python benchmark.py [isim ...]   (isim verilmezse hepsi calisir)
+
+import itertools
+import json
+import os
+import sys
+import time
+
+import generatekey as gk
+
+
+def _timed(fn, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def _report(name, seconds, items):
+    rate = items / seconds if seconds > 0 else 0.0
+    print(f"{name:<32} {items:>12,} items  {seconds:8.3f} s  {rate:>14,.0f} /s")
+
+
+# ------------------- Sequence engine -------------------
+def _recursive_sequences(tokens, min_len, max_len, emit):
+    # Old generate_wordlist_ui dfs, kept here only as the baseline
+    def dfs(curr):
+        cur_len = len(curr)
+        if min_len <= cur_len <= max_len and curr:
+            emit(curr)
+        if cur_len >= max_len:
+            return
+        for t in tokens:
+            if cur_len + len(t) > max_len:
+                continue
+            dfs(curr + t)
+
+    dfs("")
+
+
+def _consume(iterable):
+    n = 0
+    for _ in iterable:
+        n += 1
+    return n
+
+
+def bench_sequences():
+    tokens = ["omer", "faruk", "toptas", "19", "90", "2025", "!", "@", "#", "$"]
+    min_len, max_len = 4, 10
+
+    # order check on a smaller range, throughput on the full one
+    small = []
+    _recursive_sequences(tokens, min_len, 7, small.append)
+    assert small == list(gk.iter_sequences(tokens, min_len, 7)), "iterative engine order differs"
+
+    expected = gk.count_sequence_combinations([len(t) for t in tokens], min_len, max_len)
+    print(f"pool={len(tokens)} min/max={min_len}/{max_len} sequences={expected:,}")
+
+    def run_recursive():
+        box = [0]
+
+        def emit(_):
+            box[0] += 1
+        _recursive_sequences(tokens, min_len, max_len, emit)
+        return box[0]
+
+    t_rec, n_rec = _timed(run_recursive)
+    t_it, n_it = _timed(lambda: _consume(gk.iter_sequences(tokens, min_len, max_len)))
+    _report("recursive dfs", t_rec, n_rec)
+    _report("iter_sequences", t_it, n_it)
+    print(f"speedup: {t_rec / t_it:.2f}x")
+
+
+# ------------------- Dedup -------------------
+def bench_dedup():
+    tokens = ["omer", "faruk", "19", "90", "1990", "1", "9", "!", "@"]
+    min_len, max_len = 4, 9
+
+    def with_set():
+        seen = set()
+        n = 0
+        for s in gk.iter_sequences(tokens, min_len, max_len):
+            if s not in seen:
+                seen.add(s)
+                n += 1
+        return n
+
+    t_set, n_set = _timed(with_set, repeat=1)
+    t_can, n_can = _timed(lambda: _consume(gk.iter_sequences(tokens, min_len, max_len, unique=True)), repeat=1)
+    assert n_set == n_can, "canonical dedup count differs from set dedup"
+    _report("seen set", t_set, n_set)
+    _report("canonical parse", t_can, n_can)
+
+
+def bench_case(path="bench_case.tmp"):
+    # (words, numbers, specials, max_len): mostly words, then mostly numbers/specials
+    cases = [(["omer", "faruk", "ahmet"], [], [], 15),
+             (["omerfaruk", "ahmet"], ["1990"], ["!"], 15),
+             (["omerfaruk", "toptas"], ["19", "90", "1990"], ["!", "@"], 14)]
+    try:
+        for words, numbers, specials, max_len in cases:
+            # old way: every variant is a pool token
+            pool, _ = gk.build_pool(words, numbers, specials, case_expand=True)
+            tokens, _ = gk.build_pool(words, numbers, specials)
+            t_eager, (n_eager, _) = _timed(lambda: gk.run_wordlist(pool, 4, max_len, path), repeat=1)
+            with open(path, "rb") as f:
+                eager = sorted(f)
+            t_lazy, (n_lazy, _) = _timed(lambda: gk.run_wordlist(tokens, 4, max_len, path, case=True), repeat=1)
+            with open(path, "rb") as f:
+                assert sorted(f) == eager, "lazy case expansion gives a different set"
+            print(f"pool: {len(pool)} tokens eager, {len(gk.CaseExpander(tokens).pool)} lazy")
+            _report("  variants in pool", t_eager, n_eager)
+            _report("  CaseExpander", t_lazy, n_lazy)
+            print(f"  speedup: {t_eager / t_lazy:.2f}x")
+        # every policy against its variants in the pool, also where parses spell differently ("al" + "i")
+        for tokens, max_len in ((["ali", "al", "i", "1"], 7), (["ab", "a", "b", "!"], 7),
+                                (["omer", "faruk", "19", "90", "1990", "!"], 11)):
+            for policy in ("all", "first", "simple", "upper:1", "upper:2"):
+                pool = list(dict.fromkeys(v for t in tokens for v in gk.case_policy_variants(t, policy) or [t]))
+                n_eager = gk.run_wordlist(pool, 1, max_len, path)[0]
+                with open(path, "rb") as f:
+                    eager = sorted(f)
+                t_lazy, (n_lazy, _) = _timed(lambda: gk.run_wordlist(tokens, 1, max_len, path, case=policy), repeat=1)
+                with open(path, "rb") as f:
+                    assert n_lazy == n_eager and sorted(f) == eager, f"{tokens} {policy}: lazy case expansion differs"
+            _report(f"  policies ok: {' '.join(tokens)}", t_lazy, n_lazy)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_rules():
+    tokens, _ = gk.build_pool(["omer", "faruk", "toptas"], ["19", "90"], ["!"])
+    lines = list(gk.iter_sequences(tokens, 4, 14, unique=True))
+    rules = [":", "c", "u", "sa@ so0", "$1", "c $!", "r", "d", "@a", "T0 T2"]
+    # positions past the end leave the word alone, like hashcat
+    for rule, want in (("y3", "ab"), ("Y3", "ab"), ("y2", "abab"), ("Y1", "abb"), ("x52", "ab"), ("i5!", "ab"),
+                       ("x12", "ab"), ("x11", "b"), ("O12", "ab"), ("O11", "a")):
+        assert gk.compile_rule(rule)("ab") == want and gk.rule_length(rule, 2)[0] == len(want), rule
+    # --estimate is exact only for one rule that cannot map two words to the same output
+    for rule, exact in ((":", True), ("$1", True), ("r $!", True), ("'3", False), ("]", False), ("x02", False),
+                        ("l", False), ("sa@", False)):
+        _, counts, _, got = gk.estimate_wordlist(["a", "1", "11a"], 3, 4, rules=[rule])
+        assert got == exact, f"{rule}: exact={got}"
+        if exact:
+            assert sum(counts) == gk.run_wordlist(["a", "1", "11a"], 3, 4, os.devnull, rules=[rule])[0], rule
+
+    def interpreted():
+        # parse every rule string again for each line
+        seen = set()
+        for line in lines:
+            for r in rules:
+                w = gk.compile_rule(r)(line)
+                if 4 <= len(w) <= 14:
+                    seen.add(w)
+        return len(seen)
+
+    def compiled():
+        return len(gk.RuleStage(rules, 4, 14).apply_many(lines))
+
+    t_int, n_int = _timed(interpreted, repeat=1)
+    t_cmp, n_cmp = _timed(compiled, repeat=1)
+    assert n_int == n_cmp, "compiled rules give a different count"
+    print(f"{len(lines)} words x {len(rules)} rules")
+    _report("rule parsed per line", t_int, n_int)
+    _report("RuleStage", t_cmp, n_cmp)
+
+
+def bench_templates(path="bench_templates.tmp"):
+    words, numbers, specials = ["omer", "faruk", "toptas", "ahmet"], ["19", "90", "1990", "2025"], list("!@#.")
+    templates = ["{word}{number}{special}", "{word}{word}{number}", "{special}{word}{number}", "{word}.{number}"]
+    tokens, _ = gk.build_pool(words, numbers, specials)
+    full = gk.count_sequence_combinations([len(t) for t in tokens], 4, 14)
+    t_count, spaces = _timed(lambda: gk.template_spaces(templates, words, numbers, specials, 4, 14, case="first"))
+    total = sum(s.total for s in spaces)
+    print(f"all orderings: {full:,} sequences, templates: {total:,} fillings ({full / total:,.0f}x fewer)")
+    _report("exact template counts", t_count, len(templates))
+    try:
+        t_run, (written, _) = _timed(lambda: gk.run_templates(spaces, path), repeat=1)
+        assert written <= total, "more lines than fillings"
+        _report("run_templates", t_run, written)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_policy():
+    # "8+ chars, upper case, a digit and a special, no triple repeats": pruning inside the walk vs filtering its output
+    tokens = ["omer", "Omer", "faruk", "Faruk", "toptas", "Toptas", "19", "90", "1990", "2025", "!", "@"]
+    policy = gk.PasswordPolicy(4, max_repeat=2, max_specials=1)
+    min_len, max_len = 8, 14
+    t_filter, n_filter = _timed(lambda: _consume(s for s in gk.iter_sequences(tokens, min_len, max_len, unique=True)
+                                                 if policy.check(s)), repeat=1)
+    t_prune, n_prune = _timed(lambda: _consume(gk.iter_sequences(tokens, min_len, max_len, unique=True,
+                                                                 constraints=policy)), repeat=1)
+    assert n_prune == n_filter, "pruned walk lost compliant lines"
+    counts, _, exact = gk.count_unique_strings(tokens, min_len, max_len, constraints=policy)
+    assert not exact or sum(counts) == n_prune, "policy count differs from the walk"
+    _report("walk + filter", t_filter, n_filter)
+    _report("walk with policy pruning", t_prune, n_prune)
+    print(f"  speedup: {t_filter / t_prune:.1f}x")
+
+
+def bench_best_first():
+    words, numbers, specials = ["omer", "faruk", "toptas"], ["19", "90", "1990"], list("!@#")
+    likely = ["Omer1990", "omer1990!", "Faruk1990", "toptas19"]
+    tokens, _ = gk.build_pool(words, numbers, specials)
+
+    def position(lines, targets):
+        left, found = set(targets), {}
+        for i, line in enumerate(lines):
+            if line in left:
+                found[line] = i
+                left.discard(line)
+                if not left:
+                    break
+        return found
+
+    exp = gk.CaseExpander(tokens, "first")
+    t_dfs, dfs = _timed(lambda: position(exp.lines(4, 12), likely), repeat=1)
+    best = gk.BestFirst(words, numbers, specials, 4, 12, case="first")
+    t_best, bf = _timed(lambda: position((l for _, l in best), likely), repeat=1)
+    assert set(dfs) == set(bf) == set(likely), "a likely candidate is missing"
+    for pw in likely:
+        print(f"  {pw:<12} token order: {dfs[pw]:>12,}   best-first: {bf[pw]:>8,}")
+    print(f"  time to all of them: {t_dfs:.3f} s token order, {t_best:.3f} s best-first")
+    t, n = _timed(lambda: _consume(itertools.islice(best, 200_000)), repeat=1)
+    _report("BestFirst head", t, n)
+    # 19 + 90 spells 1990, so this pool needs the repeat table and a default cap
+    assert not best.unique and best.limit() == gk.BEST_FIRST_TOP and best.limit(50) == 50
+    pool = (["omer", "ali"], ["1990"], ["!"])
+    small = gk.BestFirst(*pool, 4, 12, case="first")
+    lines = [l for _, l in small]
+    assert small.unique and small.limit() is None, "unambiguous pool should not be capped"
+    expected = set(gk.CaseExpander(gk.build_pool(*pool)[0], "first").lines(4, 12))
+    assert len(lines) == len(set(lines)) == len(expected), "best-first without a table repeated or dropped lines"
+
+
+# ------------------- Output sink -------------------
+def bench_sink(path="bench_sink.tmp"):
+    lines = [f"omer{i}faruk" for i in range(300_000)]
+
+    def per_line():
+        with open(path, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+                f.flush()
+        return len(lines)
+
+    def sink_text():
+        with gk.OutputSink(path) as sink:
+            for line in lines:
+                sink.write(line)
+        return len(lines)
+
+    raw_lines = [line.encode("ascii") for line in lines]
+
+    def sink_raw():
+        with gk.OutputSink(path, raw=True) as sink:
+            for line in raw_lines:
+                sink.write(line)
+        return len(lines)
+
+    try:
+        for name, fn in (("write+flush per line", per_line), ("OutputSink (text)", sink_text), ("OutputSink (raw)", sink_raw)):
+            t, n = _timed(fn)
+            _report(name, t, n)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_compress(base="bench_compress.tmp"):
+    # the same wordlist run plain, through the threaded CompressedWriter and
+    # with compression inline (gzip.open on the generating thread)
+    import gzip
+    tokens, _ = gk.build_pool(["omer", "faruk", "toptas"], ["19", "90", "1990"], ["!", "@"])
+    plain = base + ".txt"
+    paths = [plain] + [base + ext for ext in (".gz", ".xz", ".zst") if gk.output_path_for(base + ext) == base + ext]
+    try:
+        for path in paths:
+            t, (n, raw) = _timed(lambda: gk.run_wordlist(tokens, 4, 14, path), repeat=1)
+            ratio = raw / os.path.getsize(path)
+            _report(f"run_wordlist -> {os.path.splitext(path)[1]} ({ratio:.1f}x)", t, n)
+
+        def inline_gzip():
+            with open(plain, "rb") as src, gzip.open(base + ".inline.gz", "wb", compresslevel=6) as f:
+                for data in iter(lambda: src.read(gk.SINK_FLUSH_BYTES), b""):
+                    f.write(data)
+            return n
+        t_gen = _timed(lambda: gk.run_wordlist(tokens, 4, 14, plain), repeat=1)[0]
+        t_gz = _timed(inline_gzip, repeat=1)[0]
+        _report("plain + inline gzip (sum)", t_gen + t_gz, n)
+        with gzip.open(base + ".gz") as a, open(plain, "rb") as b:
+            assert a.read() == b.read(), ".gz output differs from the plain file"
+    finally:
+        for path in paths + [base + ".inline.gz"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def bench_stats(path="bench_stats.tmp"):
+    # the same run with and without an active RunStats: the hooks should cost nothing measurable
+    import io
+    tokens, _ = gk.build_pool(["omer", "faruk", "toptas"], ["19", "90", "1990"], ["!", "@"])
+    out = io.StringIO()
+
+    def with_stats():
+        with gk.RunStats(out, "wordlist"):
+            n, b = gk.run_wordlist(tokens, 4, 13, path, on_progress=gk.stats_wrap_wordlist(None))
+            gk.stats_result(n, b)
+        return n
+
+    try:
+        t_off, n = _timed(lambda: gk.run_wordlist(tokens, 4, 13, path)[0])
+        t_on, _ = _timed(with_stats)
+        _report("run_wordlist", t_off, n)
+        _report("run_wordlist + RunStats", t_on, n)
+        summary = json.loads(out.getvalue().splitlines()[-1])
+        assert summary["written"] == n, "summary lost the final count"
+        print(f"  overhead: {(t_on / t_off - 1) * 100:+.1f}%  phases: {summary['phases']}")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_progress(path="bench_progress.tmp"):
+    # a terminal that needs 2 ms per status line: drawn from the loop vs by a ProgressReporter
+    tokens, _ = gk.build_pool(["omer", "faruk", "toptas"], ["19", "90", "1990"], ["!", "@"])
+    frames = [0]
+
+    def render(values, rate, eta):
+        frames[0] += 1
+        time.sleep(0.002)
+
+    def inline():
+        return gk.run_wordlist(tokens, 4, 14, path, on_progress=lambda *values: render(values, 0.0, None))[0]
+
+    def reported():
+        with gk.ProgressReporter(render, key=1) as reporter:
+            return gk.run_wordlist(tokens, 4, 14, path, on_progress=reporter)[0]
+
+    try:
+        t_none, n = _timed(lambda: gk.run_wordlist(tokens, 4, 14, path)[0], repeat=1)
+        frames[0] = 0
+        t_inline, _ = _timed(inline, repeat=1)
+        inline_frames, frames[0] = frames[0], 0
+        t_reported, _ = _timed(reported, repeat=1)
+        _report("no progress", t_none, n)
+        _report(f"render in the loop ({inline_frames} frames)", t_inline, n)
+        _report(f"ProgressReporter ({frames[0]} frames)", t_reported, n)
+        # non-ASCII lines: tell() must not re-encode the buffer on every push
+        text = ["ali", "şule", "1990", "ahmet", "kedi", "!", "ev", "12"]
+        t_text, n_text = _timed(lambda: gk.run_wordlist(text, 8, 16, path)[0], repeat=1)
+        t_text_cb, _ = _timed(lambda: gk.run_wordlist(text, 8, 16, path, on_progress=lambda *values: None)[0],
+                              repeat=1)
+        _report("non-ASCII, no progress", t_text, n_text)
+        _report("non-ASCII, no-op on_progress", t_text_cb, n_text)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ------------------- Exclusion index -------------------
+def bench_exclude(base="bench_exclude.tmp"):
+    # a 2M-line reference list: index build once, then per-line vs batched lookups and a run against it
+    tokens, _ = gk.build_pool(["omer", "faruk", "toptas"], ["19", "90", "1990"], ["!", "@"])
+    source, out = base + ".txt", base + ".out"
+    with open(source, "w", encoding="utf-8") as f:
+        for i in range(2_000_000):
+            f.write(f"ref{i * 7919 % 10_000_019}x\n")
+        for i, line in enumerate(gk.iter_sequences(tokens, 4, 13, unique=True)):
+            if i % 4 == 0:
+                f.write(line + "\n")
+    index_path = gk.exclude_index_path(source)
+    try:
+        t_build, n_index = _timed(lambda: gk.build_exclude_index(source), repeat=1)
+        _report("build_exclude_index", t_build, n_index)
+        print(f"  index: {os.path.getsize(index_path) / 1e6:.1f} MB on disk ({os.path.getsize(source) / 1e6:.1f} MB list)")
+        with gk.open_exclude([source]) as index:
+            probe = [line.encode("ascii") for line in itertools.islice(gk.iter_sequences(tokens, 4, 13), 300_000)]
+            t_one, kept_one = _timed(lambda: [line for line in probe if line not in index])
+            t_batch, kept_batch = _timed(lambda: index.keep(probe, raw=True))
+            assert kept_one == kept_batch, "batched lookup differs from per-line lookup"
+            _report("per-line lookup", t_one, len(probe))
+            _report(f"batched lookup ({'numpy' if gk.np is not None else 'bisect'})", t_batch, len(probe))
+            t_plain, (n_plain, _) = _timed(lambda: gk.run_wordlist(tokens, 4, 13, out), repeat=1)
+            t_ex, (n_ex, _) = _timed(lambda: gk.run_wordlist(tokens, 4, 13, out, exclude=index), repeat=1)
+            assert n_plain - n_ex == (n_plain + 3) // 4, "excluded count is off"
+            _report("run_wordlist", t_plain, n_plain)
+            _report("run_wordlist --exclude", t_ex, n_ex)
+    finally:
+        for path in (source, out, index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ------------------- Batch -------------------
+def bench_batch(base="bench_batch.tmp"):
+    # a dozen targets of mixed size: one parallel run_wordlist each vs run_batch on one shared pool
+    workers = 4
+    profiles = []
+    for i in range(12):
+        words = ["omer", "faruk", "toptas", "ali", "veli", "deniz"][:2 + i % 4]
+        profiles.append({"name": f"t{i}", "words": words, "numbers": ["19", "90", str(1980 + i)], "specials": ["!"],
+                         "min_len": 4, "max_len": 10 + i % 4, "case": "first" if i % 3 == 0 else None,
+                         "constraints": None, "output": f"{base}.{i}.txt"})
+    # JSON/CSV "case" values: booleans, 0/1 and policy names pass, anything else is a clean ValueError
+    for value, want in ((True, gk.CASE_POLICY), (0, None), (1, gk.CASE_POLICY), ("evet", gk.CASE_POLICY), ("first", "first")):
+        assert gk._batch_profile({"words": "omer", "case": value}, 0, None)["case"] == want, f"case={value!r}"
+    for value in (2, 1.5, ["first"]):
+        try:
+            gk._batch_profile({"words": "omer", "case": value}, 0, None)
+        except ValueError:
+            continue
+        raise AssertionError(f"case={value!r} was accepted")
+
+    def one_by_one():
+        total = 0
+        for p in profiles:
+            tokens, _ = gk.build_pool(p["words"], p["numbers"], p["specials"])
+            total += gk.run_wordlist(tokens, p["min_len"], p["max_len"], p["output"] + ".ref", workers,
+                                     case=p["case"])[0]
+        return total
+
+    try:
+        t_seq, n_seq = _timed(one_by_one, repeat=1)
+        t_batch, results = _timed(lambda: gk.run_batch(profiles, workers), repeat=1)
+        assert sum(r["lines"] for r in results) == n_seq, "batch wrote a different number of lines"
+        for p in profiles:
+            with open(p["output"], "rb") as a, open(p["output"] + ".ref", "rb") as b:
+                assert a.read() == b.read(), f"{p['name']}: batch output differs from run_wordlist"
+        _report(f"run_wordlist x{len(profiles)} (-j {workers})", t_seq, n_seq)
+        _report(f"run_batch (-j {workers})", t_batch, n_seq)
+        print(f"  speedup: {t_seq / t_batch:.2f}x")
+    finally:
+        for p in profiles:
+            for path in (p["output"], p["output"] + ".ref"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+# ------------------- Split output -------------------
+def bench_split(base="bench_split.tmp"):
+    # one file vs a file per length vs per length in 1 MB chunks with only 4 handles open
+    tokens, _ = gk.build_pool(["omer", "faruk", "toptas"], ["19", "90", "1990"], ["!", "@"])
+    out = base + ".txt"
+    manifest = gk.split_manifest_path(out)
+
+    def split_files():
+        with open(manifest, encoding="utf-8") as f:
+            return [os.path.join(os.path.dirname(manifest), entry["path"]) for entry in json.load(f)["files"]]
+
+    def cleanup():
+        if os.path.exists(manifest):
+            for path in split_files() + [manifest]:
+                os.remove(path)
+
+    try:
+        t_one, (n, _) = _timed(lambda: gk.run_wordlist(tokens, 4, 14, out), repeat=1)
+        with open(out, encoding="utf-8") as f:
+            want = sorted(f.read().splitlines())
+        _report("single file", t_one, n)
+        for text in ("uzunluk", "uzunluk mb=1 acik=4", "satir=100000"):
+            cleanup()
+            split = gk.parse_split(text)
+            t_split, (n_split, _) = _timed(lambda: gk.run_wordlist(tokens, 4, 14, out, split=split), repeat=1)
+            got = []
+            for path in split_files():
+                with open(path, encoding="utf-8") as f:
+                    got += f.read().splitlines()
+            assert n_split == n and sorted(got) == want, f"{text}: split output differs from the single file"
+            _report(f"split {text} ({len(split_files())} files)", t_split, n_split)
+    finally:
+        cleanup()
+        if os.path.exists(out):
+            os.remove(out)
+
+
+# ------------------- Checkpoints -------------------
+def bench_resume(base="bench_resume.tmp"):
+    # parallel resume where the only shard left is emptied by --exclude: its checkpoint must keep the offset
+    tokens = ["omer", "faruk", "19", "90", "!"]
+    pool = [t.encode("ascii") for t in tokens]
+    out, ref, source, ckpt = base + ".out", base + ".ref", base + ".x", base + ".ckpt"
+    # the same plan generate_wordlist_parallel makes for 2 workers; shard k is the one left to merge
+    shards, _ = gk.plan_shards(pool, 4, 12, 2 * gk.PARALLEL_SHARDS_PER_WORKER)
+    k = len(shards) // 2
+    with open(source, "wb") as f:
+        for line in gk.iter_sequences(pool, 4, 12, unique=True, prefix=shards[k][0], subtree=shards[k][1]):
+            f.write(line + b"\n")
+
+    def stop_after_checkpoint(written, nbytes):
+        if os.path.exists(ckpt):
+            raise KeyboardInterrupt
+
+    try:
+        with gk.open_exclude([source]) as index:
+            n, nbytes = gk.generate_wordlist_parallel(pool, 4, 12, ref, 2, raw=True, exclude=index)
+            with open(ref, "rb") as a, open(out, "wb") as b:
+                b.write(a.read())
+            state = {"fingerprint": "bench", "mode": "parallel", "merged": [i for i in range(len(shards)) if i != k],
+                     "offset": nbytes, "written": n}
+            try:
+                gk.generate_wordlist_parallel(pool, 4, 12, out, 2, raw=True, on_progress=stop_after_checkpoint,
+                                              checkpoint=ckpt, fingerprint="bench", resume_state=state, exclude=index)
+            except KeyboardInterrupt:
+                pass
+            saved = gk.load_checkpoint(ckpt, "bench")
+            assert saved["offset"] == nbytes, f"checkpoint offset {saved['offset']} after an empty part, want {nbytes}"
+            t, (n_resumed, _) = _timed(lambda: gk.generate_wordlist_parallel(
+                pool, 4, 12, out, 2, raw=True, checkpoint=ckpt, fingerprint="bench", resume_state=saved,
+                exclude=index), repeat=1)
+        with open(ref, "rb") as a, open(out, "rb") as b:
+            assert a.read() == b.read(), "resumed output differs"
+        _report("resume after an empty part", t, n_resumed)
+
+        # set dedup with rules: the output holds mangled lines, not the skeletons the set needs
+        os.remove(out)
+        kwargs = {"dedup": "set", "rules": ["$1"]}
+        n_ref = gk.run_wordlist(["a", "1", "b"], 1, 6, ref, **kwargs)[0]
+        interval, gk.PROGRESS_PRINT_INTERVAL = gk.PROGRESS_PRINT_INTERVAL, 0
+
+        def stop_early(written, attempted, nbytes):
+            if written >= 20:
+                raise KeyboardInterrupt
+        try:
+            gk.run_wordlist(["a", "1", "b"], 1, 6, out, on_progress=stop_early, **kwargs)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            gk.PROGRESS_PRINT_INTERVAL = interval
+        assert os.path.exists(gk.checkpoint_path_for(out)), "no checkpoint after the interrupt"
+        t, (n_resumed, _) = _timed(lambda: gk.run_wordlist(["a", "1", "b"], 1, 6, out, resume=True, **kwargs),
+                                   repeat=1)
+        with open(ref, "rb") as a, open(out, "rb") as b:
+            assert a.read() == b.read(), "resumed rules + set dedup output differs"
+        _report("resume rules + set dedup", t, n_ref)
+    finally:
+        for path in (out, ref, source, ckpt, gk.exclude_index_path(source), gk.checkpoint_path_for(out)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# ------------------- WiFi generator -------------------
+def _wifi_profile(passwords, specials):
+    # share of each length / special count / upper count, to compare the two engines
+    lengths, num_specials, num_upper = {}, {}, {}
+    for p in passwords:
+        for table, key in ((lengths, len(p)), (num_specials, sum(c in specials for c in p)),
+                           (num_upper, min(sum(c.isupper() for c in p), 5))):
+            table[key] = table.get(key, 0) + 1
+    n = len(passwords)
+    return [{k: round(v / n, 3) for k, v in sorted(t.items())} for t in (lengths, num_specials, num_upper)]
+
+
+def bench_wifi():
+    count = 200_000
+    specials = gk._wifi_specials(gk.DEFAULT_SPECIALS)
+    t_scalar, scalar = _timed(lambda: list(gk._iter_wifi_scalar(count, specials, gk.WIFI_MIN_LEN, gk.WIFI_MAX_LEN)),
+                              repeat=1)
+    _report("scalar (random)", t_scalar, len(scalar))
+    if gk.np is None:
+        print("numpy yok, batch motoru atlandi")
+        return
+    t_batch, batch = _timed(lambda: list(gk.generate_wifi_passwords(count, specials)), repeat=1)
+    _report("numpy batch", t_batch, len(batch))
+    print(f"speedup: {t_scalar / t_batch:.2f}x")
+    t_blocks, n = _timed(lambda: sum(lines for _, lines in gk.iter_wifi_blocks(10 * count, specials)), repeat=1)
+    _report("numpy batch (bytes blocks)", t_blocks, n)
+    for name, a, b in zip(("uzunluk", "ozel sayisi", "buyuk harf"), _wifi_profile(scalar, specials),
+                          _wifi_profile(batch, specials)):
+        print(f"{name:<12} scalar {a}")
+        print(f"{'':<12} batch  {b}")
+
+
+def bench_wifi_dedup(path="bench_wifi.tmp"):
+    count = 2_000_000
+    try:
+        for kind in gk.DEDUP_BACKENDS:
+            mem = [0]
+
+            def run():
+                return gk.write_wifi_passwords(path, count, on_progress=lambda *a: mem.__setitem__(0, a[2]),
+                                               dedup=kind)[0]
+            t, n = _timed(run, repeat=1)
+            _report(f"dedup={kind} ({gk.format_mb(mem[0])})", t, n)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_wifi_parallel(path="bench_wifi.tmp"):
+    count = 4_000_000
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, 2, cpus} | {w for w in (4, 8, 16) if w < cpus})
+    base = digest = None
+    try:
+        for workers in counts:
+            t, n = _timed(lambda: gk.write_wifi_passwords(path, count, seed=1234, workers=workers)[0], repeat=1)
+            with open(path, "rb") as f:
+                h = gk.hashlib.sha256(f.read()).hexdigest()
+            # the file only depends on the seed
+            assert digest in (None, h), f"workers={workers} output differs"
+            digest = h
+            base = base or t
+            _report(f"workers={workers}", t, n)
+            print(f"{'':<32} scaling: {base / t:.2f}x (cpu={cpus})")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_wifi_space():
+    specials = gk.DEFAULT_SPECIALS
+    # exact count against brute force on a length small enough to list
+    small = gk.WifiSpace(specials, 3, 3)
+    brute = [s for s in map("".join, itertools.product(small.alphabet, repeat=3))
+             if sum(c in specials for c in s) <= 1 and any(c.isupper() for c in s)
+             and any(c.islower() for c in s) and not gk._has_triple_repeat(s)]
+    assert small.total == len(brute), "keyspace count differs from brute force"
+    assert [small.unrank(i) for i in range(0, small.total, 997)] == brute[::997], "unrank order differs"
+
+    space = gk.WifiSpace(specials)
+    print(f"keyspace={space.total:,}")
+    for pw in gk.generate_wifi_passwords(10_000, specials, seed=1):
+        assert pw in space, f"generator output outside the keyspace: {pw}"
+    count = 100_000
+    t, out = _timed(lambda: list(space.sample(count, seed=1)), repeat=1)
+    assert len(set(out)) == count, "sample returned a repeat"
+    _report("WifiSpace.sample", t, count)
+    t, ok = _timed(lambda: sum(space.rank(pw) >= 0 for pw in out), repeat=1)
+    _report("WifiSpace.rank", t, ok)
+
+
+BENCHMARKS = {
+    "sequences": bench_sequences,
+    "dedup": bench_dedup,
+    "case": bench_case,
+    "rules": bench_rules,
+    "templates": bench_templates,
+    "best_first": bench_best_first,
+    "policy": bench_policy,
+    "sink": bench_sink,
+    "compress": bench_compress,
+    "stats": bench_stats,
+    "progress": bench_progress,
+    "exclude": bench_exclude,
+    "batch": bench_batch,
+    "split": bench_split,
+    "resume": bench_resume,
+    "wifi": bench_wifi,
+    "wifi_dedup": bench_wifi_dedup,
+    "wifi_parallel": bench_wifi_parallel,
+    "wifi_space": bench_wifi_space,
+}
+
+
+def main(argv):
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"bilinmeyen benchmark: {name} (secenekler: {', '.join(BENCHMARKS)})")
+            return 1
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
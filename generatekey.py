@@ -13,6 +13,28 @@ import subprocess
 import random
 import hashlib
 import glob
+import math
+import stat
+import tempfile
+import bisect
+import mmap
+import heapq
+import errno
+import signal
+import json
+import contextlib
+import csv
+import cProfile
+import tracemalloc
+import zlib
+import bz2
+import queue
+import threading
+import argparse
+import multiprocessing
+from array import array
+from fractions import Fraction
+from concurrent.futures import ProcessPoolExecutor, wait
 
 # Try to import readline for nicer input handling (arrow keys, tab behavior)
 try:
@@ -20,11 +42,100 @@ try:
 except Exception:
     readline = None
 
+# lzma can be missing from minimal Python builds; zstd and lz4 are third-party.
+# Without them .xz/.zst/.lz4 outputs fall back to gzip (see output_path_for)
+try:
+    import lzma
+except ImportError:
+    lzma = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4frame
+except ImportError:
+    lz4frame = None
+
+# resource (rusage, for the memory high-water mark) is Unix-only
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# NumPy is optional: without it the WiFi generator falls back to the scalar loop
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # ---------------------- Config ----------------------
 MAX_VARIANTS_PER_TOKEN = 1024
+# harf varyant politikasi: "all" (her harf iki sekilde), "first" (orijinal/kucuk/Bas harf),
+# "simple" (orijinal/kucuk/BUYUK/Baslik), "upper:K" (en fazla K buyuk harf)
+CASE_POLICY = "all"
+# kural motoru ciktilarinin tekrar filtresi (make_dedup turleri: "table", "bloom", "set")
+RULES_DEDUP = "table"
+# sablon modu: ayni token bir adayda sinif basina en fazla kac kez kullanilabilir
+TEMPLATE_REPEAT = {"word": 1, "number": 1, "special": 2}
+TEMPLATE_DEDUP = "table"  # sablon ciktilarinin tekrar filtresi (make_dedup turleri)
+# olasilik sirasi (--best-first): sinif agirliklari; token, sablon, kural ve "case"
+# (orijinalden farkli yazim) icin --weight AD=W ile degistirilebilir
+BEST_FIRST_WEIGHTS = {"word": 3.0, "number": 2.0, "special": 1.0}
+BEST_FIRST_CASE_WEIGHT = 0.5     # orijinal yazim 1, diger her varyant bu kadar
+BEST_FIRST_BUCKET = 0.5          # maliyet kovasi genisligi (nat); kova icinde satirlar siralanir
+BEST_FIRST_SORT_LINES = 1 << 18  # kova siralama tamponu; dolarsa kova parca parca siralanir
+BEST_FIRST_DEDUP = "table"
+BEST_FIRST_TOP = 20_000_000      # --top verilmezse yazilacak en fazla satir (tekrar tablosu bununla sinirli kalir)
 PROGRESS_PRINT_INTERVAL = 0.5
-PROGRESS_PRINT_LINES = 1000
 DEFAULT_OUTPUT = "wordlist.txt"
+SINK_FLUSH_BYTES = 1 << 20  # cikti tamponu, bu kadar birikince diske yazilir
+# "canonical": tekrarlar yapisal olarak engellenir, bellek O(max_len)
+# "set": eski yontem, her satir bellekteki bir set'te tutulur (referans)
+# "external": satirlar sirali parcalar halinde diske dokulur, sonra birlestirilir (RAM'den buyuk ciktilar)
+DEDUP_MODE = "canonical"
+EXTERNAL_DEDUP_MEMORY = 256 << 20   # bayt; harici dedup bu kadar satiri bellekte toplayip diske doker
+EXTERNAL_DEDUP_DISK_LIMIT = None    # bayt; gecici dosyalar icin ust sinir (None = sinirsiz)
+EXTERNAL_MERGE_FANIN = 64           # ayni anda acik tutulan parca dosyasi sayisi
+EXCLUDE_INDEX_SUFFIX = ".gkx"       # dislama listesinin indeksi: liste.txt -> liste.txt.gkx
+EXCLUDE_INDEX_DIR = None            # indekslerin yazilacagi dizin (None = listenin yani)
+EXCLUDE_BUILD_MEMORY = 256 << 20    # bayt; indeks kurulurken bellekte siralanan ozet miktari
+EXCLUDE_BATCH = 1 << 16             # kutuphane filtresinde tek seferde aranan satir sayisi
+UNIQUE_COUNT_STATE_LIMIT = 200_000  # benzersiz sayim icin DFA durum limiti
+PARALLEL_SHARDS_PER_WORKER = 8  # paralel modda cekirdek basina parca sayisi
+PARALLEL_MERGE_ORDERED = True   # parcalari agac sirasina gore birlestir (tek cekirdekle ayni cikti)
+BATCH_MIN_SHARD = 1 << 18       # toplu modda bundan az dizilimli hedefler tek parca calisir
+CHECKPOINT_INTERVAL = 30.0      # saniye; kaldigi yerden devam icin ilerleme kaydi
+CHECKPOINT_SUFFIX = ".ckpt"
+DEFAULT_SPECIALS = "!@#$%&*?-_"
+WIFI_MIN_LEN = 10
+WIFI_MAX_LEN = 12
+DEFAULT_WIFI_OUTPUT = "wifi_wordlist.txt"
+WIFI_BATCH_SIZE = 1 << 16  # NumPy motorunda tek seferde uretilen aday sayisi
+# WiFi tekrar kontrolu: "table" (acik adresleme, kesin), "bloom" (daha az bellek,
+# DEDUP_BLOOM_FP oraninda yeni aday yanlislikla atlanabilir), "set" (eski yontem),
+# "external" (diske dokerek, bkz. EXTERNAL_DEDUP_MEMORY)
+WIFI_DEDUP = "table"
+DEDUP_MAX_LOAD = 0.7    # hash tablosu doluluk siniri, asilirsa tablo buyutulur
+DEDUP_BLOOM_FP = 1e-4   # bloom filtresi yanlis pozitif orani
+# istenen sayi anahtar uzayinin bu oranini asarsa WiFi uretimi kendiliginden
+# kesin moda (WifiSpace.sample) gecer; rastgele deneme orada tekrarlara takilir
+WIFI_EXACT_FRACTION = 0.05
+# cikti dosyasinin uzantisi sikistirmayi secer; zstandard/lz4 modulu yoksa .gz yazilir
+OUTPUT_CODECS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd", ".lz4": "lz4"}
+SINK_COMPRESS_LEVEL = None  # None = codec varsayilani (gzip 6, zstd 3, lz4 0, xz 6, bz2 9)
+SINK_COMPRESS_QUEUE = 8     # sikistirma is parcacigini bekleyen en fazla tampon sayisi
+# bolunmus cikti (--split-*, menude "Ciktiyi bol"): uzunluk basina dosya ve/veya satir/MB sinirli parcalar
+SPLIT_MAX_OPEN = 64           # ayni anda acik en fazla dosya
+SPLIT_CHUNK_DIGITS = 4        # parca numarasinin en az hane sayisi (out.0001.txt)
+SPLIT_BUFFER_BYTES = 1 << 18  # dosya basina tampon; dolunca dosyasina yazilir
+# olcum (--stats): JSON satirlari; menude STATS_FILE verilirse her calisma oraya yazilir ("-" = stderr)
+STATS_FILE = None
+STATS_PROFILE = None          # cProfile cikti dosyasi (pstats), None = kapali
+STATS_TRACE_MEMORY = False    # tracemalloc ile bellek zirvesi ve en cok ayiran satirlar
+STATS_INTERVAL = 1.0          # saniye; "progress" satirlari arasi en az sure
+STATS_TOP_ALLOCATIONS = 10
+STDOUT_TARGET = "-"  # kayit yolu olarak "-": adaylar dogrudan stdout'a akar (hashcat/john icin)
 
 BANNER_TEXT = "SpecialWordList"  # Banner'da gosterilecek yazi
 # ----------------------------------------------------
@@ -297,9 +408,41 @@ def case_variants(token: str, max_variants: int = MAX_VARIANTS_PER_TOKEN):
             uniq.append(v)
     return uniq
 
-def count_sequence_combinations(token_lengths, min_len, max_len):
+def case_policy_variants(token: str, policy: str = CASE_POLICY):
+    """
+    Spellings of one token under a case policy (see CASE_POLICY). Variants
+    that change the length (e.g. "ß" -> "SS") are dropped, so a token keeps
+    its length whatever spelling ends up in the candidate.
+    """
+    kind, _, arg = policy.partition(":")
+    if kind == "all":
+        variants = case_variants(token)
+    elif kind == "simple":
+        variants = [token, token.lower(), token.upper(), token.title()]
+    elif kind == "first":
+        variants = [token, token.lower(), token[:1].upper() + token[1:].lower()]
+    elif kind == "upper":
+        try:
+            k = int(arg or 1)
+        except ValueError:
+            raise ValueError(f"gecersiz harf politikasi: {policy}") from None
+        low = token.lower()
+        letters = [i for i, ch in enumerate(low) if ch.isalpha()]
+        variants = [token]
+        for r in range(min(k, len(letters)) + 1):
+            for picked in itertools.combinations(letters, r):
+                chars = list(low)
+                for i in picked:
+                    chars[i] = chars[i].upper()
+                variants.append("".join(chars))
+    else:
+        raise ValueError(f"gecersiz harf politikasi: {policy}")
+    return [v for v in dict.fromkeys(variants) if len(v) == len(token)]
+
+def sequence_length_counts(token_lengths, max_len):
+    # dp[L]: number of token sequences whose total length is exactly L
     if max_len < 0:
-        return 0
+        return []
     dp = [0] * (max_len + 1)
     dp[0] = 1
     for L in range(1, max_len + 1):
@@ -308,360 +451,5351 @@ def count_sequence_combinations(token_lengths, min_len, max_len):
             if tl <= L:
                 s += dp[L - tl]
         dp[L] = s
+    return dp
+
+def count_sequence_combinations(token_lengths, min_len, max_len, constraints=None, tokens=None):
+    # constraints (a PasswordPolicy) counts only the compliant sequences; that needs the tokens themselves
+    if max_len < 0:
+        return 0
+    if constraints is not None:
+        if tokens is None:
+            raise ValueError("politika ile sayim icin tokenler gerekli")
+        return sum(constrained_length_counts(tokens, constraints, min_len, max_len)[0])
+    dp = sequence_length_counts(token_lengths, max_len)
     return sum(dp[min_len:max_len + 1]) if max_len >= min_len else 0
 
-def format_mb(bytes_count):
-    return f"{bytes_count / 1024**2:.3f} MB"
+def constrained_length_counts(tokens, constraints, min_len, max_len):
+    """
+    Per-length (counts, line_bytes) of the token sequences that comply with
+    constraints (a PasswordPolicy), without generating any: the sequence DP
+    run over (length, policy state), with the same pruning as the walk.
+    Like sequence_length_counts it counts sequences, not distinct strings.
+    """
+    counts = [0] * (max_len + 1) if max_len >= 0 else []
+    line_bytes = list(counts)
+    if max_len < 0 or not tokens:
+        return counts, line_bytes
+    lens = _check_tokens(tokens)
+    walk = _policy_walk(constraints, tokens)
+    step, sat, need = walk.step, walk.sat, walk.need
+    items = [(i, l, len(t.encode("utf-8")) if isinstance(t, str) else l) for i, (t, l) in enumerate(zip(tokens, lens))]
+    levels = [{} for _ in range(max_len + 1)]
+    levels[0][PasswordPolicy.START] = (1, 0)
+    for L in range(max_len + 1):
+        level, levels[L] = levels[L], None
+        for state, (c, b) in level.items():
+            if L >= max(min_len, 1) and sat[state[0]]:
+                counts[L] += c
+                line_bytes[L] += b + c
+            for i, tl, tb in items:
+                L2 = L + tl
+                if L2 > max_len:
+                    continue
+                st = step(state, i)
+                if st is None or L2 + need[st[0]] > max_len:
+                    continue
+                c0, b0 = levels[L2].get(st, (0, 0))
+                levels[L2][st] = (c0 + c, b0 + b + c * tb)
+    return counts, line_bytes
 
-# ------------------- Flow -------------------
-def input_form():
-    clear()
-    banner()
-    draw_box(
-        [
-            f"{C.BRIGHT_GREEN}Kelimeler{C.RESET}: boslukla ayirin (orn: omer faruk toptas)",
-            f"{C.BRIGHT_GREEN}Sayilar{C.RESET}: boslukla ayirin (orn: 19 90 2025)",
-            f"{C.BRIGHT_GREEN}Ozel{C.RESET}: tek parca girerseniz her karakter tek tek alinabilir (orn: !@#$)",
-        ],
-        title="INPUT GUIDE",
-        color=C.BRIGHT_BLUE
-    )
+def count_unique_strings(tokens, min_len, max_len, state_limit=UNIQUE_COUNT_STATE_LIMIT, constraints=None):
+    """
+    Number of distinct strings (not sequences) of each length the pool can
+    produce, without generating any of them. Runs a DP over a lazily built
+    DFA for (pool)*: every distinct string is exactly one DFA path, so path
+    counts are string counts. Also sums the UTF-8 size of those lines.
 
-    words_raw = ask("Kelimeler")
-    numbers_raw = ask("Sayilar")
-    specials_raw = ask("Ozel karakterler (bos birakilabilir)")
+    Returns (counts, line_bytes, exact) where counts[L] / line_bytes[L] are
+    per length (line_bytes includes the newline). If the DFA grows past
+    state_limit, falls back to the sequence DP, which is an upper bound, and
+    exact is False.
 
-    words = parse_tokens(words_raw)
-    numbers = parse_tokens(numbers_raw)
-    specials = parse_tokens(specials_raw)
+    constraints (a PasswordPolicy) counts only the compliant strings: its
+    state is tracked per character next to the DFA state.
+    """
+    counts = [0] * (max_len + 1) if max_len >= 0 else []
+    line_bytes = list(counts)
+    if max_len < 0 or not tokens:
+        return counts, line_bytes, True
+    _check_tokens(tokens)
 
-    print()
-    draw_box(
-        [
-            "Uzunluk araligi icin sayi giriniz.",
-            "Ornek: min=4, max=12"
-        ],
-        title="LENGTH",
-        color=C.BRIGHT_MAGENTA
-    )
-    try:
-        min_len = int(ask("Minimum uzunluk", "4"))
-        max_len = int(ask("Maksimum uzunluk", "12"))
-    except ValueError:
-        print(center(C.BRIGHT_RED + "Hata: uzunluk degerleri sayi olmali." + C.RESET))
-        sys.exit(1)
+    # NFA: state 0 is "between tokens", state (i, p) is "p chars into token i"
+    nfa_next = {0: {}}
+    for i, t in enumerate(tokens):
+        prev = 0
+        for p, ch in enumerate(t):
+            nxt = 0 if p == len(t) - 1 else (i, p + 1)
+            nfa_next.setdefault(prev, {}).setdefault(ch, set()).add(nxt)
+            prev = nxt
 
-    print()
-    draw_box(
-        [
-            "Tokenler icin buyuk/kucuk harf varyantlari uret?",
-            "Evet icin 'E' yazin, aksi halde Enter'a basin."
-        ],
-        title="CASE VARIANTS",
-        color=C.BRIGHT_YELLOW
-    )
-    case_ans = ask("Varyant uret (E/h)", "h").strip().lower()
-    case_expand = case_ans.startswith("e")
+    char_bytes = {}
+    dfa_moves = {}
 
-    print()
-    out_path = ask("Kayit yolu", DEFAULT_OUTPUT) or DEFAULT_OUTPUT
+    def moves(state):
+        m = dfa_moves.get(state)
+        if m is None:
+            by_char = {}
+            for q in state:
+                for ch, dst in nfa_next.get(q, {}).items():
+                    by_char.setdefault(ch, set()).update(dst)
+            m = []
+            for ch, dst in by_char.items():
+                if ch not in char_bytes:
+                    char_bytes[ch] = len(ch.encode("utf-8")) if isinstance(ch, str) else 1
+                m.append((frozenset(dst), char_bytes[ch], ch))
+            dfa_moves[state] = m
+        return m
 
-    return words, numbers, specials, min_len, max_len, case_expand, out_path
+    # level keys are (DFA state, policy state); without a policy the latter stays START
+    feed = constraints.feed if constraints is not None else None
+    char_steps = {}
+    level = {(frozenset([0]), PasswordPolicy.START): (1, 0)}
+    for L in range(1, max_len + 1):
+        nxt_level = {}
+        for (state, ps), (cnt, byt) in level.items():
+            for dst, cb, ch in moves(state):
+                if feed is not None:
+                    key = (ps, ch)
+                    nps = char_steps.get(key, False)
+                    if nps is False:
+                        nps = char_steps[key] = feed(ps, (ch,))
+                    if nps is None:
+                        continue
+                    dst = (dst, nps)
+                else:
+                    dst = (dst, ps)
+                c0, b0 = nxt_level.get(dst, (0, 0))
+                nxt_level[dst] = (c0 + cnt, b0 + byt + cnt * cb)
+        if len(dfa_moves) > state_limit:
+            return _unique_count_bound(tokens, min_len, max_len, constraints)
+        level = nxt_level
+        for (state, ps), (cnt, byt) in level.items():
+            if 0 in state and (feed is None or constraints.sat[ps[0]]):
+                counts[L] += cnt
+                line_bytes[L] += byt + cnt
+        if not level:
+            break
+    for L in range(0, min(min_len, max_len + 1)):
+        counts[L] = line_bytes[L] = 0
+    return counts, line_bytes, True
 
-def generate_wordlist_ui(words, numbers, specials, min_len, max_len, case_expand, out_path):
-    clear()
-    banner()
-    draw_box(
-        [
-            f"Kelimeler: {', '.join(words) if words else '-'}",
-            f"Sayilar  : {', '.join(numbers) if numbers else '-'}",
-            f"Ozel     : {''.join(specials) if specials else '-'}",
-            f"Min/Max  : {min_len}/{max_len}",
-            f"Varyant  : {'Evet' if case_expand else 'Hayir'}",
-            f"Dosya    : {out_path}"
-        ],
-        title="SUMMARY",
-        color=C.BRIGHT_BLUE
-    )
+def count_case_expanded(tokens, policy, min_len, max_len, constraints=None):
+    """
+    count_unique_strings for a lazily case-expanded run (see CaseExpander):
+    a DP over the skeleton pool where every token weighs as many strings as
+    it has variants. Exact when no skeleton string has two parses, otherwise
+    an upper bound (exact is False). With constraints (a PasswordPolicy)
+    every variant is its own token, since spellings differ in their classes.
+    """
+    exp = CaseExpander(tokens, policy)
+    counts = [0] * (max_len + 1) if max_len >= 0 else []
+    line_bytes = list(counts)
+    if max_len < 0 or not exp.pool:
+        return counts, line_bytes, True
+    items = [(len(t), len(vs), len(t.encode("utf-8"))) for t, vs in zip(exp.pool, exp.variants)]
+    if constraints is not None:
+        counts, line_bytes = constrained_length_counts([v for vs in exp.variants for v in vs], constraints,
+                                                       min_len, max_len)
+    else:
+        dp_c = [1] + [0] * max_len
+        dp_b = [0] * (max_len + 1)
+        for L in range(1, max_len + 1):
+            for tl, w, tb in items:
+                if tl <= L:
+                    dp_c[L] += w * dp_c[L - tl]
+                    dp_b[L] += w * (dp_b[L - tl] + dp_c[L - tl] * tb)
+        for L in range(max(min_len, 1), max_len + 1):
+            counts[L] = dp_c[L]
+            line_bytes[L] = dp_b[L] + dp_c[L]
+    unique, _, exact = count_unique_strings(exp.pool, min_len, max_len)
+    sequences = sequence_length_counts([tl for tl, _, _ in items], max_len)
+    exact = exact and all(unique[L] == sequences[L] for L in range(max(min_len, 1), max_len + 1))
+    return counts, line_bytes, exact
 
-    spinner("Hazirlaniyor...", 0.8)
+def _unique_count_bound(tokens, min_len, max_len, constraints=None):
+    if constraints is not None:
+        dp = constrained_length_counts(tokens, constraints, 0, max_len)[0]
+    else:
+        dp = sequence_length_counts([len(t) for t in tokens], max_len)
+    chars = "".join(tokens) if isinstance(tokens[0], str) else None
+    per_char = len(chars.encode("utf-8")) / len(chars) if chars else 1.0
+    alphabet = len(set(chars)) if chars else 256
+    counts = [0] * (max_len + 1)
+    line_bytes = [0] * (max_len + 1)
+    for L in range(max(min_len, 1), max_len + 1):
+        # can never exceed the number of strings over the pool's alphabet
+        counts[L] = min(dp[L], alphabet ** L)
+        line_bytes[L] = int(counts[L] * (L * per_char + 1))
+    return counts, line_bytes, False
 
-    original_tokens = [t for t in (words + numbers + specials) if t != ""]
-    if not original_tokens:
-        print(center(C.BRIGHT_RED + "En az bir token girilmelidir." + C.RESET))
-        sys.exit(1)
+def format_mb(bytes_count):
+    return f"{bytes_count / 1024**2:.3f} MB"
 
-    expanded = []
-    expansion_info = []
-    if case_expand:
-        for t in original_tokens:
-            v = case_variants(t)
-            expanded.extend(v)
-            expansion_info.append((t, len(v)))
-    else:
-        expanded = list(original_tokens)
-        for t in original_tokens:
-            expansion_info.append((t, 1))
+# ------------------- Core: Sequence Engine -------------------
+def iter_sequences(tokens, min_len, max_len, unique=False, prefix=(), subtree=True, resume_after=None,
+                   constraints=None):
+    """
+    Iterative replacement for the old recursive dfs. Keeps an explicit stack
+    of (prefix, length, iterator over the tokens that still fit) and yields
+    every sequence whose length is in [min_len, max_len], in the same
+    pre-order the recursive version produced. Works with str or bytes tokens.
 
-    seen_tok = set()
-    tokens = []
-    for t in expanded:
-        if t not in seen_tok:
-            seen_tok.add(t)
-            tokens.append(t)
+    unique=True yields every distinct string exactly once without a seen
+    set (see _iter_unique_sequences); the output is identical to filtering
+    the plain stream through a set.
 
-    print()
-    info_lines = [f"'{orig}' -> {count} variant" for (orig, count) in expansion_info]
-    draw_box(info_lines or ["(no tokens)"], title="TOKEN VARIANTS", color=C.BRIGHT_MAGENTA)
-    print(center(f"{C.DIM}Pool size (unique): {len(tokens)}{C.RESET}"))
-    if case_expand:
-        print(center(f"{C.DIM}MAX_VARIANTS_PER_TOKEN = {MAX_VARIANTS_PER_TOKEN}{C.RESET}"))
-    print()
+    prefix (a tuple of token indices) restricts the walk to that node of the
+    tree: the node itself, then its subtree unless subtree=False. Walking a
+    list of such shards in order reproduces the full stream.
 
-    if any(len(t) == 0 for t in tokens):
-        print(center(C.BRIGHT_RED + "Hata: bos uzunluklu token tespit edildi." + C.RESET))
-        sys.exit(1)
+    resume_after (token indices below prefix) continues the walk right
+    after that sequence was yielded; used to pick up from a checkpoint.
 
-    token_lengths = [len(t) for t in tokens]
-    total_sequences = count_sequence_combinations(token_lengths, min_len, max_len)
-    if total_sequences == 0:
-        print(center(C.BRIGHT_YELLOW + "Uretilebilecek kombinasyon yok (min/max uyusmuyor)." + C.RESET))
-        sys.exit(1)
+    constraints (a PasswordPolicy) yields only the compliant sequences and
+    skips every subtree that can no longer comply; the rest of the order is
+    unchanged.
+    """
+    if max_len <= 0 or not tokens:
+        return iter(())
+    if resume_after is not None:
+        resume_after = tuple(resume_after)
+    walk = _policy_walk(constraints, tokens)
+    if unique:
+        return _iter_unique_sequences(tokens, min_len, max_len, tuple(prefix), subtree, resume_after,
+                                      constraints=walk)
+    if walk is not None:
+        return _iter_constrained_sequences(tokens, min_len, max_len, tuple(prefix), subtree, resume_after, walk)
+    return _iter_all_sequences(tokens, min_len, max_len, tuple(prefix), subtree, resume_after)
 
-    print(center(f"Tahmini dizilim sayisi: {C.BRIGHT_WHITE}{total_sequences:,}{C.RESET}"))
-    print(center(C.DIM + "Not: Bu sayi sirali kombinasyon tahminidir; benzersiz satir sayisi daha az olabilir." + C.RESET))
-    print()
+def _check_tokens(tokens):
+    lens = [len(t) for t in tokens]
+    if min(lens) == 0:
+        raise ValueError("bos uzunluklu token")
+    return lens
 
-    written = 0
-    attempted = 0
-    last_print = time.time()
-    writes_since = 0
-    seen = set()
+def _resume_stack(tokens, lens, fits, fit_ids, max_len, min_tok, start, L0, after):
+    # Rebuild the walk stack as it was right after `after` had been yielded:
+    # every ancestor's iterator points past the child that was taken.
+    stack = []
+    s, L = start, L0
+    for i in after:
+        ids = fit_ids[max_len - L]
+        pos = ids.index(i)
+        stack.append((s, L, iter(fits[max_len - L][pos + 1:])))
+        s += tokens[i]
+        L += lens[i]
+    pushed = L + min_tok <= max_len
+    if pushed:
+        stack.append((s, L, iter(fits[max_len - L])))
+    return stack, pushed
 
-    def progress_line(file_obj):
-        try:
-            bytes_written = file_obj.tell()
-        except Exception:
-            try:
-                bytes_written = os.path.getsize(out_path)
-            except Exception:
-                bytes_written = 0
-        pct = (attempted / total_sequences) * 100 if total_sequences else 100.0
-        line = f"Yazilan: {written:,} | Dosya: {format_mb(bytes_written)} | Tamamlandi: {pct:.2f}%"
-        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+def _iter_all_sequences(tokens, min_len, max_len, prefix=(), subtree=True, resume_after=None):
+    lens = _check_tokens(tokens)
+    min_tok = min(lens)
+    start = tokens[0][:0].join(tokens[i] for i in prefix)
+    L0 = sum(lens[i] for i in prefix)
+    if L0 > max_len:
+        return
+    if prefix and L0 >= min_len and resume_after is None:
+        yield start
+    if not subtree or L0 + min_tok > max_len:
+        return
+    # fits[r]: tokens (in pool order) that fit into r remaining characters
+    fits = [[(t, l) for t, l in zip(tokens, lens) if l <= r] for r in range(max_len + 1)]
+    if resume_after:
+        fit_ids = [[i for i, l in enumerate(lens) if l <= r] for r in range(max_len + 1)]
+        stack, _ = _resume_stack(tokens, lens, fits, fit_ids, max_len, min_tok, start, L0, resume_after)
+    else:
+        stack = [(start, L0, iter(fits[max_len - L0]))]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        prefix, plen, it = stack[-1]
+        for t, tl in it:
+            L = plen + tl
+            s = prefix + t
+            if L >= min_len:
+                yield s
+            # only descend if at least one more token still fits
+            if L + min_tok <= max_len:
+                push((s, L, iter(fits[max_len - L])))
+                break
+        else:
+            pop()
 
-    def dfs(curr, f):
-        nonlocal written, attempted, last_print, writes_since
-        cur_len = len(curr)
-        if min_len <= cur_len <= max_len:
-            attempted += 1
-            if curr and curr not in seen:
-                f.write(curr + "\n")
-                f.flush()
-                seen.add(curr)
-                written += 1
-                writes_since += 1
-        if cur_len >= max_len:
-            return
-        for t in tokens:
-            new_len = cur_len + len(t)
-            if new_len > max_len:
+def _resume_states(walk, state, after):
+    # policy state of every stack level _resume_stack rebuilt for `after`
+    states = [state]
+    for i in after:
+        state = walk.step(state, i)
+        states.append(state)
+    return states
+
+def _iter_constrained_sequences(tokens, min_len, max_len, prefix, subtree, resume_after, walk):
+    # _iter_all_sequences with a policy state on every stack level
+    lens = _check_tokens(tokens)
+    min_tok = min(lens)
+    start = tokens[0][:0].join(tokens[i] for i in prefix)
+    L0 = sum(lens[i] for i in prefix)
+    state = walk.prefix_state(prefix)
+    if L0 > max_len or state is None:
+        return
+    sat, reach = walk.sat, walk.reach(min_tok)
+    if prefix and L0 >= min_len and resume_after is None and sat[state[0]]:
+        yield start
+    if not subtree or L0 + reach[state[0]] > max_len:
+        return
+    fits = [[(i, t, l) for i, (t, l) in enumerate(zip(tokens, lens)) if l <= r] for r in range(max_len + 1)]
+    if resume_after:
+        fit_ids = [[i for i, l in enumerate(lens) if l <= r] for r in range(max_len + 1)]
+        stack, _ = _resume_stack(tokens, lens, fits, fit_ids, max_len, min_tok, start, L0, resume_after)
+        stack = [entry + (st,) for entry, st in zip(stack, _resume_states(walk, state, resume_after))]
+    else:
+        stack = [(start, L0, iter(fits[max_len - L0]), state)]
+    step = walk.step
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        prefix, plen, it, state = stack[-1]
+        for i, t, tl in it:
+            st = step(state, i)
+            if st is None:
                 continue
-            dfs(curr + t, f)
-            now = time.time()
-            if writes_since >= PROGRESS_PRINT_LINES or (now - last_print) >= PROGRESS_PRINT_INTERVAL:
-                progress_line(f)
-                last_print = now
-                writes_since = 0
+            L = plen + tl
+            s = prefix + t
+            if L >= min_len and sat[st[0]]:
+                yield s
+            if L + reach[st[0]] <= max_len:
+                push((s, L, iter(fits[max_len - L]), st))
+                break
+        else:
+            pop()
 
-    try:
-        with open(out_path, "w", encoding="utf-8") as f:
-            dfs("", f)
-            try:
-                bytes_written = f.tell()
-            except Exception:
-                try:
-                    bytes_written = os.path.getsize(out_path)
-                except Exception:
-                    bytes_written = 0
-    except KeyboardInterrupt:
-        print()
-        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu." + C.RESET))
-        try:
-            bytes_written = os.path.getsize(out_path)
-        except Exception:
-            bytes_written = 0
-        pct = (attempted / total_sequences) * 100 if total_sequences else 100.0
-        print(center(f"Yazilan: {written:,} | Dosya: {format_mb(bytes_written)} | Tamamlandi: {pct:.2f}%"))
-        sys.exit(1)
+# --- canonical-parse dedup ---
+# A string can come out of several token sequences ("1"+"9" and "19"). The
+# plain pre-order walk meets those sequences in lexicographic order of their
+# token indices, so the copy a seen set keeps is always the one produced by
+# the lexicographically smallest parse. Emitting a sequence only when it *is*
+# that smallest parse gives the same output with O(max_len) memory. If a
+# sequence is not canonical, no extension of it is either, so the whole
+# subtree is pruned.
+def _is_canonical(s, path, index, lens, len_set):
+    n = len(s)
+    # ok[i]: s[i:] can be split into pool tokens
+    ok = [False] * (n + 1)
+    ok[n] = True
+    for i in range(n - 1, -1, -1):
+        for l in len_set:
+            if i + l <= n and ok[i + l] and s[i:i + l] in index:
+                ok[i] = True
+                break
+    # walk the smallest parse greedily and compare it with path
+    pos = 0
+    for ti in path:
+        best = ti
+        for l in len_set:
+            if pos + l <= n and ok[pos + l]:
+                j = index.get(s[pos:pos + l])
+                if j is not None and j < best:
+                    return False
+        pos += lens[best]
+    return True
 
-    pct = (attempted / total_sequences) * 100 if total_sequences else 100.0
-    print()
-    print()
-    draw_box(
-        [
-            f"Kayit: {out_path}",
-            f"Toplam satir (unique): {written:,}",
-            f"Dosya boyutu: {format_mb(os.path.getsize(out_path) if os.path.exists(out_path) else 0)}",
-            f"Tahmini tamamlanma: {pct:.2f}%"
-        ],
-        title="DONE",
-        color=C.BRIGHT_GREEN
-    )
-    print(center(C.DIM + "Ipuclari: Tokenleri akilli secin, uzunluk araligini dar tutun." + C.RESET))
-    print()
+def _parse_index(tokens):
+    index = {}
+    for i, t in enumerate(tokens):
+        index.setdefault(t, i)
+    return index, sorted(set(len(t) for t in tokens))
 
-# ------------------- WiFi password generator -------------------
-DEFAULT_SPECIALS = "!@#$%&*?-_"
+def canonical_parse(s, tokens):
+    # token indices of the lexicographically smallest parse of s, or None
+    index, len_set = _parse_index(tokens)
+    return _canonical_path(s, tokens, index, len_set)
 
-def _truncated_hash64(s: str) -> int:
-    # SHA256, truncate to first 8 bytes -> int
-    h = hashlib.sha256(s.encode("utf-8")).digest()[:8]
-    return int.from_bytes(h, "big")
+def _canonical_path(s, tokens, index, len_set):
+    n = len(s)
+    ok = [False] * (n + 1)
+    ok[n] = True
+    for i in range(n - 1, -1, -1):
+        ok[i] = any(i + l <= n and ok[i + l] and s[i:i + l] in index for l in len_set)
+    if not ok[0]:
+        return None
+    path = []
+    pos = 0
+    while pos < n:
+        best = min(index[s[pos:pos + l]] for l in len_set
+                   if pos + l <= n and ok[pos + l] and s[pos:pos + l] in index)
+        path.append(best)
+        pos += len(tokens[best])
+    return path
 
-def _has_triple_repeat(s: str) -> bool:
-    if len(s) < 3:
-        return False
-    # check any char repeated 3 times consecutively
-    for i in range(len(s)-2):
-        if s[i] == s[i+1] == s[i+2]:
+def _all_paths(s, index, len_set):
+    # every parse of s as token indices, the canonical (smallest) one first
+    n = len(s)
+    ok = [False] * (n + 1)
+    ok[n] = True
+    for i in range(n - 1, -1, -1):
+        ok[i] = any(i + l <= n and ok[i + l] and s[i:i + l] in index for l in len_set)
+    if not ok[0]:
+        return
+
+    def rest(pos):
+        if pos == n:
+            yield []
+            return
+        for j, l in sorted((index[s[pos:pos + l]], l) for l in len_set
+                           if pos + l <= n and ok[pos + l] and s[pos:pos + l] in index):
+            for tail in rest(pos + l):
+                yield [j] + tail
+
+    yield from rest(0)
+
+def _uniquely_decodable(codes):
+    # Sardinas-Patterson: no string is the concatenation of two different code sequences
+    codes = set(codes)
+
+    def dangling(a, b):
+        return {y[len(x):] for x in a for y in b if len(y) > len(x) and y.startswith(x)}
+
+    suffixes = dangling(codes, codes)
+    seen = set()
+    while suffixes:
+        if suffixes & codes:
+            return False
+        key = frozenset(suffixes)
+        if key in seen:
             return True
-    return False
+        seen.add(key)
+        suffixes = dangling(suffixes, codes) | dangling(codes, suffixes)
+    return True
 
-def generate_wifi_passwords_ui():
-    clear()
-    banner()
-    draw_box(
-        [
-            f"WiFi sifresi uretici",
-            "Kurallar:",
-            "- Uzunluk: 10 ile 12 karakter (rastgele secilir)",
-            "- Ozel karakter: en fazla 2 tane (bazilarinda 0 olabilir)",
-            "- Her sifrede en az bir buyuk harf ve bir kucuk harf olacak",
-            "- Aynı karakter 3 defadan fazla yan yana olamaz",
-            "- Benzersiz satırlar olusturulur"
-        ],
-        title="WIFI GENERATOR",
-        color=C.BRIGHT_BLUE
-    )
+def _case_parses_differ(pool, variants):
+    """
+    Whether two parses of some skeleton can spell it differently. Parses
+    that agree on where the tokens with several spellings sit give the same
+    spellings, so the tokens with one spelling are split into single
+    characters first: "19", "90" and "1990" stay harmless, while "ali" next
+    to "al" and "i" (or "1a" next to "a") do not. May say True for a pool
+    that is fine; that only costs speed.
+    """
+    cased = {t for t, vs in zip(pool, variants) if len(vs) > 1}
+    plain = {t[k:k + 1] for t, vs in zip(pool, variants) if len(vs) <= 1 for k in range(len(t))}
+    return bool(cased & plain) or not _uniquely_decodable(cased | plain)
 
-    try:
-        count = int(ask("Kac satir uretmek istiyorsunuz?", "1000"))
-        if count <= 0:
-            print(center(C.BRIGHT_RED + "Sayi pozitif olmalidir." + C.RESET))
-            time.sleep(1.2)
+def _straddle_suffixes(tokens):
+    # For token t: the heads x of pool tokens u = x + y where y is a non-empty
+    # prefix of t. Only a prefix ending in one of these can be re-parsed with a
+    # token crossing into t, so everything else skips the full check.
+    out = []
+    for t in tokens:
+        heads = set()
+        for u in tokens:
+            for k in range(1, len(u)):
+                if t.startswith(u[k:]):
+                    heads.add(u[:k])
+        out.append(tuple(heads))
+    return out
+
+def _iter_unique_sequences(tokens, min_len, max_len, prefix=(), subtree=True, resume_after=None, with_path=False,
+                           constraints=None):
+    # with_path: yield (s, path, i) instead, where s is path + [i] and path is
+    # the live list of the walk (valid until the next item);
+    # constraints: a policy walker (see _PolicyWalk) for this pool
+    if constraints is not None:
+        yield from _iter_unique_constrained(tokens, min_len, max_len, prefix, subtree, resume_after, with_path,
+                                            constraints)
+        return
+    lens = _check_tokens(tokens)
+    index = {}
+    for i, t in enumerate(tokens):
+        index.setdefault(t, i)
+    len_set = sorted(set(lens))
+    # tokens that are themselves a non-canonical parse (a duplicate, or "19"
+    # after "1" and "9") never appear in a canonical sequence
+    live = [i for i, t in enumerate(tokens) if _is_canonical(t, [i], index, lens, len_set)]
+    if not live:
+        return
+    empty = tokens[0][:0]
+    start = empty
+    for k in range(1, len(prefix) + 1):
+        start += tokens[prefix[k - 1]]
+        if not _is_canonical(start, prefix[:k], index, lens, len_set):
             return
-    except ValueError:
-        print(center(C.BRIGHT_RED + "Gecerli bir sayi giriniz." + C.RESET))
-        time.sleep(1.2)
+    L0 = len(start)
+    if L0 > max_len:
+        return
+    if prefix and L0 >= min_len and resume_after is None:
+        yield (start, list(prefix[:-1]), prefix[-1]) if with_path else start
+    min_tok = min(lens[i] for i in live)
+    if not subtree or L0 + min_tok > max_len:
         return
+    heads = _straddle_suffixes(tokens)
+    fits = [[(i, tokens[i], lens[i], heads[i]) for i in live if lens[i] <= r] for r in range(max_len + 1)]
+    path = list(prefix)
+    base_depth = len(path)
+    if resume_after:
+        fit_ids = [[e[0] for e in f] for f in fits]
+        stack, pushed = _resume_stack(tokens, lens, fits, fit_ids, max_len, min_tok, start, L0, resume_after)
+        # path holds the token taken at every stack level below the first
+        path.extend(resume_after if pushed else resume_after[:-1])
+        if not stack:
+            return
+    else:
+        stack = [(start, L0, iter(fits[max_len - L0]))]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        prefix, plen, it = stack[-1]
+        for i, t, tl, hs in it:
+            s = prefix + t
+            if hs and prefix.endswith(hs):
+                path.append(i)
+                alive = _is_canonical(s, path, index, lens, len_set)
+                path.pop()
+                if not alive:
+                    continue
+            L = plen + tl
+            if L >= min_len:
+                yield (s, path, i) if with_path else s
+            if L + min_tok <= max_len:
+                push((s, L, iter(fits[max_len - L])))
+                path.append(i)
+                break
+        else:
+            pop()
+            if len(path) > base_depth:
+                path.pop()
 
-    if count >= 100000:
-        confirm = ask(f"{count:,} satir uretilecek. Devam etmek istiyor musunuz? (E/h)", "h").strip().lower()
-        if not confirm.startswith("e"):
-            print(center(C.BRIGHT_YELLOW + "Iptal edildi." + C.RESET))
-            time.sleep(1.0)
+def _iter_unique_constrained(tokens, min_len, max_len, prefix, subtree, resume_after, with_path, walk):
+    # _iter_unique_sequences with a policy state on every stack level; kept
+    # apart so the unconstrained walk does not pay for the extra step
+    lens = _check_tokens(tokens)
+    index, len_set = _parse_index(tokens)
+    live = [i for i, t in enumerate(tokens) if _is_canonical(t, [i], index, lens, len_set)]
+    if not live:
+        return
+    start = tokens[0][:0]
+    for k in range(1, len(prefix) + 1):
+        start += tokens[prefix[k - 1]]
+        if not _is_canonical(start, prefix[:k], index, lens, len_set):
+            return
+    L0 = len(start)
+    state = walk.prefix_state(prefix)
+    if L0 > max_len or state is None:
+        return
+    min_tok = min(lens[i] for i in live)
+    sat, reach = walk.sat, walk.reach(min_tok)
+    if prefix and L0 >= min_len and resume_after is None and sat[state[0]]:
+        yield (start, list(prefix[:-1]), prefix[-1]) if with_path else start
+    if not subtree or L0 + reach[state[0]] > max_len:
+        return
+    heads = _straddle_suffixes(tokens)
+    fits = [[(i, tokens[i], lens[i], heads[i]) for i in live if lens[i] <= r] for r in range(max_len + 1)]
+    path = list(prefix)
+    base_depth = len(path)
+    if resume_after:
+        fit_ids = [[e[0] for e in f] for f in fits]
+        stack, pushed = _resume_stack(tokens, lens, fits, fit_ids, max_len, min_tok, start, L0, resume_after)
+        stack = [entry + (st,) for entry, st in zip(stack, _resume_states(walk, state, resume_after))]
+        path.extend(resume_after if pushed else resume_after[:-1])
+        if not stack:
             return
+    else:
+        stack = [(start, L0, iter(fits[max_len - L0]), state)]
+    step = walk.step
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        prefix, plen, it, state = stack[-1]
+        for i, t, tl, hs in it:
+            st = step(state, i)
+            if st is None:
+                continue
+            s = prefix + t
+            if hs and prefix.endswith(hs):
+                path.append(i)
+                alive = _is_canonical(s, path, index, lens, len_set)
+                path.pop()
+                if not alive:
+                    continue
+            L = plen + tl
+            if L >= min_len and sat[st[0]]:
+                yield (s, path, i) if with_path else s
+            if L + reach[st[0]] <= max_len:
+                push((s, L, iter(fits[max_len - L]), st))
+                path.append(i)
+                break
+        else:
+            pop()
+            if len(path) > base_depth:
+                path.pop()
 
-    out_path = ask("Kayit yolu", "wifi_wordlist.txt") or "wifi_wordlist.txt"
+# ------------------- Core: Password policy -------------------
+# Audit targets come with policies ("8+ chars, a digit and an upper case
+# letter"). A PasswordPolicy is checked on the character classes of a
+# prefix while the walk builds it, so a branch that can no longer comply is
+# cut instead of being generated and thrown away downstream.
+POLICY_CLASSES = {"lower": 1, "upper": 2, "digit": 4, "special": 8}
+_POLICY_ALIASES = {"lower": "lower", "l": "lower", "kucuk": "lower",
+                   "upper": "upper", "u": "upper", "buyuk": "upper",
+                   "digit": "digit", "d": "digit", "rakam": "digit",
+                   "special": "special", "s": "special", "ozel": "special"}
+_POLICY_KEYS = {"sinif": "min_classes", "classes": "min_classes", "zorunlu": "require", "require": "require",
+                "tekrar": "max_repeat", "repeat": "max_repeat", "ozel": "max_specials", "specials": "max_specials"}
 
-    specials_raw = ask(f"Ozel karakterler (opsiyonel, default: {DEFAULT_SPECIALS})", DEFAULT_SPECIALS)
-    specials = list(specials_raw.strip()) if specials_raw.strip() else list(DEFAULT_SPECIALS)
-    # dedupe specials
-    specials = list(dict.fromkeys([c for c in specials if not c.isspace()]))
+def _char_class(ch):
+    # bytes iterate as ints; raw pools are ASCII
+    if isinstance(ch, int):
+        ch = chr(ch)
+    if ch.isupper():
+        return 2
+    if ch.islower():
+        return 1
+    if ch.isdigit():
+        return 4
+    return 8
 
-    uppercase = [chr(i) for i in range(ord("A"), ord("Z")+1)]
-    lowercase = [chr(i) for i in range(ord("a"), ord("z")+1)]
-    digits = [str(i) for i in range(10)]
-    pool_others = uppercase + lowercase + digits
+def _class_mask(chars):
+    mask = 0
+    for ch in chars:
+        mask |= _char_class(ch)
+    return mask
 
-    min_len = 10
-    max_len = 12
+def parse_policy(text):
+    # "sinif=3 zorunlu=buyuk,rakam tekrar=2 ozel=1" -> PasswordPolicy, None if empty
+    kwargs = {}
+    for item in (text or "").split():
+        key, sep, value = item.partition("=")
+        name = _POLICY_KEYS.get(key.strip().lower())
+        if not sep or name is None:
+            raise ValueError(f"gecersiz politika: {item} (orn: sinif=3 zorunlu=buyuk,rakam tekrar=2 ozel=1)")
+        if name == "require":
+            kwargs[name] = [v for v in value.split(",") if v]
+        elif value.strip().isdigit():
+            kwargs[name] = int(value)
+        else:
+            raise ValueError(f"gecersiz politika degeri: {item}")
+    return PasswordPolicy(**kwargs) if kwargs else None
 
-    written = 0
-    seen_hashes = set()
-    buffer = []
-    BUF_FLUSH = 5000
-    progress_last = time.time()
-    start_time = time.time()
+class PasswordPolicy:
+    """
+    What a candidate must contain: at least min_classes of the classes
+    lower/upper/digit/special, every class in require, no run of more than
+    max_repeat equal characters and at most max_specials specials (None =
+    no limit). A prefix's state is (classes mask, specials, last char, run);
+    feed() moves it along a string and returns None once a limit is broken,
+    which no extension can repair.
+    """
 
-    def print_progress():
-        elapsed = time.time() - start_time
-        rate = written / elapsed if elapsed > 0 else 0.0
-        pct = (written / count) * 100 if count > 0 else 100.0
-        line = f"Yazilan: {written:,} | Dosya: {format_mb(os.path.getsize(out_path) if os.path.exists(out_path) else 0)} | Hedef: {count:,} | %Tamamlandi: {pct:.2f}% | Ortalama/s: {rate:.1f}"
-        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+    START = (0, 0, None, 0)
 
-    try:
-        with open(out_path, "w", encoding="utf-8") as f:
-            attempts_total = 0
-            # safety: cap attempts to avoid infinite loop if pool impossible
-            max_attempts = max(10 * count, 10_000_000)
-            while written < count and attempts_total < max_attempts:
-                attempts_total += 1
-                length = random.randint(min_len, max_len)
-                # ensure room for at least 1 upper and 1 lower
-                max_specials_allowed = min(2, length - 2)
-                num_specials = random.randint(0, max_specials_allowed) if max_specials_allowed >= 0 else 0
-                # choose positions
-                positions = list(range(length))
-                special_positions = set(random.sample(positions, num_specials)) if num_specials > 0 else set()
-                non_special_positions = [p for p in positions if p not in special_positions]
-                # ensure at least one upper and one lower among non-special positions
-                if len(non_special_positions) < 2:
-                    continue  # try again with different num_specials/length
-                upper_pos = random.choice(non_special_positions)
-                lower_pos = random.choice([p for p in non_special_positions if p != upper_pos])
-                chars = [""] * length
-                for i in range(length):
-                    if i in special_positions:
-                        chars[i] = random.choice(specials)
-                    elif i == upper_pos:
-                        chars[i] = random.choice(uppercase)
-                    elif i == lower_pos:
-                        chars[i] = random.choice(lowercase)
-                    else:
-                        chars[i] = random.choice(pool_others)
-                candidate = "".join(chars)
-                # enforce no triple repeats
-                if _has_triple_repeat(candidate):
-                    continue
-                # compute truncated hash and uniqueness
-                h = _truncated_hash64(candidate)
-                if h in seen_hashes:
-                    continue
-                # accept
-                seen_hashes.add(h)
-                buffer.append(candidate + "\n")
-                written += 1
-                # flush buffer occasionally
-                if len(buffer) >= BUF_FLUSH:
-                    f.write("".join(buffer))
-                    f.flush()
-                    buffer.clear()
-                now = time.time()
-                if (now - progress_last) >= 0.5:
-                    print_progress()
-                    progress_last = now
-            # final flush
-            if buffer:
-                f.write("".join(buffer))
-                f.flush()
-    except KeyboardInterrupt:
-        print()
-        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu." + C.RESET))
-        return
+    def __init__(self, min_classes=0, require=(), max_repeat=None, max_specials=None):
+        required = 0
+        for name in require:
+            cls = _POLICY_ALIASES.get(name.strip().lower())
+            if cls is None:
+                raise ValueError(f"bilinmeyen karakter sinifi: {name} (lower/upper/digit/special)")
+            required |= POLICY_CLASSES[cls]
+        if not 0 <= min_classes <= len(POLICY_CLASSES):
+            raise ValueError(f"sinif sayisi 0-{len(POLICY_CLASSES)} arasinda olmali: {min_classes}")
+        if max_repeat is not None and max_repeat < 1:
+            raise ValueError(f"tekrar siniri en az 1 olmali: {max_repeat}")
+        if max_specials is not None and max_specials < 0:
+            raise ValueError(f"ozel karakter siniri negatif olamaz: {max_specials}")
+        self.min_classes, self.required = min_classes, required
+        self.max_repeat, self.max_specials = max_repeat, max_specials
+        # sat[mask]: a line with exactly these classes complies
+        self.sat = [(m & required) == required and bin(m).count("1") >= min_classes
+                    for m in range(1 << len(POLICY_CLASSES))]
 
-    if written < count:
-        print()
-        print(center(C.BRIGHT_YELLOW + f"Uyari: hedefe ulasilamadi. Uretilen: {written:,}" + C.RESET))
-    else:
-        print()
-        print(center(C.BRIGHT_GREEN + f"Tamamlandi: {written:,} satir uretildi -> {out_path}" + C.RESET))
-    print()
+    def __str__(self):
+        # the parse_policy form
+        parts = [f"sinif={self.min_classes}"] if self.min_classes else []
+        if self.required:
+            parts.append("zorunlu=" + ",".join(self.describe()["require"]))
+        if self.max_repeat is not None:
+            parts.append(f"tekrar={self.max_repeat}")
+        if self.max_specials is not None:
+            parts.append(f"ozel={self.max_specials}")
+        return " ".join(parts) or "-"
 
-# ------------------- Flow: Menu -------------------
-def main_menu():
+    def describe(self):
+        # plain dict for summaries and checkpoint fingerprints
+        return {"min_classes": self.min_classes,
+                "require": [c for c, bit in POLICY_CLASSES.items() if self.required & bit],
+                "max_repeat": self.max_repeat, "max_specials": self.max_specials}
+
+    def feed(self, state, s):
+        mask, specials, last, run = state
+        rep, spec = self.max_repeat, self.max_specials
+        for ch in s:
+            c = _char_class(ch)
+            mask |= c
+            if c == 8 and spec is not None:
+                specials += 1
+                if specials > spec:
+                    return None
+            if rep is not None:
+                run = run + 1 if ch == last else 1
+                if run > rep:
+                    return None
+                last = ch
+        return mask, specials, last, run
+
+    def check(self, s):
+        state = self.feed(self.START, s)
+        return state is not None and self.sat[state[0]]
+
+    def walker(self, tokens, masks=None):
+        return _PolicyWalk(self, tokens, masks)
+
+class _PolicyWalk:
+    # A PasswordPolicy bound to one pool: token steps memoised per state, and
+    # need[mask], the fewest characters any token sequence needs to complete
+    # the classes. masks (class mask per token) gives the relaxed walk over a
+    # case skeleton: classes any spelling may add, specials counted, runs not
+    # (a spelling can break a run), so the expanded lines are still checked.
+
+    def __init__(self, policy, tokens, masks=None):
+        self.policy, self.tokens, self.masks = policy, tokens, masks
+        self.sat = policy.sat
+        self._memo = {}
+        if masks is not None:
+            self._specials = [sum(_char_class(ch) == 8 for ch in t) for t in tokens]
+        usable = []
+        for i, t in enumerate(tokens):
+            state = self.step(PasswordPolicy.START, i)
+            if state is not None:
+                usable.append((state[0], len(t)))
+        full = len(self.sat)
+        need = [math.inf] * full
+        for m in range(full - 1, -1, -1):
+            if self.sat[m]:
+                need[m] = 0
+                continue
+            for tm, tl in usable:
+                if tm | m != m:
+                    need[m] = min(need[m], tl + need[m | tm])
+        self.need = need
+
+    def step(self, state, i):
+        key = (state, i)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        if self.masks is None:
+            new = self.policy.feed(state, self.tokens[i])
+        else:
+            specials = state[1] + self._specials[i]
+            limit = self.policy.max_specials
+            new = None if limit is not None and specials > limit else (state[0] | self.masks[i], specials, None, 0)
+        self._memo[key] = new
+        return new
+
+    def prefix_state(self, path):
+        state = PasswordPolicy.START
+        for i in path:
+            state = self.step(state, i)
+            if state is None:
+                return None
+        return state
+
+    def reach(self, min_tok):
+        # reach[mask]: characters a prefix must still have room for to be worth descending into
+        return [max(min_tok, n) for n in self.need]
+
+def _policy_walk(constraints, tokens):
+    # PasswordPolicy -> walker for `tokens`; walkers pass through, None stays None
+    if constraints is None or isinstance(constraints, _PolicyWalk):
+        return constraints
+    return constraints.walker(tokens)
+
+# ------------------- Core: Case expansion -------------------
+class CaseExpander:
+    """
+    Case variants applied per emitted string instead of per pool token. The
+    walk runs over a lower-case skeleton pool (one token per spelling), so
+    its branching factor does not grow with the variants; every skeleton it
+    yields is split along its canonical parse and expanded lazily as the
+    product of those tokens' variants. Distinct skeletons never share a
+    variant, so dedup only ever has to look at skeletons.
+
+    Other parses can spell a skeleton differently: under "first", "ali"
+    gives Ali but "al" + "i" also AlI. When the pool allows that (see
+    _case_parses_differ), a skeleton's spellings are the union over all of
+    its parses, deduplicated per skeleton, as with the variants in the pool.
+
+    constraints (a PasswordPolicy) prunes the skeleton walk on what any
+    spelling could still reach and drops the spellings that do not comply.
+    cache (a dict) shares the per-token variant lists between expanders,
+    e.g. across the targets of run_batch.
+    """
+
+    def __init__(self, tokens, policy=CASE_POLICY, raw=False, constraints=None, cache=None):
+        cache = {} if cache is None else cache
+        variants = {}
+        for t in tokens:
+            key = t.lower() if len(t.lower()) == len(t) else t
+            if key not in variants:
+                if (t, policy) not in cache:
+                    cache[t, policy] = case_policy_variants(t, policy) or [t]
+                variants[key] = cache[t, policy]
+        self.policy = policy
+        self.pool = list(variants)
+        self.variants = [variants[k] for k in self.pool]
+        if raw:
+            self.pool = [t.encode("ascii") for t in self.pool]
+            self.variants = [[v.encode("ascii") for v in vs] for vs in self.variants]
+        self._index, self._len_set = _parse_index(self.pool) if self.pool else ({}, [])
+        self.constraints = constraints
+        # every letter of an uncapped "all" token varies on its own, so any parse spells the same set
+        letterwise = policy == "all" and all(2 ** sum(ch.isalpha() for ch in t) <= MAX_VARIANTS_PER_TOKEN
+                                             for t in variants)
+        self._all_parses = not letterwise and _case_parses_differ(self.pool, self.variants)
+
+    def expand(self, s):
+        # every (compliant) spelling of skeleton s, in product order of its tokens
+        join, variants = s[:0].join, self.variants
+        if self._all_parses:
+            lines = dict.fromkeys(line for path in _all_paths(s, self._index, self._len_set)
+                                  for line in map(join, itertools.product(*[variants[i] for i in path])))
+        else:
+            path = _canonical_path(s, self.pool, self._index, self._len_set)
+            lines = map(join, itertools.product(*[variants[i] for i in path]))
+        return lines if self.constraints is None else filter(self.constraints.check, lines)
+
+    def expand_all(self, skeletons):
+        for s in skeletons:
+            yield from self.expand(s)
+
+    def walk(self, min_len, max_len, prefix=(), subtree=True, resume_after=None):
+        """
+        (skeleton, variants) for the canonical walk over the skeleton pool
+        (arguments as in iter_sequences); variants may be shared, read only. The walk already knows each
+        skeleton's tokens, so nothing is re-parsed, and the spellings of the
+        shared prefix are built once for all its children.
+        """
+        if max_len <= 0 or not self.pool:
+            return
+        if resume_after is not None:
+            resume_after = tuple(resume_after)
+        if self._all_parses:
+            # the spellings come from every parse, not just the walk's path: no
+            # prefix sharing, and the policy can only be checked per spelling
+            for s in _iter_unique_sequences(self.pool, min_len, max_len, tuple(prefix), subtree, resume_after):
+                lines = list(self.expand(s))
+                if lines:
+                    yield s, lines
+            return
+        variants = self.variants
+        walk = check = None
+        if self.constraints is not None:
+            masks = [_class_mask(ch for v in vs for ch in v) for vs in variants]
+            walk = self.constraints.walker(self.pool, masks)
+            check = self.constraints.check
+        lens = [len(t) for t in self.pool]
+        # the token spells only as itself: nothing to expand
+        plain = [vs == [t] for t, vs in zip(self.pool, variants)]
+        # heads[m]: (prefix, its spellings or None if plain) for the current
+        # prefix of length m; a new prefix extends its parent's entry
+        heads = [None] * (max_len + 1)
+
+        def head_of(p, path, d):
+            entry = heads[len(p)]
+            if entry is not None and entry[0] == p:
+                return entry[1]
+            if d == 0:
+                head = None
+            else:
+                j = path[d - 1]
+                parent = head_of(p[:len(p) - lens[j]], path, d - 1)
+                if parent is None and plain[j]:
+                    head = None
+                else:
+                    head = [a + b for a in (parent or [p[:len(p) - lens[j]]]) for b in variants[j]]
+            heads[len(p)] = (p, head)
+            return head
+
+        for s, path, i in _iter_unique_sequences(self.pool, min_len, max_len, tuple(prefix), subtree, resume_after,
+                                                 with_path=True, constraints=walk):
+            p = s[:len(s) - lens[i]]
+            entry = heads[len(p)]
+            head = entry[1] if entry is not None and entry[0] == p else head_of(p, path, len(path))
+            if head is None:
+                lines = [s] if plain[i] else [p + b for b in variants[i]]
+            else:
+                lines = [a + b for a in head for b in variants[i]]
+            if check is not None:
+                lines = [v for v in lines if check(v)]
+                if not lines:
+                    continue
+            yield s, lines
+
+    def lines(self, min_len, max_len, prefix=(), subtree=True):
+        # the expanded canonical walk, one spelling at a time
+        for _, variants in self.walk(min_len, max_len, prefix, subtree):
+            yield from variants
+
+# ------------------- Core: Mangling rules -------------------
+# A practical subset of the hashcat/john rule language. A rule is a run of
+# functions applied left to right; positions N/M are 0-9 then A-Z (10-35).
+#
+#   :  noop            l  lower           u  upper          c  Capitalize
+#   C  cAPITALIZE      t  toggle case     TN toggle at N    r  reverse
+#   d  duplicate       pN N+1 copies      f  reflect        {  rotate left
+#   }  rotate right    $X append X        ^X prepend X      [  delete first
+#   ]  delete last     DN delete at N     'N truncate at N  xNM extract M from N
+#   ONM omit M from N  iNX insert X at N  oNX overwrite N   sXY replace X with Y
+#   @X purge X         zN first char N+  ZN last char N+   q  double every char
+#   k  swap first two  K  swap last two   yN first N chars twice  YN last N twice
+#
+# e.g. "sa@ so0 $1" turns "toptas" into "t0pt@s1".
+_RULE_POS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def _rule_funcs(empty):
+    # name -> (argument kinds, builder); the builder gets the parsed arguments
+    # and returns the word -> word function. N is a position, X a character.
+    def at(w, n, f):
+        return f(w, n) if n < len(w) else w
+
+    return {
+        ":": ("", lambda: lambda w: w),
+        "l": ("", lambda: lambda w: w.lower()),
+        "u": ("", lambda: lambda w: w.upper()),
+        "c": ("", lambda: lambda w: w[:1].upper() + w[1:].lower()),
+        "C": ("", lambda: lambda w: w[:1].lower() + w[1:].upper()),
+        "t": ("", lambda: lambda w: w.swapcase()),
+        "T": ("N", lambda n: lambda w: at(w, n, lambda w, n: w[:n] + w[n:n + 1].swapcase() + w[n + 1:])),
+        "r": ("", lambda: lambda w: w[::-1]),
+        "d": ("", lambda: lambda w: w + w),
+        "p": ("N", lambda n: lambda w: w * (n + 1)),
+        "f": ("", lambda: lambda w: w + w[::-1]),
+        "{": ("", lambda: lambda w: w[1:] + w[:1]),
+        "}": ("", lambda: lambda w: w[-1:] + w[:-1]),
+        "$": ("X", lambda x: lambda w: w + x),
+        "^": ("X", lambda x: lambda w: x + w),
+        "[": ("", lambda: lambda w: w[1:]),
+        "]": ("", lambda: lambda w: w[:-1]),
+        "D": ("N", lambda n: lambda w: w[:n] + w[n + 1:]),
+        "'": ("N", lambda n: lambda w: w[:n]),
+        "x": ("NN", lambda n, m: lambda w: w[n:n + m] if n + m <= len(w) else w),
+        "O": ("NN", lambda n, m: lambda w: w[:n] + w[n + m:] if n + m <= len(w) else w),
+        "i": ("NX", lambda n, x: lambda w: w[:n] + x + w[n:] if n <= len(w) else w),
+        "o": ("NX", lambda n, x: lambda w: at(w, n, lambda w, n: w[:n] + x + w[n + 1:])),
+        "s": ("XX", lambda x, y: lambda w: w.replace(x, y)),
+        "@": ("X", lambda x: lambda w: w.replace(x, empty)),
+        "z": ("N", lambda n: lambda w: w[:1] * n + w),
+        "Z": ("N", lambda n: lambda w: w + w[-1:] * n),
+        "q": ("", lambda: lambda w: empty.join(w[i:i + 1] * 2 for i in range(len(w)))),
+        "k": ("", lambda: lambda w: w[1:2] + w[:1] + w[2:]),
+        "K": ("", lambda: lambda w: w[:-2] + w[-1:] + w[-2:-1] if len(w) >= 2 else w),
+        "y": ("N", lambda n: lambda w: w[:n] + w if n <= len(w) else w),
+        "Y": ("N", lambda n: lambda w: w + w[len(w) - n:] if n <= len(w) else w),
+    }
+
+# functions that keep distinct words of one length distinct; a rule built only from these
+# gives an exact --estimate (see count_with_rules), anything else an upper bound
+_RULE_ONE_TO_ONE = set(":tTrdpf{}$^izZqkKyY")
+
+def _parse_rule(rule: str, raw=False):
+    # -> [(name, args)]; raises ValueError on an unknown function or a missing argument
+    funcs = _rule_funcs(b"" if raw else "")
+    steps = []
+    i = 0
+    while i < len(rule):
+        name = rule[i]
+        i += 1
+        if name.isspace():
+            continue
+        if name not in funcs:
+            raise ValueError(f"bilinmeyen kural fonksiyonu: {name!r} ({rule})")
+        args = []
+        for kind in funcs[name][0]:
+            if i >= len(rule):
+                raise ValueError(f"eksik arguman: {name!r} ({rule})")
+            ch = rule[i]
+            i += 1
+            if kind == "N":
+                if ch not in _RULE_POS:
+                    raise ValueError(f"gecersiz pozisyon: {ch!r} ({rule})")
+                args.append(_RULE_POS.index(ch))
+            else:
+                args.append(ch.encode("utf-8") if raw else ch)
+        steps.append((name, args))
+    return steps
+
+def compile_rule(rule: str, raw=False):
+    """
+    Parses one rule into a single word -> word callable (str, or bytes when
+    raw). Raises ValueError on an unknown function or a missing argument.
+    """
+    funcs = _rule_funcs(b"" if raw else "")
+    steps = [funcs[name][1](*args) for name, args in _parse_rule(rule, raw)]
+    if not steps:
+        return funcs[":"][1]()
+    if len(steps) == 1:
+        return steps[0]
+
+    def apply(w):
+        for step in steps:
+            w = step(w)
+        return w
+    return apply
+
+def load_rules(path):
+    # one rule per line; blank lines and "#" comments are skipped
+    rules = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            try:
+                compile_rule(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{n}: {e}") from None
+            rules.append(line)
+    return rules
+
+def rule_length(rule, L):
+    # (output length for an input of length L, exact?) for the estimate
+    dummy = compile_rule(rule)("\x01" * L)
+    return len(dummy), all(name in _RULE_ONE_TO_ONE for name, _ in _parse_rule(rule))
+
+class RuleStage:
+    """
+    Streaming mangling stage between case expansion and the output: every
+    line goes through each rule; results outside [min_len, max_len] are
+    dropped. Two rules (or two lines) can give the same word, so results
+    pass through a hash dedup (RULES_DEDUP) and each one is written once.
+    A rule can add or remove any class, so constraints (a PasswordPolicy)
+    are checked here, on the mangled words.
+    """
+
+    def __init__(self, rules, min_len, max_len, raw=False, dedup=None, constraints=None):
+        self.rules = list(rules)
+        self.min_len, self.max_len, self.raw = min_len, max_len, raw
+        self.constraints = constraints
+        self.dedup = dedup or RULES_DEDUP
+        self._funcs = [compile_rule(r, raw) for r in self.rules]
+        self.seen = make_dedup(self.dedup)
+
+    def __getstate__(self):
+        # compiled rules are closures; workers compile their own
+        return {k: v for k, v in self.__dict__.items() if k != "_funcs"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._funcs = [compile_rule(r, self.raw) for r in self.rules]
+
+    def _hash(self, w):
+        return int.from_bytes(hashlib.blake2b(w if self.raw else w.encode("utf-8"), digest_size=8).digest(),
+                              "little")
+
+    def apply_many(self, lines):
+        out = []
+        lo, hi, add, h = self.min_len, self.max_len, self.seen.add, self._hash
+        check = self.constraints.check if self.constraints is not None else None
+        for line in lines:
+            for f in self._funcs:
+                w = f(line)
+                if lo <= len(w) <= hi and w and (check is None or check(w)) and add(h(w)):
+                    out.append(w)
+        return out
+
+    def prime(self, lines):
+        # lines already written (resume): their repeats are not written again
+        for line in lines:
+            self.seen.add(self._hash(line))
+
+def count_with_rules(counts, line_bytes, exact, rules, min_len, max_len):
+    """
+    Moves a per-length estimate through the rules: each rule maps length L
+    to one output length, so the result stays per length. It is exact only
+    for a single rule made of one-to-one functions (_RULE_ONE_TO_ONE) that
+    sends no two lengths to the same one; several rules, or rules like ]
+    'N sXY l whose output can repeat, make it an upper bound (exact False).
+    """
+    out_counts = [0] * len(counts)
+    out_bytes = [0] * len(counts)
+    for rule in rules:
+        targets = set()
+        for L, n in enumerate(counts):
+            if not n:
+                continue
+            L2, static = rule_length(rule, L)
+            exact = exact and static and L2 not in targets
+            targets.add(L2)
+            if max(min_len, 1) <= L2 <= max_len:
+                out_counts[L2] += n
+                out_bytes[L2] += line_bytes[L] * (L2 + 1) // (L + 1)
+    return out_counts, out_bytes, exact and len(rules) <= 1
+
+# ------------------- Core: Templates -------------------
+# A template fixes the shape of a candidate instead of trying every ordering
+# of the flat pool: "{word}{number}{special}", "{w}.{n}" (text outside the
+# braces is literal). Each slot takes one token of its class; TEMPLATE_REPEAT
+# caps how often the same token may appear in one candidate.
+TEMPLATE_CLASSES = {"word": "word", "w": "word", "kelime": "word",
+                    "number": "number", "n": "number", "sayi": "number",
+                    "special": "special", "s": "special", "ozel": "special"}
+
+def parse_template(template: str):
+    # -> (slots, tail): slots are (literal before, class), tail the literal after the last slot
+    slots = []
+    lit = []
+    i = 0
+    while i < len(template):
+        ch = template[i]
+        if ch == "{":
+            end = template.find("}", i)
+            if end < 0:
+                raise ValueError(f"kapanmayan '{{': {template}")
+            name = template[i + 1:end].strip().lower()
+            if name not in TEMPLATE_CLASSES:
+                raise ValueError(f"bilinmeyen sinif: {{{name}}} ({template})")
+            slots.append(("".join(lit), TEMPLATE_CLASSES[name]))
+            lit = []
+            i = end + 1
+        elif ch == "}":
+            raise ValueError(f"acilmayan '}}': {template}")
+        else:
+            lit.append(ch)
+            i += 1
+    if not slots:
+        raise ValueError(f"sablonda sinif yok: {template}")
+    return slots, "".join(lit)
+
+def parse_repeat(items):
+    # ["word=2", "special=3"] -> TEMPLATE_REPEAT with those classes overridden
+    repeat = dict(TEMPLATE_REPEAT)
+    for item in items or ():
+        name, sep, value = item.partition("=")
+        name = name.strip().lower()
+        if not sep or name not in TEMPLATE_CLASSES or not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"gecersiz tekrar siniri: {item} (orn: word=2)")
+        repeat[TEMPLATE_CLASSES[name]] = int(value)
+    return repeat
+
+def _dual_mul(a, b):
+    # (count, bytes) pairs: the byte total of a product follows the product rule
+    return a[0] * b[0], a[0] * b[1] + a[1] * b[0]
+
+def _poly_mul(a, b, budget):
+    # product of two (count, bytes) polynomials in the length, cut at budget
+    out = [(0, 0)] * (budget + 1)
+    for i, x in enumerate(a):
+        if not x[0] and not x[1]:
+            continue
+        for j in range(budget - i + 1):
+            y = b[j]
+            if y[0] or y[1]:
+                c, by = _dual_mul(x, y)
+                o = out[i + j]
+                out[i + j] = (o[0] + c, o[1] + by)
+    return out
+
+class TemplateSpace:
+    """
+    The candidates of one template over the token classes (a dict
+    class -> tokens), in slot order. case (a policy name) adds each token's
+    case variants to its class; variants of one token share its repeat
+    budget. counts[L] / line_bytes[L] are exact per length: the number of
+    slot fillings, so two fillings that spell the same string count twice.
+    """
+
+    def __init__(self, template, classes, min_len, max_len, repeat=None, case=None):
+        self.template = template
+        self.min_len, self.max_len = min_len, max_len
+        self.repeat = dict(TEMPLATE_REPEAT, **(repeat or {}))
+        self.slots, self.tail = parse_template(template)
+        # class -> [(variant, group)]; group is the source token's index
+        self.options = {}
+        for cls in set(c for _, c in self.slots):
+            opts = []
+            for g, t in enumerate(dict.fromkeys(classes.get(cls) or ())):
+                for v in (case_policy_variants(t, case) if case else [t]):
+                    opts.append((v, g))
+            self.options[cls] = opts
+        self.counts, self.line_bytes = self._count()
+        self.total = sum(self.counts)
+
+    def _class_poly(self, cls, m, budget):
+        # poly[L] = (ordered m-tuples of the class with total length L, their bytes),
+        # each token used at most repeat[cls] times: m! [x^m] prod_g sum_k (x V_g)^k / k!
+        groups = {}
+        for v, g in self.options[cls]:
+            vg = groups.setdefault(g, [(0, 0)] * (budget + 1))
+            if len(v) <= budget:
+                c, b = vg[len(v)]
+                vg[len(v)] = (c + 1, b + len(v.encode("utf-8")))
+        limit = self.repeat[cls]
+        zero = (Fraction(0), Fraction(0))
+        # egf[j][L]
+        egf = [[zero] * (budget + 1) for _ in range(m + 1)]
+        egf[0][0] = (Fraction(1), Fraction(0))
+        for vg in groups.values():
+            # powers of V_g up to min(limit, m)
+            powers = [[(1, 0)] + [(0, 0)] * budget]
+            for _ in range(min(limit, m)):
+                powers.append(_poly_mul(powers[-1], vg, budget))
+            new = [row[:] for row in egf]
+            for k in range(1, len(powers)):
+                fk = math.factorial(k)
+                pk = powers[k]
+                for j in range(m - k + 1):
+                    row = egf[j]
+                    out = new[j + k]
+                    for L, a in enumerate(row):
+                        if not a[0] and not a[1]:
+                            continue
+                        for L2 in range(budget - L + 1):
+                            p = pk[L2]
+                            if p[0] or p[1]:
+                                c, b = _dual_mul(a, p)
+                                o = out[L + L2]
+                                out[L + L2] = (o[0] + Fraction(c, fk), o[1] + Fraction(b, fk))
+            egf = new
+        fm = math.factorial(m)
+        return [(int(c * fm), int(b * fm)) for c, b in egf[m]]
+
+    def _count(self):
+        lit = sum(len(l) for l, _ in self.slots) + len(self.tail)
+        lit_bytes = sum(len(l.encode("utf-8")) for l, _ in self.slots) + len(self.tail.encode("utf-8"))
+        budget = self.max_len - lit
+        counts = [0] * (self.max_len + 1)
+        line_bytes = [0] * (self.max_len + 1)
+        if budget < 0:
+            return counts, line_bytes
+        total = [(1, 0)] + [(0, 0)] * budget
+        per_class = {}
+        for _, cls in self.slots:
+            per_class[cls] = per_class.get(cls, 0) + 1
+        for cls, m in per_class.items():
+            total = _poly_mul(total, self._class_poly(cls, m, budget), budget)
+        for L, (c, b) in enumerate(total):
+            if c and self.min_len <= L + lit:
+                counts[L + lit] = c
+                # + literal bytes and the newline on every line
+                line_bytes[L + lit] = b + c * (lit_bytes + 1)
+        return counts, line_bytes
+
+    def __iter__(self):
+        slots, tail, n = self.slots, self.tail, len(self.slots)
+        opts = [self.options[cls] for _, cls in slots]
+        limits = [self.repeat[cls] for _, cls in slots]
+        # length still to come after slot i (its literal included)
+        rest_min = [len(tail)] * (n + 1)
+        rest_max = [len(tail)] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            lens = [len(v) for v, _ in opts[i]] or [0]
+            rest_min[i] = rest_min[i + 1] + len(slots[i][0]) + min(lens)
+            rest_max[i] = rest_max[i + 1] + len(slots[i][0]) + max(lens)
+        if any(not o for o in opts):
+            return
+        used = {}
+
+        def walk(i, prefix):
+            prefix += slots[i][0]
+            lo = self.min_len - len(prefix) - rest_max[i + 1]
+            hi = self.max_len - len(prefix) - rest_min[i + 1]
+            cls, limit = slots[i][1], limits[i]
+            last = i + 1 == n
+            for v, g in opts[i]:
+                if not lo <= len(v) <= hi:
+                    continue
+                key = (cls, g)
+                k = used.get(key, 0)
+                if k >= limit:
+                    continue
+                if last:
+                    yield prefix + v + tail
+                else:
+                    used[key] = k + 1
+                    yield from walk(i + 1, prefix + v)
+                    used[key] = k
+
+        yield from walk(0, "")
+
+def template_spaces(templates, words=(), numbers=(), specials=(), min_len=4, max_len=12, repeat=None, case=None):
+    # one TemplateSpace per template, over the classes input_form already separates;
+    # building them runs the exact counts, so it is timed as counting
+    classes = {"word": list(words), "number": list(numbers), "special": list(specials)}
+    policy = _case_policy(case) if case else None
+    with stats_phase("counting"):
+        return [TemplateSpace(t, classes, min_len, max_len, repeat, policy) for t in templates]
+
+def iter_templates(spaces, dedup=None):
+    # candidates of every template in order; a line already seen (through the
+    # make_dedup backend `dedup`, default TEMPLATE_DEDUP) is dropped
+    seen = make_dedup(dedup or TEMPLATE_DEDUP)
+    add = seen.add
+    for space in spaces:
+        for s in space:
+            if add(_hash64(s)):
+                yield s
+
+# ------------------- Core: Best-first order -------------------
+# Candidates in descending estimated probability. A candidate's cost is
+# -log p summed over its parts (template, tokens, case variant, rule). The
+# search takes cost buckets of BEST_FIRST_BUCKET nats in order and re-runs a
+# depth-first pass for each one, cutting every branch already past the
+# bucket; the next bucket starts at the cheapest branch that was cut. The walk
+# needs O(depth) plus a sort buffer of at most BEST_FIRST_SORT_LINES lines, the
+# price is walking the cheap prefixes again for every bucket.
+# A line with two derivations (two parses, templates, rules) must come out
+# once, and the costlier one can turn up in any later bucket, so that takes a
+# table of the lines written. BestFirst.limit caps such runs at
+# BEST_FIRST_TOP lines; a pool where every line has one derivation keeps no
+# table and needs no cap.
+def parse_weights(items):
+    # ["word=3", "{w}{n}=5", "c=0.5", "omer=2", "case=0.2"] -> {name: weight}
+    weights = {}
+    for item in items or ():
+        name, sep, value = item.rpartition("=")
+        try:
+            w = float(value)
+        except ValueError:
+            w = 0.0
+        if not sep or not name or not 0 < w < math.inf:
+            raise ValueError(f"gecersiz agirlik: {item} (orn: word=3)")
+        weights[name] = w
+    return weights
+
+class BestFirst:
+    """
+    The lines run_wordlist (all orderings of the flat pool) or, with
+    templates, run_templates would write, cheapest first. weights maps a
+    class name, template, rule, token or "case" (any non-original spelling)
+    to a relative weight; classes default to BEST_FIRST_WEIGHTS, the rest
+    to 1. Iterating yields (cost, line); a line comes once, at the cheapest
+    bucket it was found in. The repeat table behind that grows with the
+    lines yielded (see limit); `unique` is True when no line has two
+    derivations and there is no table.
+    """
+
+    def __init__(self, words=(), numbers=(), specials=(), min_len=4, max_len=12, templates=None, case=None,
+                 rules=None, weights=None, repeat=None, dedup=None, bucket=BEST_FIRST_BUCKET):
+        self.min_len, self.max_len, self.bucket = min_len, max_len, bucket
+        self.dedup = dedup or BEST_FIRST_DEDUP
+        weights = dict(weights or {})
+        classes = {"word": _as_tokens(words), "number": _as_tokens(numbers), "special": _as_tokens(specials)}
+        templates = list(templates or ())
+        rules = list(rules or ())
+        known = set(TEMPLATE_CLASSES) | set(templates) | set(rules) | {"case"}
+        known.update(t for tokens in classes.values() for t in tokens)
+        unknown = [name for name in weights if name not in known and name.lower() not in TEMPLATE_CLASSES]
+        if unknown:
+            raise ValueError(f"bilinmeyen agirlik adi: {unknown[0]}")
+
+        self._class_w = dict(BEST_FIRST_WEIGHTS)
+        for name, w in weights.items():
+            if name.lower() in TEMPLATE_CLASSES:
+                self._class_w[TEMPLATE_CLASSES[name.lower()]] = w
+        self._weights = weights
+        self._case_w = weights.get("case", BEST_FIRST_CASE_WEIGHT)
+        self._policy = _case_policy(case) if case else None
+
+        funcs = [compile_rule(r) for r in rules] or [None]
+        self.rules = _costs([(f, weights.get(r, 1.0)) for f, r in zip(funcs, rules or [None])])
+        self._rmin, self._rmax = self.rules[0][0], self.rules[-1][0]
+
+        self.templates = []
+        if templates:
+            spaces = [TemplateSpace(t, classes, min_len, max_len, repeat) for t in templates]
+            units = {cls: self._units([(t, cls) for t in dict.fromkeys(tokens)]) for cls, tokens in classes.items()}
+            for tcost, space in _costs([(s, weights.get(s.template, 1.0)) for s in spaces]):
+                self.templates.append(self._template_plan(tcost, space, units))
+        else:
+            # a token given in two classes counts once, in the first
+            pool = {}
+            for cls, tokens in classes.items():
+                for t in tokens:
+                    pool.setdefault(t, cls)
+            self.units = self._units(list(pool.items()))
+        # without templates and rules a line has one derivation iff its spellings parse one way only
+        spellings = [v for _, v, _ in self.units] if not templates else []
+        self.unique = (not templates and not rules and len(set(spellings)) == len(spellings)
+                       and _uniquely_decodable(spellings))
+
+    def limit(self, top=None):
+        # the number of lines to take: top, else BEST_FIRST_TOP while the repeat table grows per line
+        if top is not None or self.unique:
+            return top
+        return BEST_FIRST_TOP
+
+    def _units(self, pairs):
+        # (token, class) pairs -> [(cost, spelling, token index)], cheapest first
+        if not pairs:
+            return []
+        tw = [self._class_w.get(cls, 1.0) * self._weights.get(t, 1.0) for t, cls in pairs]
+        z = sum(tw)
+        out = []
+        for g, ((t, _), w) in enumerate(zip(pairs, tw)):
+            spellings = case_policy_variants(t, self._policy) if self._policy else [t]
+            for vcost, v in _costs([(v, 1.0 if v == t else self._case_w) for v in spellings]):
+                out.append((-math.log(w / z) + vcost, v, g))
+        out.sort(key=lambda u: u[0])
+        return out
+
+    def _template_plan(self, tcost, space, units):
+        opts = [units[cls] for _, cls in space.slots]
+        n = len(opts)
+        # cost / length still to come from slot i on (rule included)
+        cmin, cmax = [self._rmin] * (n + 1), [self._rmax] * (n + 1)
+        lmin, lmax = [len(space.tail)] * (n + 1), [len(space.tail)] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            o = opts[i] or [(0.0, "", 0)]
+            cmin[i], cmax[i] = cmin[i + 1] + o[0][0], cmax[i + 1] + o[-1][0]
+            lens = [len(v) for _, v, _ in o]
+            lmin[i] = lmin[i + 1] + len(space.slots[i][0]) + min(lens)
+            lmax[i] = lmax[i + 1] + len(space.slots[i][0]) + max(lens)
+        return tcost, space, opts, cmin, cmax, lmin, lmax
+
+    def __iter__(self):
+        seen = None if self.unique else make_dedup(self.dedup)
+        b = 0
+        while True:
+            lo, hi = b * self.bucket, (b + 1) * self.bucket
+            self._next = math.inf
+            buf = []
+            walk = self._walk_templates if self.templates else self._walk_flat
+            for item in walk(lo, hi):
+                buf.append(item)
+                if len(buf) >= BEST_FIRST_SORT_LINES:
+                    yield from _flush_best(buf, seen)
+            yield from _flush_best(buf, seen)
+            if self._next == math.inf:
+                return
+            b = max(b + 1, int(self._next // self.bucket))
+
+    def _emit(self, s, cost, lo, hi):
+        for rc, f in self.rules:
+            c = cost + rc
+            if c >= hi:
+                self._next = min(self._next, c)
+                return
+            if c >= lo:
+                w = f(s) if f is not None else s
+                if w and self.min_len <= len(w) <= self.max_len:
+                    yield c, w
+
+    def _walk_flat(self, lo, hi):
+        units, min_len, max_len = self.units, self.min_len, self.max_len
+        if not units:
+            return
+        rmin = self._rmin
+        # past this the rest of a subtree already went out in an earlier bucket
+        tail_max = units[-1][0]
+
+        def walk(prefix, cost):
+            n = len(prefix)
+            if n >= min_len:
+                yield from self._emit(prefix, cost, lo, hi)
+            if n >= max_len or cost + (max_len - n) * tail_max + self._rmax < lo:
+                return
+            for c, v, _ in units:
+                nc = cost + c
+                if nc + rmin >= hi:
+                    self._next = min(self._next, nc + rmin)
+                    break
+                if n + len(v) <= max_len:
+                    yield from walk(prefix + v, nc)
+
+        yield from walk("", 0.0)
+
+    def _walk_templates(self, lo, hi):
+        min_len, max_len = self.min_len, self.max_len
+        for tcost, space, opts, cmin, cmax, lmin, lmax in self.templates:
+            if any(not o for o in opts):
+                continue
+            if tcost + cmin[0] >= hi:
+                self._next = min(self._next, tcost + cmin[0])
+                continue
+            if tcost + cmax[0] < lo:
+                continue
+            slots, tail, n = space.slots, space.tail, len(opts)
+            limits = [space.repeat[cls] for _, cls in slots]
+            used = {}
+
+            def walk(i, prefix, cost):
+                prefix += slots[i][0]
+                lo_len = min_len - len(prefix) - lmax[i + 1]
+                hi_len = max_len - len(prefix) - lmin[i + 1]
+                cls, limit = slots[i][1], limits[i]
+                for c, v, g in opts[i]:
+                    nc = cost + c
+                    if nc + cmin[i + 1] >= hi:
+                        self._next = min(self._next, nc + cmin[i + 1])
+                        break
+                    if nc + cmax[i + 1] < lo or not lo_len <= len(v) <= hi_len:
+                        continue
+                    key = (cls, g)
+                    k = used.get(key, 0)
+                    if k >= limit:
+                        continue
+                    if i + 1 == n:
+                        yield from self._emit(prefix + v + tail, nc, lo, hi)
+                    else:
+                        used[key] = k + 1
+                        yield from walk(i + 1, prefix + v, nc)
+                        used[key] = k
+
+            yield from walk(0, "", tcost)
+
+def _costs(weighted):
+    # [(item, weight)] -> [(-log share, item)], cheapest first
+    z = sum(w for _, w in weighted)
+    return sorted(((-math.log(w / z), item) for item, w in weighted), key=lambda p: p[0])
+
+def _flush_best(buf, seen):
+    buf.sort(key=lambda p: p[0])
+    if seen is None:
+        yield from buf
+        buf.clear()
+        return
+    add = seen.add
+    for cost, line in buf:
+        if add(_hash64(line)):
+            yield cost, line
+    buf.clear()
+
+# ------------------- Core: Rank / Unrank -------------------
+class SequenceSpace:
+    """
+    Random access into the stream iter_sequences(tokens, min_len, max_len)
+    produces (every sequence, duplicates included, empty one excluded).
+    Built from the same length DP as count_sequence_combinations: for every
+    prefix length m it keeps running totals of the subtree sizes of each
+    token, so unrank/rank walk down one level per token in O(max_len * pool)
+    without generating anything before the requested index.
+    """
+
+    def __init__(self, tokens, min_len, max_len):
+        self.tokens = list(tokens)
+        self.min_len = min_len
+        self.max_len = max_len
+        self.lens = _check_tokens(self.tokens) if self.tokens else []
+        sizes = subtree_sizes(self.lens, min_len, max_len) if max_len >= 0 else []
+        # cum[m][k]: sequences under children 0..k-1 of a node of length m
+        self.cum = []
+        for m in range(max_len + 1):
+            row = [0]
+            for l in self.lens:
+                row.append(row[-1] + (sizes[m + l] if m + l <= max_len else 0))
+            self.cum.append(row)
+        self.total = self.cum[0][-1] if self.cum and self.tokens else 0
+
+    def __len__(self):
+        return self.total
+
+    def unrank(self, n):
+        # token indices of the n-th sequence (0-based)
+        if not 0 <= n < self.total:
+            raise IndexError(f"indeks aralik disinda: {n} (toplam {self.total})")
+        path = []
+        m = 0
+        while True:
+            row = self.cum[m]
+            k = bisect.bisect_right(row, n) - 1
+            n -= row[k]
+            path.append(k)
+            m += self.lens[k]
+            if m >= self.min_len:
+                if n == 0:
+                    return path
+                n -= 1
+
+    def candidate(self, n):
+        return self.tokens[0][:0].join(self.tokens[i] for i in self.unrank(n))
+
+    def rank(self, item):
+        """
+        Index of a sequence, given as token indices or as a string. A string
+        is ranked by its first occurrence (its canonical parse).
+        """
+        if isinstance(item, (str, bytes)):
+            path = canonical_parse(item, self.tokens)
+            if path is None:
+                raise ValueError("aday bu havuzdan uretilemez")
+        else:
+            path = list(item)
+        r = 0
+        m = 0
+        for d, k in enumerate(path):
+            if not 0 <= k < len(self.tokens) or m + self.lens[k] > self.max_len:
+                raise ValueError("gecersiz dizilim")
+            r += self.cum[m][k]
+            m += self.lens[k]
+            if m >= self.min_len:
+                if d == len(path) - 1:
+                    return r
+                r += 1
+        raise ValueError("dizilim uzunluk araliginin disinda")
+
+    def iter_range(self, start, count=None):
+        # candidates start, start+1, ... (count of them, or to the end)
+        if count is not None and count <= 0:
+            return
+        path = self.unrank(start)
+        yield self.tokens[0][:0].join(self.tokens[i] for i in path)
+        rest = iter_sequences(self.tokens, self.min_len, self.max_len, resume_after=path)
+        yield from (rest if count is None else itertools.islice(rest, count - 1))
+
+# ------------------- Core: Instrumentation -------------------
+# RunStats records one run: phase timings, counters, rates, memory high-water
+# marks and the dedup hit ratio, written as JSON lines. The generators report
+# into the active RunStats through stats_phase / stats_time / stats_count;
+# with none active each call is one global lookup, and the hot loops only
+# call them per buffer flush or per block, never per candidate. Parallel
+# workers are separate processes: their time shows up as the phase around
+# the pool, not broken down.
+_ACTIVE_STATS = None
+
+def stats_phase(name):
+    # times a coarse phase on the active RunStats (no-op without one)
+    return _ACTIVE_STATS.phase(name) if _ACTIVE_STATS is not None else contextlib.nullcontext()
+
+def stats_time(name, seconds):
+    # adds to a fine-grained timer (write, dedup, compress) of the active RunStats
+    if _ACTIVE_STATS is not None:
+        _ACTIVE_STATS.add_time(name, seconds)
+
+def stats_count(name, n=1):
+    if _ACTIVE_STATS is not None:
+        _ACTIVE_STATS.add_count(name, n)
+
+def stats_wrap_wordlist(on_progress):
+    # on_progress(written, attempted, bytes) that also feeds the active RunStats
+    stats = _ACTIVE_STATS
+    if stats is None:
+        return on_progress
+
+    def progress(written, attempted, nbytes):
+        stats.progress(written, attempted, nbytes)
+        if on_progress:
+            on_progress(written, attempted, nbytes)
+    return progress
+
+def stats_wrap_wifi(on_progress):
+    # same for on_progress(written, bytes, dedup_bytes)
+    stats = _ACTIVE_STATS
+    if stats is None:
+        return on_progress
+
+    def progress(written, nbytes, dedup_bytes):
+        stats.progress(written, None, nbytes, dedup_bytes)
+        if on_progress:
+            on_progress(written, nbytes, dedup_bytes)
+    return progress
+
+def stats_result(written, nbytes, attempted=None):
+    # final numbers of the run, for the summary line
+    if _ACTIVE_STATS is not None:
+        _ACTIVE_STATS.progress(written, attempted, nbytes, emit=False)
+
+class ProgressReporter:
+    """
+    Progress rendering off the generating thread. The reporter itself is
+    the on_progress callback: a call only stores the latest values, so
+    the loop that produces them never waits on a terminal. A daemon thread
+    wakes every `interval` seconds and calls render(values, rate, eta):
+    values as last passed to on_progress, rate the smoothed per-second
+    change of values[key], eta the seconds until values[key] reaches
+    `total` (None without a total or a rate yet). A render stuck on a
+    slow terminal only holds up its own next frame.
+    """
+
+    def __init__(self, render, total=None, key=0, interval=PROGRESS_PRINT_INTERVAL):
+        self.render = render
+        self.total = total
+        self.key = key
+        self.interval = interval
+        self.rate = 0.0
+        self._latest = None
+        self._mark = None
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="generatekey-progress", daemon=True)
+
+    def __call__(self, *values):
+        self._latest = (time.monotonic(), values)
+
+    @property
+    def values(self):
+        # the last values passed in, or None
+        return self._latest[1] if self._latest else None
+
+    def start(self):
+        self._started = time.monotonic()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._frame()
+            except Exception:
+                # a broken terminal ends the reporting, not the run
+                return
+
+    def _frame(self, final=False):
+        latest = self._latest
+        if latest is None:
+            return
+        stamp, values = latest
+        done = values[self.key] or 0
+        if self._mark is None:
+            self._mark = (stamp, done)
+            if final and stamp > self._started:
+                # over before a second frame: the average is all there is
+                self.rate = done / (stamp - self._started)
+        elif stamp > self._mark[0]:
+            rate = (done - self._mark[1]) / (stamp - self._mark[0])
+            self.rate = rate if not self.rate else 0.5 * self.rate + 0.5 * rate
+            self._mark = (stamp, done)
+        eta = None
+        if self.total and self.rate > 0:
+            eta = max(0.0, (self.total - done) / self.rate)
+        self.render(values, self.rate, eta)
+
+    def close(self):
+        # stops the thread and draws the last values, unless a frame is still stuck
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(self.interval)
+        if not self._thread.is_alive():
+            self._frame(final=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+def progress_rate_text(rate, eta=None):
+    # "Hiz: 1,234,567/s | Kalan: 0:01:23" for a ProgressReporter frame
+    text = f"Hiz: {rate:,.0f}/s" if rate else "Hiz: -"
+    if eta is not None:
+        minutes, seconds = divmod(int(eta + 0.5), 60)
+        text += f" | Kalan: {minutes // 60}:{minutes % 60:02d}:{seconds:02d}"
+    return text
+
+def _rss_max_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class RunStats:
+    """
+    Instrumentation for one run; use as a context manager, which makes it
+    the active one. out is a path (appended to), "-" for stderr or a file
+    object; every event is one JSON object per line: "start", "phase"
+    (coarse phases as they end), "progress" (at most every `interval`
+    seconds) and "summary". profile names a file for cProfile stats
+    (pstats format), trace_memory turns on tracemalloc and adds the peak
+    and the top allocation sites to the summary.
+    """
+
+    # fine-grained timers that run inside the coarse phases
+    NESTED = ("write", "dedup", "exclude")
+
+    def __init__(self, out="-", command=None, params=None, profile=None, trace_memory=False,
+                 interval=STATS_INTERVAL):
+        self.out, self.command, self.params = out, command, params or {}
+        self.profile, self.trace_memory, self.interval = profile, trace_memory, interval
+        self.phases = {}
+        self.timers = {}
+        self.counters = {}
+        self.written = self.attempted = self.bytes = 0
+        self.dedup_bytes_max = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._profiler = None
+        self._prev = None
+
+    def _emit(self, event, **fields):
+        if self._file is None:
+            return
+        rec = {"event": event, "t": round(time.perf_counter() - self.t0, 6)}
+        rec.update(fields)
+        self._file.write(json.dumps(rec) + "\n")
+        self._file.flush()
+
+    def __enter__(self):
+        global _ACTIVE_STATS
+        if self.out is None:
+            self._file = None
+        elif self.out == STDOUT_TARGET:
+            self._file = sys.stderr
+        elif isinstance(self.out, str):
+            self._file = open(self.out, "a", encoding="utf-8")
+        else:
+            self._file = self.out
+        self.t0 = self._last = time.perf_counter()
+        self._emit("start", command=self.command, params=self.params, pid=os.getpid())
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._prev, _ACTIVE_STATS = _ACTIVE_STATS, self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _ACTIVE_STATS
+        _ACTIVE_STATS = self._prev
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile)
+        summary = self.summary()
+        if exc_type is not None:
+            summary["interrupted"] = exc_type.__name__
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:STATS_TOP_ALLOCATIONS]
+            tracemalloc.stop()
+            summary["tracemalloc_peak_bytes"] = peak
+            summary["top_allocations"] = [{"where": str(s.traceback[0]), "bytes": s.size, "blocks": s.count}
+                                          for s in top]
+        self._emit("summary", **summary)
+        if self._file is not None and self._file is not sys.stderr and isinstance(self.out, str):
+            self._file.close()
+        self._file = None
+        return False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # the nested timers that ran inside are taken out, so phases don't overlap
+        nested = sum(self.timers.get(k, 0.0) for k in self.NESTED)
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t
+            dt -= sum(self.timers.get(k, 0.0) for k in self.NESTED) - nested
+            self.phases[name] = self.phases.get(name, 0.0) + dt
+            self._emit("phase", name=name, seconds=round(dt, 6))
+
+    def add_time(self, name, seconds):
+        # the compression thread reports here too
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def add_count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def progress(self, written, attempted, nbytes, dedup_bytes=None, emit=True):
+        self.written, self.bytes = written, nbytes
+        if attempted is not None:
+            self.attempted = attempted
+        if dedup_bytes:
+            self.dedup_bytes_max = max(self.dedup_bytes_max, dedup_bytes)
+        now = time.perf_counter()
+        if emit and now - self._last >= self.interval:
+            self._last = now
+            elapsed = now - self.t0
+            self._emit("progress", written=written, candidates=self._candidates(), bytes=nbytes,
+                       rate=round(written / elapsed, 1) if elapsed > 0 else None, rss_max_bytes=_rss_max_bytes(),
+                       dedup_bytes=dedup_bytes)
+
+    def _candidates(self):
+        # attempted from the wordlist progress, or what the WiFi blocks counted
+        return self.attempted or self.counters.get("candidates", 0)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.t0
+        candidates = self._candidates()
+        phases = dict(self.phases)
+        phases.update(self.timers)
+        return {
+            "command": self.command,
+            "seconds": round(elapsed, 6),
+            "written": self.written,
+            "candidates": candidates,
+            "bytes": self.bytes,
+            "rate": round(self.written / elapsed, 1) if elapsed > 0 else None,
+            "candidate_rate": round(candidates / elapsed, 1) if elapsed > 0 else None,
+            # share of candidates dropped as repeats (or filtered) before the output
+            "dedup_hit_ratio": round(1 - self.written / candidates, 6) if candidates else None,
+            "phases": {k: round(v, 6) for k, v in phases.items()},
+            "counters": dict(self.counters),
+            "rss_max_bytes": _rss_max_bytes(),
+            "dedup_bytes_max": self.dedup_bytes_max,
+        }
+
+# ------------------- Core: Output Sinks -------------------
+def is_stream_target(path):
+    # "-" (stdout), named pipes and character devices can't be truncated or resumed
+    if path == STDOUT_TARGET:
+        return True
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISCHR(mode)
+
+def _open_output_fd(path, append=False):
+    if path == STDOUT_TARGET:
+        # anything print() buffered must not end up after our raw writes
+        sys.stdout.flush()
+        return os.dup(sys.stdout.fileno())
+    flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    if append:
+        flags |= os.O_APPEND
+    elif not is_stream_target(path):
+        flags |= os.O_TRUNC
+    return os.open(path, flags, 0o644)
+
+def output_codec(path):
+    # compression codec picked from the file extension, or None for plain text
+    if path == STDOUT_TARGET:
+        return None
+    return OUTPUT_CODECS.get(os.path.splitext(path)[1].lower())
+
+def _codec_available(codec):
+    return {"zstd": zstandard, "lz4": lz4frame, "xz": lzma, "bz2": bz2}.get(codec, True) is not None
+
+def output_path_for(path):
+    # the path actually written: a codec whose module is missing falls back to gzip (.gz)
+    codec = output_codec(path)
+    if codec is None or _codec_available(codec):
+        return path
+    return os.path.splitext(path)[0] + ".gz"
+
+def output_fallback_note(path):
+    # the message to show when output_path_for swaps the codec, else None
+    resolved = output_path_for(path)
+    if resolved == path:
+        return None
+    module = {"zstd": "zstandard", "lz4": "lz4", "xz": "lzma"}[output_codec(path)]
+    return f"{module} modulu yok, {resolved} (gzip) yazilacak."
+
+def output_size_text(path, raw_bytes):
+    # progress text: uncompressed MB, plus what is on disk for compressed targets
+    if output_codec(path) is None:
+        return format_mb(raw_bytes)
+    try:
+        disk = os.path.getsize(path)
+    except OSError:
+        # a split output has no file under this name
+        return format_mb(raw_bytes)
+    return f"{format_mb(raw_bytes)} (sikistirilmis {format_mb(disk)})"
+
+def is_resumable_target(path):
+    # checkpoints need a plain file: streams can't seek, compressed files can't be cut at an offset
+    return not is_stream_target(path) and output_codec(path) is None
+
+def _compressor(codec):
+    # -> object with compress(data) / flush(), like zlib.compressobj
+    level = SINK_COMPRESS_LEVEL
+    if codec == "gzip":
+        # wbits 31: gzip container, readable with gzip.open / zcat
+        return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+    if codec == "bz2":
+        return bz2.BZ2Compressor(9 if level is None else level)
+    if codec == "xz":
+        return lzma.LZMACompressor(preset=level)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    if codec == "lz4":
+        return _LZ4Compressor(0 if level is None else level)
+    raise ValueError(f"bilinmeyen sikistirma: {codec}")
+
+class _LZ4Compressor:
+    # lz4.frame's compressor wants begin() before the first block
+    def __init__(self, level):
+        self._c = lz4frame.LZ4FrameCompressor(compression_level=level)
+        self._started = False
+
+    def compress(self, data):
+        head = b""
+        if not self._started:
+            head = self._c.begin()
+            self._started = True
+        return head + self._c.compress(data)
+
+    def flush(self):
+        return self.compress(b"") + self._c.flush()
+
+class CompressedWriter:
+    """
+    Write side of a compressed output file. write() queues raw bytes for a
+    background thread that compresses and writes them, so generation runs
+    while the codec works (zlib, bz2, lzma, zstd and lz4 release the GIL).
+    At most SINK_COMPRESS_QUEUE chunks wait; a full queue blocks the writer.
+    raw_bytes / compressed_bytes are the totals so far.
+    """
+
+    def __init__(self, fd, codec):
+        self.codec = codec
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self._fd = fd
+        self._comp = _compressor(codec)
+        self._queue = queue.Queue(maxsize=SINK_COMPRESS_QUEUE)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="generatekey-compress", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            try:
+                if self._error is None:
+                    t = time.perf_counter()
+                    out = self._comp.compress(data) if data is not None else self._comp.flush()
+                    stats_time("compress", time.perf_counter() - t)
+                    view = memoryview(out)
+                    while view:
+                        n = os.write(self._fd, view)
+                        view = view[n:]
+                    self.compressed_bytes += len(out)
+            except BaseException as e:
+                # keep draining so the producer never blocks on a dead thread
+                self._error = e
+            finally:
+                self._queue.task_done()
+            if data is None:
+                return
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, data):
+        self._check()
+        if data:
+            self._queue.put(bytes(data))
+            self.raw_bytes += len(data)
+
+    def flush(self):
+        # wait until everything queued so far is compressed and written
+        self._queue.join()
+        self._check()
+
+    def fileno(self):
+        return self._fd
+
+    def close(self):
+        if self._fd is None:
+            return
+        try:
+            self._queue.put(None)
+            self._thread.join()
+        finally:
+            os.close(self._fd)
+            self._fd = None
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def _open_output_file(path, append=False):
+    # binary file object for path: a CompressedWriter for .gz/.bz2/.xz/.zst/.lz4
+    path = output_path_for(path)
+    fd = _open_output_fd(path, append)
+    codec = output_codec(path)
+    return CompressedWriter(fd, codec) if codec else os.fdopen(fd, "wb")
+
+class OutputSink:
+    """
+    Buffered line writer shared by both generators. Lines are collected in a
+    list and handed to the OS in one os.write once flush_bytes have piled up
+    (or flush_interval seconds have passed). With raw=True the sink takes
+    bytes lines and skips the text-encoding step entirely. A compressed
+    extension (OUTPUT_CODECS) goes through a CompressedWriter; tell() stays
+    in uncompressed bytes.
+
+    path "-" streams to stdout; a named pipe works like any file. Writes are
+    blocking, so a slow consumer simply slows the generator down, and a
+    consumer that goes away raises BrokenPipeError.
+
+    exclude (an ExcludeIndex) drops the buffered lines found in it at every
+    flush, one batched lookup per buffer; `excluded` counts them. lines and
+    tell() include the buffer, so they only lose the drops at the flush.
+    """
+
+    def __init__(self, path, raw=False, flush_bytes=SINK_FLUSH_BYTES, flush_interval=None, encoding="utf-8",
+                 append=False, exclude=None):
+        self.path = path
+        self.raw = raw
+        self.encoding = encoding
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.exclude = exclude
+        self.excluded = 0
+        self.lines = 0
+        self._nl = b"\n" if raw else "\n"
+        self._buf = []
+        self._pending = 0      # chars (text) / bytes (raw) waiting in _buf
+        self._flushed = 0      # bytes already handed to the OS
+        self._counted = 0      # text: lines of _buf already in _extra
+        self._extra = 0        # text: encoded bytes minus chars of those lines
+        self._last_flush = time.time()
+        # .gz/.bz2/.xz/.zst/.lz4 targets are compressed on a background thread
+        self.path = output_path_for(path)
+        self.codec = output_codec(self.path)
+        self._fd = _open_output_fd(self.path, append)
+        self._out = CompressedWriter(self._fd, self.codec) if self.codec else None
+        if append:
+            # tell() keeps reporting the absolute file size
+            self._flushed = os.fstat(self._fd).st_size
+
+    def write(self, line):
+        # line comes without the trailing newline
+        self._buf.append(line)
+        self._pending += len(line) + 1
+        self.lines += 1
+        if self._pending >= self.flush_bytes:
+            self.flush()
+        elif self.flush_interval and not (self.lines & 0x3FF):
+            if time.time() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def write_many(self, lines):
+        # a list of lines in one go, cheaper than write() per line
+        if not isinstance(lines, list):
+            lines = list(lines)
+        self._buf.extend(lines)
+        self._pending += sum(map(len, lines)) + len(lines)
+        self.lines += len(lines)
+        if self._pending >= self.flush_bytes:
+            self.flush()
+        elif self.flush_interval and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def write_block(self, data, lines):
+        # data: already encoded, newline-terminated lines; goes out after the buffer
+        self.flush()
+        t = time.perf_counter()
+        self._write_all(data)
+        stats_time("write", time.perf_counter() - t)
+        self._flushed += len(data)
+        self.lines += lines
+        self._last_flush = time.time()
+
+    def flush(self):
+        if not self._buf:
+            return
+        buf = self._buf
+        if self.exclude is not None:
+            t = time.perf_counter()
+            buf = self.exclude.keep(buf, self.raw)
+            dropped = len(self._buf) - len(buf)
+            stats_time("exclude", time.perf_counter() - t)
+            if dropped:
+                self.excluded += dropped
+                self.lines -= dropped
+                stats_count("excluded", dropped)
+            if not buf:
+                self._buf.clear()
+                self._pending = self._counted = self._extra = 0
+                return
+        t = time.perf_counter()
+        nl = self._nl
+        data = nl.join(buf) + nl
+        if not self.raw:
+            data = data.encode(self.encoding)
+        self._buf.clear()
+        self._pending = self._counted = self._extra = 0
+        self._write_all(data)
+        stats_time("write", time.perf_counter() - t)
+        self._flushed += len(data)
+        self._last_flush = time.time()
+
+    def _write_all(self, data):
+        if self._out is not None:
+            self._out.write(data)
+            return
+        view = memoryview(data)
+        while view:
+            n = os.write(self._fd, view)
+            view = view[n:]
+
+    def sync(self):
+        # flush and make sure the bytes are on disk (used before checkpoints)
+        self.flush()
+        if self._out is not None:
+            self._out.flush()
+        os.fsync(self._fd)
+
+    def tell(self):
+        # bytes written so far (uncompressed), including what is still sitting in the buffer;
+        # text lines are only encoded here once each, and only if they are not ASCII
+        if not self.raw and len(self._buf) > self._counted:
+            new = "".join(self._buf[self._counted:])
+            if not new.isascii():
+                self._extra += len(new.encode(self.encoding)) - len(new)
+            self._counted = len(self._buf)
+        return self._flushed + self._pending + self._extra
+
+    def close(self):
+        if self._fd is None:
+            return
+        try:
+            self.flush()
+        finally:
+            if self._out is not None:
+                self._out.close()
+            else:
+                os.close(self._fd)
+            self._fd = None
+
+    @property
+    def compressed_bytes(self):
+        # bytes the codec has put on disk so far (None for plain output)
+        return self._out.compressed_bytes if self._out is not None else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# ------------------- Core: Split output -------------------
+# One file per length and/or a new chunk every N lines / M MB, next to a
+# manifest: out.txt -> out.len08.txt, out.0001.txt, out.len08.0001.txt and
+# out.manifest.json. parse_split reads the menu/CLI form.
+_SPLIT_KEYS = {"uzunluk": "by_length", "length": "by_length", "len": "by_length",
+               "satir": "max_lines", "lines": "max_lines", "mb": "max_mb", "size": "max_mb",
+               "acik": "max_open", "open": "max_open"}
+
+def parse_split(text):
+    # "uzunluk satir=1000000 mb=500" -> OutputSplit, None if empty
+    kwargs = {}
+    for item in (text or "").replace(",", " ").split():
+        key, sep, value = item.partition("=")
+        name = _SPLIT_KEYS.get(key.strip().lower())
+        if name is None or (name == "by_length") == bool(sep):
+            raise ValueError(f"gecersiz bolme: {item} (orn: uzunluk satir=1000000 mb=500)")
+        try:
+            kwargs[name] = True if name == "by_length" else float(value) if name == "max_mb" else int(value)
+        except ValueError:
+            raise ValueError(f"gecersiz bolme degeri: {item}") from None
+    if "max_mb" in kwargs:
+        kwargs["max_bytes"] = int(kwargs.pop("max_mb") * 1024**2)
+    return OutputSplit(**kwargs) if kwargs else None
+
+class OutputSplit:
+    """
+    How to spread one output over several files: by_length puts every
+    length into its own file, max_lines / max_bytes (uncompressed) start a
+    new chunk when the next line would not fit. At most max_open files are
+    open at a time (default SPLIT_MAX_OPEN). plan holds the expected
+    per-length (counts, line_bytes, exact) once with_plan() has set it.
+    """
+
+    def __init__(self, by_length=False, max_lines=None, max_bytes=None, max_open=None):
+        for name, value in (("satir", max_lines), ("boyut", max_bytes), ("acik", max_open)):
+            if value is not None and value <= 0:
+                raise ValueError(f"bolme: {name} pozitif olmalidir")
+        if not (by_length or max_lines or max_bytes):
+            raise ValueError("bolme icin uzunluk, satir ya da boyut gerekli")
+        self.by_length = bool(by_length)
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.max_open = max_open or SPLIT_MAX_OPEN
+        self.plan = None
+
+    def __str__(self):
+        parts = ["uzunluk"] if self.by_length else []
+        if self.max_lines:
+            parts.append(f"satir={self.max_lines}")
+        if self.max_bytes:
+            parts.append(f"mb={self.max_bytes / 1024**2:g}")
+        return " ".join(parts)
+
+    def describe(self):
+        return {"by_length": self.by_length, "max_lines": self.max_lines, "max_bytes": self.max_bytes,
+                "max_open": self.max_open}
+
+    def with_plan(self, counts, line_bytes, exact):
+        # a copy that knows the per-length counts (estimate_wordlist / estimate_templates)
+        split = OutputSplit(self.by_length, self.max_lines, self.max_bytes, self.max_open)
+        split.plan = (list(counts), list(line_bytes), exact)
+        return split
+
+    def planned_files(self):
+        # {length or None: expected number of chunks} from the plan, or None without one
+        if self.plan is None:
+            return None
+        counts, line_bytes, _ = self.plan
+        groups = {}
+        for length, (n, b) in enumerate(zip(counts, line_bytes)):
+            if n:
+                key = length if self.by_length else None
+                lines, size = groups.get(key, (0, 0))
+                groups[key] = (lines + n, size + b)
+        return {key: max(1, -(-n // self.max_lines) if self.max_lines else 1,
+                         -(-b // self.max_bytes) if self.max_bytes else 1)
+                for key, (n, b) in groups.items()}
+
+def _split_stem(path):
+    # "out.txt.gz" -> ("out", ".txt.gz"): the name the shard suffixes go in front of
+    root, ext = os.path.splitext(path)
+    if output_codec(path):
+        root, inner = os.path.splitext(root)
+        ext = inner + ext
+    return root, ext
+
+def split_file_path(path, length=None, chunk=None, width=SPLIT_CHUNK_DIGITS):
+    root, ext = _split_stem(path)
+    if length is not None:
+        root += f".len{length:02d}"
+    if chunk is not None:
+        root += f".{chunk:0{width}d}"
+    return root + ext
+
+def split_manifest_path(path):
+    return _split_stem(path)[0] + ".manifest.json"
+
+class _SplitFile:
+    __slots__ = ("path", "length", "chunk", "lines", "size", "buf", "pending", "created", "written", "nbytes",
+                 "excluded", "sink", "base", "used")
+
+    def __init__(self, path, length, chunk):
+        self.path, self.length, self.chunk = path, length, chunk
+        # lines / size: everything written to this file, for the limits; buf / pending: not handed on yet
+        self.lines = self.size = self.pending = 0
+        self.buf = []
+        self.created = False
+        # what the closed OutputSink sessions wrote
+        self.written = self.nbytes = self.excluded = self.base = self.used = 0
+        self.sink = None
+
+class SplitSink:
+    """
+    OutputSink look-alike that spreads the lines over several files as an
+    OutputSplit says. Every file buffers its lines on its own and hands
+    them to an OutputSink every SPLIT_BUFFER_BYTES; only that needs an
+    open file. Once split.max_open are open, the least recently used one is
+    closed and reopened in append mode when its file comes back, so the
+    handle cap costs one reopen per buffer, not one per line. close() writes
+    the manifest (split_manifest_path) with the lines and bytes of every
+    file and, if the split has a plan, the expected numbers next to them.
+    """
+
+    def __init__(self, path, split, raw=False, exclude=None, encoding="utf-8"):
+        if is_stream_target(path):
+            raise ValueError("akis ciktisi bolunemez")
+        self.path = output_path_for(path)
+        self.split = split
+        self.raw = raw
+        self.exclude = exclude
+        self.encoding = encoding
+        self.files = []
+        self.complete = False
+        self._max_lines = split.max_lines or sys.maxsize
+        self._max_bytes = split.max_bytes or sys.maxsize
+        self._exact_size = bool(split.max_bytes) and not raw
+        self._chunked = bool(split.max_lines or split.max_bytes)
+        self._open = []
+        self._tick = 0
+        self._done_bytes = self._done_excluded = 0
+        planned = split.planned_files()
+        # the plan fixes the groups up front and how wide the chunk numbers get
+        self._groups = dict.fromkeys(planned) if planned else {}
+        most = max(planned.values(), default=1) if planned else 1
+        self._width = max(SPLIT_CHUNK_DIGITS, len(str(most)))
+
+    def write(self, line):
+        key = None
+        if self.split.by_length:
+            # lengths are in characters, also for the bytes lines of an external merge
+            key = len(line) if not self.raw or line.isascii() else len(line.decode(self.encoding))
+        f = self._groups.get(key)
+        size = (len(line.encode(self.encoding)) if self._exact_size else len(line)) + 1
+        if f is None or f.lines >= self._max_lines or (f.lines and f.size + size > self._max_bytes):
+            f = self._next_file(key, f)
+        f.buf.append(line)
+        f.lines += 1
+        f.size += size
+        f.pending += size
+        if f.pending >= SPLIT_BUFFER_BYTES:
+            self._drain(f)
+
+    def write_many(self, lines):
+        write = self.write
+        for line in lines:
+            write(line)
+
+    def _next_file(self, key, prev):
+        if prev is not None:
+            self._drain(prev)
+            self._close_file(prev)
+        chunk = (prev.chunk + 1 if prev else 1) if self._chunked else None
+        f = _SplitFile(split_file_path(self.path, key, chunk, self._width), key, chunk)
+        self.files.append(f)
+        self._groups[key] = f
+        return f
+
+    def _drain(self, f):
+        # the buffered lines of a file into its OutputSink, opening it if needed
+        if not f.buf:
+            return
+        if f.sink is None:
+            if len(self._open) >= self.split.max_open:
+                self._close_file(min(self._open, key=lambda o: o.used))
+            f.sink = OutputSink(f.path, raw=self.raw, flush_bytes=SPLIT_BUFFER_BYTES, encoding=self.encoding,
+                                append=f.created, exclude=self.exclude)
+            # an appended file reports its old size first (compressed size for codecs)
+            f.base = f.sink.tell()
+            f.created = True
+            self._open.append(f)
+        f.sink.write_many(f.buf)
+        f.buf = []
+        f.pending = 0
+        self._tick += 1
+        f.used = self._tick
+
+    def _close_file(self, f):
+        if f.sink is None:
+            return
+        sink, f.sink = f.sink, None
+        self._open.remove(f)
+        sink.close()
+        f.written += sink.lines
+        f.nbytes += sink.tell() - f.base
+        f.excluded += sink.excluded
+        self._done_bytes += sink.tell() - f.base
+        self._done_excluded += sink.excluded
+
+    @property
+    def excluded(self):
+        return self._done_excluded + sum(f.sink.excluded for f in self._open)
+
+    @property
+    def lines(self):
+        return sum(f.lines for f in self.files) - self.excluded
+
+    def tell(self):
+        # uncompressed bytes of all files, buffered ones included
+        return (self._done_bytes + sum(f.sink.tell() - f.base for f in self._open)
+                + sum(f.pending for f in self.files if f.buf))
+
+    def flush(self):
+        for f in self.files:
+            self._drain(f)
+        for f in self._open:
+            f.sink.flush()
+
+    def sync(self):
+        self.flush()
+        for f in self._open:
+            f.sink.sync()
+
+    def close(self):
+        try:
+            for f in self.files:
+                self._drain(f)
+                self._close_file(f)
+        finally:
+            self._write_manifest()
+
+    def manifest(self):
+        planned = self.split.planned_files()
+        files = [{"path": os.path.basename(f.path), "length": f.length, "chunk": f.chunk, "lines": f.written,
+                  "bytes": f.nbytes, "excluded": f.excluded}
+                 for f in sorted(self.files, key=lambda f: (f.length or 0, f.chunk or 0))]
+        data = {"output": self.path, "split": self.split.describe(), "complete": self.complete,
+                "files": files, "lines": sum(f["lines"] for f in files), "bytes": sum(f["bytes"] for f in files)}
+        if planned is not None:
+            counts, line_bytes, exact = self.split.plan
+            data["plan"] = {"exact": exact, "files": sum(planned.values()),
+                            "lengths": {str(length): {"lines": n, "bytes": b} for length, (n, b)
+                                        in enumerate(zip(counts, line_bytes)) if n}}
+        return data
+
+    def _write_manifest(self):
+        path = split_manifest_path(self.path)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest(), f, indent=1)
+            f.write("\n")
+        os.replace(tmp, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.complete = exc_type is None
+        self.close()
+        return False
+
+def open_sink(path, raw=False, append=False, exclude=None, split=None):
+    # an OutputSink, or a SplitSink when the output is split
+    if split is not None:
+        return SplitSink(path, split, raw=raw, exclude=exclude)
+    return OutputSink(path, raw=raw, append=append, exclude=exclude)
+
+# ------------------- Core: Checkpoints -------------------
+def checkpoint_path_for(out_path):
+    return out_path + CHECKPOINT_SUFFIX
+
+def job_fingerprint(pool, **params):
+    # identifies a job; a checkpoint is only reused for the exact same job
+    h = hashlib.sha256()
+    for t in pool:
+        h.update(t if isinstance(t, bytes) else t.encode("utf-8"))
+        h.update(b"\0")
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def save_checkpoint(path, state):
+    # write to a temp file and rename, so a crash never leaves half a checkpoint
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def load_checkpoint(path, fingerprint):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("fingerprint") != fingerprint:
+        return None
+    return state
+
+def remove_checkpoint(path):
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def truncate_output(out_path, offset):
+    # drop whatever was written after the last consistent checkpoint
+    with open(out_path, "r+b") as f:
+        f.truncate(offset)
+
+def read_lines(out_path, raw):
+    # used to rebuild the seen set when resuming in "set" dedup mode
+    with open(out_path, "rb") as f:
+        data = f.read()
+    lines = data.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()
+    return lines if raw else [l.decode("utf-8") for l in lines]
+
+# ------------------- Core: Parallel Generation -------------------
+def subtree_sizes(token_lengths, min_len, max_len):
+    # sizes[m]: in-range sequences under a node of length m (node included)
+    dp = sequence_length_counts(token_lengths, max_len)
+    sizes = []
+    for m in range(max_len + 1):
+        lo = max(min_len - m, 0)
+        sizes.append(sum(dp[lo:max_len - m + 1]))
+    return sizes
+
+def plan_shards(tokens, min_len, max_len, target):
+    """
+    Splits the sequence tree into about `target` shards of similar size.
+    A shard is (prefix, subtree) as understood by iter_sequences. The
+    biggest shard is split by its next token until there are enough; the
+    returned list is in tree order, so concatenating the shards' outputs in
+    list order gives exactly the sequential output.
+    """
+    lens = [len(t) for t in tokens]
+    min_tok = min(lens)
+    sizes = subtree_sizes(lens, min_len, max_len)
+    shards = [((), True)]
+
+    def weight(shard):
+        prefix, subtree = shard
+        return sizes[sum(lens[i] for i in prefix)] if subtree else 1
+
+    while len(shards) < target:
+        best = None
+        for k, (prefix, subtree) in enumerate(shards):
+            if not subtree or sum(lens[i] for i in prefix) + min_tok > max_len:
+                continue
+            if best is None or weight(shards[k]) > weight(shards[best]):
+                best = k
+        if best is None:
+            break
+        prefix, _ = shards[best]
+        m = sum(lens[i] for i in prefix)
+        split = [(prefix, False)] if prefix else []
+        split += [(prefix + (i,), True) for i in range(len(tokens)) if m + lens[i] <= max_len]
+        shards[best:best + 1] = split
+    return shards, [weight(sh) for sh in shards]
+
+_SHARD_STATE = {}
+
+def _init_shard_worker(written, nbytes, stop):
+    # Ctrl+C is handled by the parent, which tells workers to stop via `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _SHARD_STATE.update(written=written, nbytes=nbytes, stop=stop)
+
+def _shard_report(n, b):
+    written, nbytes = _SHARD_STATE["written"], _SHARD_STATE["nbytes"]
+    with written.get_lock():
+        written.value += n
+    with nbytes.get_lock():
+        nbytes.value += b
+
+def _run_shard(pool, min_len, max_len, prefix, subtree, part_path, raw, expander=None, stage=None, constraints=None,
+               exclude=None):
+    stop = _SHARD_STATE["stop"]
+    n = reported_n = reported_b = 0
+    if expander:
+        lines = expander.lines(min_len, max_len, prefix, subtree)
+    else:
+        lines = iter_sequences(pool, min_len, max_len, unique=True, prefix=prefix, subtree=subtree,
+                               constraints=constraints)
+    if stage:
+        # repeats inside the shard go here, the merge catches the rest
+        lines = (w for line in lines for w in stage.apply_many((line,)))
+    with OutputSink(part_path, raw=raw, exclude=exclude) as sink:
+        write = sink.write
+        for s in lines:
+            write(s)
+            n += 1
+            if not (n & 0x3FFF):
+                b = sink.tell()
+                _shard_report(n - sink.excluded - reported_n, b - reported_b)
+                reported_n, reported_b = n - sink.excluded, b
+                if stop.is_set():
+                    break
+    n -= sink.excluded
+    _shard_report(n - reported_n, sink.tell() - reported_b)
+    return n
+
+def _append_part(out, part_path, stage=None):
+    # returns (lines, bytes) dropped as repeats of earlier parts (only with a RuleStage)
+    dropped = dropped_bytes = 0
+    # a SplitSink (raw) takes the lines one by one, a file the whole part
+    split = isinstance(out, SplitSink)
+    with open(part_path, "rb") as f:
+        if stage is None and split:
+            out.write_many(line[:-1] for line in f)
+        elif stage is None:
+            shutil.copyfileobj(f, out, SINK_FLUSH_BYTES)
+        else:
+            add, h = stage.seen.add, stage._hash
+            for line in f:
+                word = line[:-1]
+                if add(h(word if stage.raw else word.decode("utf-8"))):
+                    out.write(word if split else line)
+                else:
+                    dropped += 1
+                    dropped_bytes += len(line)
+    os.remove(part_path)
+    return dropped, dropped_bytes
+
+def generate_wordlist_parallel(pool, min_len, max_len, out_path, workers, raw=False, ordered=True, on_progress=None,
+                               checkpoint=None, fingerprint=None, resume_state=None, expander=None, stage=None,
+                               constraints=None, exclude=None, split=None):
+    """
+    Runs the canonical (set-free) generator on `workers` processes. Each
+    shard writes its own out_path.partNNNNN file; finished parts are merged
+    into out_path as they complete, either in tree order (ordered=True,
+    identical to a single-process run) or in completion order.
+    on_progress(written, bytes) is called about every PROGRESS_PRINT_INTERVAL.
+
+    With a checkpoint path, the set of merged shards and the output offset
+    are saved after every merge; resume_state (a loaded checkpoint) skips
+    those shards and cuts the output back to the saved offset.
+    expander (a CaseExpander over `pool`) adds case variants in the workers,
+    stage (a RuleStage) mangles there; the merge drops repeats across parts.
+    constraints (a PasswordPolicy) prunes the plain walk in every shard;
+    exclude (an ExcludeIndex) filters the parts, each worker maps it itself.
+    split (an OutputSplit) merges the parts into a SplitSink instead; no
+    checkpoints then.
+    Returns (written, bytes).
+    """
+    shards, weights = plan_shards(pool, min_len, max_len, workers * PARALLEL_SHARDS_PER_WORKER)
+    # streamed output has no directory of its own to keep the parts next to
+    part_base = out_path
+    if is_stream_target(out_path):
+        part_base = os.path.join(tempfile.gettempdir(), f"generatekey-{os.getpid()}")
+    parts = [f"{part_base}.part{k:05d}" for k in range(len(shards))]
+    merged = set()
+    base_written = base_bytes = 0
+    if resume_state:
+        merged = set(resume_state["merged"])
+        base_written = resume_state["written"]
+        base_bytes = resume_state["offset"]
+        truncate_output(out_path, base_bytes)
+        if stage is not None:
+            stage.prime(read_lines(out_path, raw))
+    written = multiprocessing.Value("Q", 0)
+    nbytes = multiprocessing.Value("Q", 0)
+    stop = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                   initargs=(written, nbytes, stop))
+    merged_written = base_written
+    # out.tell() on an append-mode file says 0 until the first write, so the offset is counted here
+    merged_bytes = base_bytes
+    dropped = [0, 0]
+
+    def merge(out, k, n):
+        nonlocal merged_written, merged_bytes
+        size = os.path.getsize(parts[k])
+        lines, nb = _append_part(out, parts[k], stage)
+        dropped[0] += lines
+        dropped[1] += nb
+        merged.add(k)
+        merged_written += n - lines
+        merged_bytes += size - nb
+        if checkpoint:
+            out.flush()
+            os.fsync(out.fileno())
+            save_checkpoint(checkpoint, {"fingerprint": fingerprint, "mode": "parallel",
+                                         "merged": sorted(merged), "offset": merged_bytes,
+                                         "written": merged_written})
+
+    try:
+        out = (SplitSink(out_path, split, raw=True) if split is not None
+               else _open_output_file(out_path, append=bool(resume_state)))
+        with out:
+            # biggest shards first so no worker is left with a long tail
+            order = sorted((k for k in range(len(shards)) if k not in merged), key=lambda k: -weights[k])
+            futures = {executor.submit(_run_shard, pool, min_len, max_len, shards[k][0], shards[k][1],
+                                       parts[k], raw, expander, stage, constraints, exclude): k for k in order}
+            pending = set(futures)
+            finished = {}
+            next_part = 0
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_PRINT_INTERVAL)
+                for fut in done:
+                    n = fut.result()
+                    k = futures[fut]
+                    if not ordered:
+                        merge(out, k, n)
+                        continue
+                    finished[k] = n
+                    while next_part < len(shards) and (next_part in finished or next_part in merged):
+                        if next_part in finished:
+                            merge(out, next_part, finished.pop(next_part))
+                        next_part += 1
+                if on_progress:
+                    on_progress(base_written + written.value - dropped[0], base_bytes + nbytes.value - dropped[1])
+    except BaseException:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for part in parts:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+        raise
+    executor.shutdown()
+    if checkpoint:
+        remove_checkpoint(checkpoint)
+    return base_written + written.value - dropped[0], base_bytes + nbytes.value - dropped[1]
+
+# ------------------- Core: Dedup backends -------------------
+# All backends remember 64-bit hashes: add(h) / add_many(hashes) report which
+# ones are new (of repeats inside one batch only the first), nbytes is the
+# memory they hold. add_many needs NumPy.
+
+class HashTableDedup:
+    """
+    Open-addressing (linear probing) set of 64-bit hashes in one flat uint64
+    array: 8 bytes per slot, sized from the expected number of entries and
+    doubled if it ever passes DEDUP_MAX_LOAD. Exact up to hash collisions.
+    """
+
+    def __init__(self, capacity, max_load=DEDUP_MAX_LOAD):
+        self.max_load = max_load
+        self.count = 0
+        self._alloc(max(16, int(capacity / max_load) + 1))
+
+    def _alloc(self, size):
+        self.size = size
+        self._slots = array("Q", bytes(8 * size))
+        self._np = np.frombuffer(self._slots, dtype=np.uint64) if np is not None else None
+
+    @property
+    def nbytes(self):
+        return 8 * self.size
+
+    def add(self, h):
+        h = h or 1  # 0 marks an empty slot
+        slots, size = self._slots, self.size
+        i = h % size
+        while True:
+            v = slots[i]
+            if v == h:
+                return False
+            if not v:
+                slots[i] = h
+                self.count += 1
+                if self.count > self.max_load * size:
+                    self._grow()
+                return True
+            i += 1
+            if i == size:
+                i = 0
+
+    def add_many(self, hashes):
+        # vectorized probing; the earlier of two equal hashes counts as the new one
+        hashes = np.where(hashes == 0, np.uint64(1), hashes)
+        # the batch could not even fit: grow first; otherwise grow after, like add()
+        if self.count + len(hashes) > 0.9 * self.size:
+            self._grow(self.count + len(hashes))
+        table, size = self._np, self.size
+        new = np.zeros(len(hashes), dtype=bool)
+        active = np.arange(len(hashes))
+        slot = (hashes % np.uint64(size)).astype(np.intp)
+        while len(active):
+            h = hashes[active]
+            v = table[slot]
+            done = v == h
+            empty = np.flatnonzero(v == 0)
+            if len(empty):
+                # one claim per empty slot; the losers re-read it next round
+                first = empty[np.unique(slot[empty], return_index=True)[1]]
+                table[slot[first]] = h[first]
+                new[active[first]] = True
+                done[first] = True
+            probe = ~done
+            probe[empty] = False
+            slot[probe] += 1
+            slot[slot == size] = 0
+            active, slot = active[~done], slot[~done]
+        self.count += int(new.sum())
+        if self.count > self.max_load * self.size:
+            self._grow()
+        return new
+
+    def _grow(self, need=0):
+        old = self._slots
+        self._alloc(max(2 * self.size, int(need / self.max_load) + 1))
+        self.count = 0
+        if self._np is not None:
+            old = np.frombuffer(old, dtype=np.uint64)
+            self.add_many(old[old != 0])
+        else:
+            for h in old:
+                if h:
+                    self.add(h)
+
+
+class BloomDedup:
+    """
+    Bloom filter over 64-bit hashes, sized for `capacity` entries at
+    fp_rate. Much smaller than the table (~2.4 bytes per entry at 1e-4) but
+    a false positive makes a genuinely new candidate look like a repeat, so
+    a small share of candidates is skipped. Output stays unique.
+    """
+
+    def __init__(self, capacity, fp_rate=DEDUP_BLOOM_FP):
+        capacity = max(1, capacity)
+        self.fp_rate = fp_rate
+        self.bits = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.k = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        self._bytes = bytearray((self.bits + 7) // 8)
+        self._np = np.frombuffer(self._bytes, dtype=np.uint8) if np is not None else None
+
+    @property
+    def nbytes(self):
+        return len(self._bytes)
+
+    def add(self, h):
+        # double hashing: bit i = h1 + i*h2
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bits, buf = self.bits, self._bytes
+        present = True
+        for i in range(self.k):
+            pos = (h1 + i * h2) % bits
+            mask = 1 << (pos & 7)
+            if not buf[pos >> 3] & mask:
+                present = False
+                buf[pos >> 3] |= mask
+        if not present:
+            self.count += 1
+        return not present
+
+    def add_many(self, hashes):
+        # repeats inside the batch: only the first one can be new
+        first = np.unique(hashes, return_index=True)[1]
+        result = np.zeros(len(hashes), dtype=bool)
+        hashes = hashes[first]
+        h1 = (hashes & np.uint64(0xFFFFFFFF))[:, None]
+        h2 = ((hashes >> np.uint64(32)) | np.uint64(1))[:, None]
+        pos = (h1 + np.arange(self.k, dtype=np.uint64) * h2) % np.uint64(self.bits)
+        byte, mask = (pos >> np.uint64(3)).astype(np.intp), (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8))
+        new = ~((self._np[byte] & mask) != 0).all(axis=1)
+        byte, mask = byte[new].ravel(), mask[new].ravel()
+        # plain fancy |= drops all but one write per repeated byte, so redo those
+        while len(byte):
+            self._np[byte] |= mask
+            missed = (self._np[byte] & mask) == 0
+            byte, mask = byte[missed], mask[missed]
+        self.count += int(new.sum())
+        result[first] = new
+        return result
+
+
+class SetDedup:
+    # the old way: a Python set of ints, ~70+ bytes per entry
+    def __init__(self, capacity=0):
+        self._seen = set()
+
+    @property
+    def count(self):
+        return len(self._seen)
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self._seen) + 32 * len(self._seen)
+
+    def add(self, h):
+        if h in self._seen:
+            return False
+        self._seen.add(h)
+        return True
+
+    def add_many(self, hashes):
+        return np.array([self.add(h) for h in hashes.tolist()], dtype=bool)
+
+
+class _KeepAll:
+    # lets every hash through; used when ExternalDedup does the filtering
+    count = nbytes = 0
+
+    def add(self, h):
+        return True
+
+    def add_many(self, hashes):
+        return np.ones(len(hashes), dtype=bool)
+
+
+DEDUP_BACKENDS = {"table": HashTableDedup, "bloom": BloomDedup, "set": SetDedup}
+
+def make_dedup(kind=None, capacity=0, fp_rate=None):
+    # kind: backend name (default WIFI_DEDUP) or a ready backend, returned as is
+    kind = kind or WIFI_DEDUP
+    if not isinstance(kind, str):
+        return kind
+    if kind not in DEDUP_BACKENDS:
+        raise ValueError(f"bilinmeyen dedup: {kind} (secenekler: {', '.join(DEDUP_BACKENDS)})")
+    if kind == "bloom" and fp_rate:
+        return BloomDedup(capacity, fp_rate)
+    return DEDUP_BACKENDS[kind](capacity)
+
+# ------------------- Core: External dedup -------------------
+class ExternalDedup:
+    """
+    Disk-backed dedup for outputs bigger than RAM. add() collects lines
+    (bytes, no newline) until `memory` bytes are buffered, then spills them
+    as a sorted run file. unique_count() k-way merges the runs into a single
+    deduplicated run; iter_unique() re-sorts that by first occurrence and
+    streams it back, so lines come out in the order an in-memory set would
+    let them through.
+
+    Temp files live in a private directory under tmp_dir and are kept under
+    disk_limit bytes (OSError ENOSPC otherwise). on_phase(phase, self) is
+    called for "spill", "merge", "order" and "write".
+    """
+
+    _LINE_OVERHEAD = 64  # rough cost of one buffered bytes object
+
+    def __init__(self, memory=None, tmp_dir=None, disk_limit=None, on_phase=None):
+        self.memory = memory or EXTERNAL_DEDUP_MEMORY
+        self.disk_limit = disk_limit if disk_limit is not None else EXTERNAL_DEDUP_DISK_LIMIT
+        self.on_phase = on_phase
+        self.dir = tempfile.mkdtemp(prefix="generatekey-dedup-", dir=tmp_dir)
+        self.phase = "spill"
+        self.runs = []          # line-sorted run files, records: line \0 hex-index \n
+        self.spills = 0
+        self.temp_bytes = 0
+        self.buffered_bytes = 0
+        self._buf = []
+        self._base = 0          # index of _buf[0] in the input
+        self._merged = True     # runs holds at most one, already deduplicated run
+        self._unique = 0
+        self._seq = 0
+
+    @property
+    def added(self):
+        return self._base + len(self._buf)
+
+    def add(self, line):
+        self._buf.append(line)
+        self.buffered_bytes += len(line) + self._LINE_OVERHEAD
+        if self.buffered_bytes >= self.memory:
+            self._spill()
+
+    def add_many(self, lines):
+        lines = list(lines)
+        self._buf.extend(lines)
+        self.buffered_bytes += sum(map(len, lines)) + self._LINE_OVERHEAD * len(lines)
+        if self.buffered_bytes >= self.memory:
+            self._spill()
+
+    def _set_phase(self, phase):
+        self.phase = phase
+        if self.on_phase:
+            self.on_phase(phase, self)
+
+    def _spill(self):
+        t = time.perf_counter()
+        buf, base = self._buf, self._base
+        # stable sort: of equal lines the earliest index stays first and wins
+        order = sorted(range(len(buf)), key=buf.__getitem__)
+        records = []
+        prev = None
+        for i in order:
+            line = buf[i]
+            if line != prev:
+                records.append(b"%s\0%016x\n" % (line, base + i))
+                prev = line
+        self._base += len(buf)
+        self._buf = []
+        self.buffered_bytes = 0
+        self.runs.append(self._write_run(records))
+        self._merged = len(self.runs) == 1 and self._merged
+        self.spills += 1
+        stats_time("dedup", time.perf_counter() - t)
+        self._set_phase("spill")
+
+    def _write_run(self, records):
+        self._seq += 1
+        path = os.path.join(self.dir, f"run{self._seq:06d}")
+        chunk, size = [], 0
+        with open(path, "wb") as f:
+            for rec in records:
+                chunk.append(rec)
+                size += len(rec)
+                if size >= SINK_FLUSH_BYTES:
+                    self._charge(size)
+                    f.write(b"".join(chunk))
+                    chunk, size = [], 0
+            self._charge(size)
+            f.write(b"".join(chunk))
+        return path
+
+    def _charge(self, nbytes):
+        if self.disk_limit and self.temp_bytes + nbytes > self.disk_limit:
+            raise OSError(errno.ENOSPC, f"gecici disk siniri asildi ({format_mb(self.disk_limit)})", self.dir)
+        self.temp_bytes += nbytes
+
+    def _drop(self, paths):
+        for path in paths:
+            self.temp_bytes -= os.path.getsize(path)
+            os.remove(path)
+
+    def _merge(self, paths, dedup=True):
+        # k-way merge of sorted runs into one; with dedup the first record of each line wins
+        files = [open(p, "rb", buffering=1 << 16) for p in paths]
+        counted = [0]
+        try:
+            def records():
+                prev = None
+                for rec in heapq.merge(*files):
+                    if dedup:
+                        line = rec[:-18]
+                        if line == prev:
+                            continue
+                        prev = line
+                    counted[0] += 1
+                    yield rec
+            out = self._write_run(records())
+        finally:
+            for f in files:
+                f.close()
+        self._drop(paths)
+        return out, counted[0]
+
+    def _reduce(self, dedup=True):
+        # merge until one run is left, at most EXTERNAL_MERGE_FANIN files at a time
+        count = None
+        while len(self.runs) > 1:
+            group = self.runs[:EXTERNAL_MERGE_FANIN]
+            merged, count = self._merge(group, dedup)
+            self.runs = self.runs[len(group):] + [merged]
+        return count
+
+    def unique_count(self):
+        # distinct lines added so far; merges everything into one deduplicated run
+        if self._buf:
+            self._spill()
+        if not self._merged:
+            self._set_phase("merge")
+            self._unique = self._reduce()
+            self._merged = True
+        elif self.runs and not self._unique:
+            with open(self.runs[0], "rb") as f:
+                self._unique = sum(1 for _ in f)
+        return self._unique
+
+    def iter_unique(self, limit=None):
+        """
+        Yields the distinct lines (bytes) in first-occurrence order, at most
+        `limit` of them. Consumes the runs; call it once, at the end.
+        """
+        self.unique_count()
+        if not self.runs:
+            return
+        self._set_phase("order")
+        # second pass: same lines, now keyed by their fixed-width hex index
+        source = self.runs.pop()
+        self.runs, buf, size = [], [], 0
+        with open(source, "rb", buffering=1 << 16) as f:
+            for rec in f:
+                buf.append(rec[-17:-1] + rec[:-18] + b"\n")
+                size += len(rec) + self._LINE_OVERHEAD
+                if size >= self.memory:
+                    buf.sort()
+                    self.runs.append(self._write_run(buf))
+                    buf, size = [], 0
+        if buf:
+            buf.sort()
+            self.runs.append(self._write_run(buf))
+        self._drop([source])
+        del buf
+        self._reduce(dedup=False)
+        self._set_phase("write")
+        with open(self.runs[0], "rb", buffering=1 << 16) as f:
+            for n, rec in enumerate(f):
+                if limit is not None and n >= limit:
+                    break
+                yield rec[16:-1]
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.runs = []
+        self.temp_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# ------------------- Core: Exclusion index -------------------
+# Candidates that are already in a big reference list (rockyou & co.) only
+# waste cracking time. The list is turned once into a sorted array of 64-bit
+# line hashes on disk (list + EXCLUDE_INDEX_SUFFIX); runs mmap it and look
+# up a whole output buffer at a time, so nothing of the list becomes Python
+# objects and the page cache shares it between worker processes.
+_EXCLUDE_MAGIC = b"GKXIDX1" + (b"L" if sys.byteorder == "little" else b"B")
+_EXCLUDE_HEADER = 32  # magic, hash count, source size, source mtime_ns
+
+def _bytes_hash64(b: bytes) -> int:
+    # _hash64 for lines that are already bytes
+    return int.from_bytes(hashlib.blake2b(b, digest_size=8).digest(), "little")
+
+def exclude_index_path(source):
+    name = source + EXCLUDE_INDEX_SUFFIX
+    return os.path.join(EXCLUDE_INDEX_DIR, os.path.basename(name)) if EXCLUDE_INDEX_DIR else name
+
+def _read_exclude_header(path):
+    # (count, source size, source mtime_ns) of an index file, None if it is not one
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_EXCLUDE_HEADER)
+    except OSError:
+        return None
+    if len(head) < _EXCLUDE_HEADER or head[:8] != _EXCLUDE_MAGIC:
+        return None
+    return tuple(int.from_bytes(head[i:i + 8], "little") for i in (8, 16, 24))
+
+def _sorted_unique(hashes):
+    if np is not None:
+        return np.unique(np.frombuffer(hashes, dtype=np.uint64)).tobytes()
+    return array("Q", sorted(set(hashes))).tobytes()
+
+def _iter_hash_run(path):
+    with open(path, "rb") as f:
+        while True:
+            block = array("Q")
+            try:
+                block.fromfile(f, 1 << 16)
+            except EOFError:
+                pass
+            if not block:
+                return
+            yield from block
+
+def build_exclude_index(source, index_path=None, memory=None, on_progress=None):
+    """
+    Hashes every line of the wordlist `source` (as bytes, without the line
+    ending) and writes the sorted, distinct hashes to index_path (default
+    exclude_index_path(source)). Hashes are sorted in runs of `memory`
+    bytes and merged from disk, so lists far bigger than RAM work.
+    on_progress(lines) is called about every PROGRESS_PRINT_INTERVAL
+    seconds. Returns the number of distinct lines.
+    """
+    index_path = index_path or exclude_index_path(source)
+    per_run = max(1, (memory or EXCLUDE_BUILD_MEMORY) // 8)
+    st = os.stat(source)
+    tmp_dir = tempfile.mkdtemp(prefix="generatekey-exclude-", dir=os.path.dirname(os.path.abspath(index_path)))
+    runs = []
+    lines = 0
+    last_print = time.time()
+    try:
+        buf = array("Q")
+        with open(source, "rb") as f:
+            for line in f:
+                line = line.rstrip(b"\r\n")
+                if line:
+                    buf.append(_bytes_hash64(line))
+                lines += 1
+                if len(buf) >= per_run:
+                    runs.append(os.path.join(tmp_dir, f"run{len(runs):05d}"))
+                    with open(runs[-1], "wb") as r:
+                        r.write(_sorted_unique(buf))
+                    buf = array("Q")
+                if on_progress and not (lines & 0xFFFF):
+                    now = time.time()
+                    if now - last_print >= PROGRESS_PRINT_INTERVAL:
+                        on_progress(lines)
+                        last_print = now
+        tmp = index_path + ".tmp"
+        with open(tmp, "wb") as out:
+            out.write(bytes(_EXCLUDE_HEADER))
+            if not runs:
+                data = _sorted_unique(buf)
+                out.write(data)
+                count = len(data) // 8
+            else:
+                if buf:
+                    runs.append(os.path.join(tmp_dir, f"run{len(runs):05d}"))
+                    with open(runs[-1], "wb") as r:
+                        r.write(_sorted_unique(buf))
+                del buf
+                count = 0
+                block = array("Q")
+                prev = None
+                for h in heapq.merge(*(_iter_hash_run(r) for r in runs)):
+                    if h != prev:
+                        block.append(h)
+                        prev = h
+                        if len(block) >= 1 << 16:
+                            out.write(block.tobytes())
+                            count += len(block)
+                            block = array("Q")
+                out.write(block.tobytes())
+                count += len(block)
+            out.seek(0)
+            out.write(_EXCLUDE_MAGIC + b"".join(v.to_bytes(8, "little") for v in (count, st.st_size, st.st_mtime_ns)))
+        os.replace(tmp, index_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if on_progress:
+        on_progress(lines)
+    return count
+
+def open_exclude(sources, rebuild=False, on_build=None):
+    """
+    ExcludeIndex over reference wordlists. A source that is an index itself
+    is used as is; for a list, the index next to it (exclude_index_path) is
+    built on first use and reused while the list keeps its size and mtime.
+    on_build(source) is called before every (re)build and can return an
+    on_progress callback for build_exclude_index.
+    """
+    paths = []
+    for source in sources:
+        if _read_exclude_header(source) is not None:
+            paths.append(source)
+            continue
+        index = exclude_index_path(source)
+        st = os.stat(source)
+        head = _read_exclude_header(index)
+        if rebuild or head is None or head[1:] != (st.st_size, st.st_mtime_ns):
+            progress = on_build(source) if on_build else None
+            with stats_phase("exclude-index"):
+                build_exclude_index(source, index, on_progress=progress)
+        paths.append(index)
+    return ExcludeIndex(paths)
+
+class ExcludeIndex:
+    """
+    The read side of one or more exclusion indexes, each mapped with mmap.
+    keep_mask(lines) hashes a batch and looks all of it up at once
+    (np.searchsorted with NumPy, bisect over the mapped array without) and
+    says which lines are in none of the indexes. Pickles as its paths, so
+    worker processes map the same files.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._open()
+
+    def _open(self):
+        self._maps, self._arrays = [], []
+        self.count = 0
+        for path in self.paths:
+            head = _read_exclude_header(path)
+            if head is None:
+                raise ValueError(f"gecerli bir dislama indeksi degil: {path}")
+            n = head[0]
+            self.count += n
+            if not n:
+                continue
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            if np is not None:
+                self._arrays.append(np.frombuffer(mm, dtype=np.uint64, count=n, offset=_EXCLUDE_HEADER))
+            else:
+                self._arrays.append(memoryview(mm)[_EXCLUDE_HEADER:_EXCLUDE_HEADER + 8 * n].cast("Q"))
+
+    def __getstate__(self):
+        return {"paths": self.paths}
+
+    def __setstate__(self, state):
+        self.paths = state["paths"]
+        self._open()
+
+    def fingerprint(self):
+        # what a checkpoint has to match: the same indexes over the same lists
+        return [[path, *_read_exclude_header(path)] for path in self.paths]
+
+    def keep_mask(self, lines, raw=False):
+        if np is not None:
+            # digests joined straight into one array; sorted queries keep searchsorted cache-friendly
+            blake = hashlib.blake2b
+            if not raw:
+                lines = [line.encode("utf-8") for line in lines]
+            q = np.frombuffer(b"".join([blake(line, digest_size=8).digest() for line in lines]), dtype="<u8")
+            order = np.argsort(q)
+            q = q[order]
+            found = np.zeros(len(q), dtype=bool)
+            for arr in self._arrays:
+                pos = np.minimum(np.searchsorted(arr, q), len(arr) - 1)
+                found |= arr[pos] == q
+            keep = np.empty(len(q), dtype=bool)
+            keep[order] = ~found
+            return keep.tolist()
+        h = _bytes_hash64 if raw else _hash64
+        hashes = [h(line) for line in lines]
+        mask = []
+        for hv in hashes:
+            for arr in self._arrays:
+                i = bisect.bisect_left(arr, hv)
+                if i < len(arr) and arr[i] == hv:
+                    mask.append(False)
+                    break
+            else:
+                mask.append(True)
+        return mask
+
+    def keep(self, lines, raw=False):
+        # the lines of a batch that are not excluded (the same list if none is)
+        if not self._arrays or not lines:
+            return lines
+        mask = self.keep_mask(lines, raw)
+        if all(mask):
+            return lines
+        return list(itertools.compress(lines, mask))
+
+    def filter(self, items, raw=False, key=None, batch=EXCLUDE_BATCH):
+        # lazily drops excluded items of a stream, looked up `batch` at a time
+        it = iter(items)
+        while True:
+            chunk = list(itertools.islice(it, batch))
+            if not chunk:
+                return
+            if not self._arrays:
+                yield from chunk
+                continue
+            yield from itertools.compress(chunk, self.keep_mask([key(x) for x in chunk] if key else chunk, raw))
+
+    def __contains__(self, line):
+        return not self.keep_mask([line], isinstance(line, bytes))[0]
+
+    def close(self):
+        # the arrays hold buffers of the maps; drop them first
+        self._arrays = []
+        for mm in self._maps:
+            mm.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+# ------------------- Core: WiFi helpers -------------------
+
+def _hash64(s: str) -> int:
+    # 8-byte BLAKE2b: deterministic and cheaper per call than SHA-256 + slicing
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _has_triple_repeat(s: str) -> bool:
+    if len(s) < 3:
+        return False
+    # check any char repeated 3 times consecutively
+    for i in range(len(s)-2):
+        if s[i] == s[i+1] == s[i+2]:
+            return True
+    return False
+
+def _wifi_specials(specials):
+    # dedupe specials, drop whitespace, keep order
+    return list(dict.fromkeys(c for c in specials if not c.isspace())) or list(DEFAULT_SPECIALS)
+
+def _wifi_batched(specials):
+    # the batch engine works on single bytes, so it needs NumPy and ASCII specials
+    return np is not None and all(c.isascii() for c in specials)
+
+def _wifi_tables(specials):
+    # (others, specials, upper, lower) as uint8 lookup arrays
+    upper = bytes(range(ord("A"), ord("Z") + 1))
+    lower = bytes(range(ord("a"), ord("z") + 1))
+    classes = (upper + lower + b"0123456789", "".join(specials).encode("ascii"), upper, lower)
+    return tuple(np.frombuffer(c, dtype=np.uint8) for c in classes)
+
+def _wifi_hash64(chars, lengths):
+    # rows folded 8 bytes at a time through a splitmix64 finish, one uint64 per row
+    n, width = chars.shape
+    words = np.zeros((n, -(-width // 8) * 8), dtype=np.uint8)
+    words[:, :width] = chars
+    words = words.view("<u8")
+    h = lengths.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    for j in range(words.shape[1]):
+        z = h ^ words[:, j]
+        z ^= z >> np.uint64(30)
+        z *= np.uint64(0xBF58476D1CE4E5B9)
+        z ^= z >> np.uint64(27)
+        z *= np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+        h = np.where(lengths > 8 * j, z, h)
+    return h
+
+def _wifi_batch(rng, size, min_len, max_len, tables):
+    """
+    One block of candidates drawn exactly like the scalar loop: length, then
+    the special count, then special/upper/lower positions as the head of a
+    random permutation of the row, then one character per position from its
+    class. Returns (chars, lengths) of the rows that pass the rules; columns
+    past a row's length are zero.
+    """
+    others, specials, upper, lower = tables
+    cols = np.arange(max_len)
+    lengths = rng.integers(min_len, max_len + 1, size=size)
+    num_specials = rng.integers(0, np.maximum(np.minimum(2, lengths - 2), 0) + 1)
+    # need a free slot for the upper and the lower letter
+    ok = lengths - num_specials >= 2
+    lengths, num_specials = lengths[ok], num_specials[ok]
+    size = len(lengths)
+    rows = np.arange(size)
+    valid = cols < lengths[:, None]
+
+    keys = rng.random((size, max_len), dtype=np.float32)
+    keys[~valid] = 2.0
+    order = np.argsort(keys, axis=1)
+    chars = others[rng.integers(0, len(others), (size, max_len), dtype=np.uint8)]
+    for i in (0, 1):
+        has = rows[num_specials > i]
+        chars[has, order[has, i]] = specials[rng.integers(0, len(specials), len(has))]
+    chars[rows, order[rows, num_specials]] = upper[rng.integers(0, len(upper), size)]
+    chars[rows, order[rows, num_specials + 1]] = lower[rng.integers(0, len(lower), size)]
+    chars[~valid] = 0
+
+    triple = (chars[:, :-2] == chars[:, 1:-1]) & (chars[:, 1:-1] == chars[:, 2:]) & valid[:, 2:]
+    keep = ~triple.any(axis=1)
+    return chars[keep], lengths[keep]
+
+def new_wifi_seed():
+    # a fresh 63-bit seed, printed by the UI/CLI so a run can be repeated
+    return random.SystemRandom().randrange(1 << 63)
+
+def _wifi_block_rng(seed, block):
+    # counter-based: block b's stream depends only on (seed, b), so any
+    # worker can produce any block without stepping through the ones before it
+    return np.random.Generator(np.random.Philox(np.random.SeedSequence([seed, block])))
+
+def _wifi_block_size(block, batch_size, max_attempts):
+    return max(0, min(batch_size, max_attempts - block * batch_size))
+
+def _wifi_candidates(seed, block, size, min_len, max_len, tables):
+    # one block's rule-passing candidates and their hashes
+    chars, lengths = _wifi_batch(_wifi_block_rng(seed, block), size, min_len, max_len, tables)
+    return chars, lengths, _wifi_hash64(chars, lengths)
+
+def _wifi_lines(chars, lengths):
+    # rows -> newline-terminated ASCII bytes, in row order
+    n, width = chars.shape
+    lines = np.zeros((n, width + 1), dtype=np.uint8)
+    lines[:, :width] = chars
+    lines[np.arange(n), lengths] = 10
+    return lines[np.arange(width + 1) <= lengths[:, None]].tobytes()
+
+def iter_wifi_blocks(count, specials=DEFAULT_SPECIALS, min_len=WIFI_MIN_LEN, max_len=WIFI_MAX_LEN,
+                     batch_size=WIFI_BATCH_SIZE, seed=None, dedup=None):
+    """
+    NumPy batch engine behind generate_wifi_passwords. Yields (data, lines)
+    blocks: data is the ASCII bytes of `lines` unique newline-terminated
+    passwords, ready to be written out in one go. Rules are applied as
+    vectorized masks; dedup (see make_dedup) keeps a 64-bit hash per
+    accepted line. Needs NumPy and ASCII specials.
+
+    Block b is drawn from a Philox stream keyed by (seed, b), so the same
+    seed always gives the same list, whichever process makes the blocks.
+    """
+    specials = _wifi_specials(specials)
+    seed = new_wifi_seed() if seed is None else seed
+    tables = _wifi_tables(specials)
+    # the last block may add up to batch_size hashes past count
+    seen = make_dedup(dedup, count + batch_size)
+    written = block = 0
+    max_attempts = max(10 * count, 10_000_000)
+    while written < count:
+        size = _wifi_block_size(block, batch_size, max_attempts)
+        if not size:
+            break
+        chars, lengths, hashes = _wifi_candidates(seed, block, size, min_len, max_len, tables)
+        block += 1
+        # first occurrence wins, inside the block and against earlier blocks
+        t = time.perf_counter()
+        keep = np.flatnonzero(seen.add_many(hashes))[:count - written]
+        stats_time("dedup", time.perf_counter() - t)
+        stats_count("candidates", len(hashes))
+        if not len(keep):
+            continue
+        written += len(keep)
+        yield _wifi_lines(chars[keep], lengths[keep]), len(keep)
+
+# ------------------- Core: Parallel WiFi -------------------
+def _run_wifi_shard(seed, first_block, nblocks, specials, min_len, max_len, batch_size, max_attempts, part_path):
+    # writes blocks [first_block, first_block + nblocks) to part_path and their hashes to part_path.hash
+    stop = _SHARD_STATE["stop"]
+    tables = _wifi_tables(specials)
+    n = 0
+    with OutputSink(part_path, raw=True) as sink, open(part_path + ".hash", "wb") as hash_file:
+        for block in range(first_block, first_block + nblocks):
+            size = _wifi_block_size(block, batch_size, max_attempts)
+            if not size or stop.is_set():
+                break
+            chars, lengths, hashes = _wifi_candidates(seed, block, size, min_len, max_len, tables)
+            data = _wifi_lines(chars, lengths)
+            sink.write_block(data, len(lengths))
+            hash_file.write(hashes.tobytes())
+            n += len(lengths)
+            _shard_report(len(lengths), len(data))
+    return n
+
+def _remove_parts(paths):
+    for path in paths:
+        for p in (path, path + ".hash"):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+def write_wifi_parallel(sink, count, specials, workers, seed, seen, batch_size=WIFI_BATCH_SIZE, on_progress=None,
+                        min_len=WIFI_MIN_LEN, max_len=WIFI_MAX_LEN):
+    """
+    Generates the blocks of iter_wifi_blocks(seed=seed) on `workers`
+    processes. Each shard (a run of consecutive blocks) goes to its own part
+    file; the parent merges the parts in block order through the `seen`
+    dedup backend into `sink` and stops once `count` lines are out, so a
+    seed gives the same list as the single-process engine.
+    on_progress(written, bytes, dedup_bytes) as in write_wifi_passwords.
+    Returns lines written.
+    """
+    specials = _wifi_specials(specials)
+    max_attempts = max(10 * count, 10_000_000)
+    max_blocks = -(-max_attempts // batch_size)
+    # enough shards to keep every worker busy, small enough to not overshoot much
+    shard_blocks = max(1, min(16, -(-count // (batch_size * workers * PARALLEL_SHARDS_PER_WORKER))))
+    part_base = sink.path
+    if is_stream_target(part_base):
+        part_base = os.path.join(tempfile.gettempdir(), f"generatekey-{os.getpid()}")
+    produced = multiprocessing.Value("Q", 0)
+    nbytes = multiprocessing.Value("Q", 0)
+    stop = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                   initargs=(produced, nbytes, stop))
+    futures = {}
+    parts = []
+    written = 0
+
+    def submit():
+        k = len(parts)
+        first = k * shard_blocks
+        if first >= max_blocks:
+            return False
+        parts.append(f"{part_base}.wifi{k:05d}")
+        futures[k] = executor.submit(_run_wifi_shard, seed, first, shard_blocks, specials, min_len, max_len,
+                                     batch_size, max_attempts, parts[k])
+        return True
+
+    def merge(k):
+        nonlocal written
+        hashes = np.fromfile(parts[k] + ".hash", dtype=np.uint64)
+        with open(parts[k], "rb") as f:
+            data = f.read()
+        _remove_parts([parts[k]])
+        # batch-sized steps, so `seen` never takes more than batch_size past count
+        found = []
+        need = count - written
+        t = time.perf_counter()
+        stats_count("candidates", len(hashes))
+        for i in range(0, len(hashes), batch_size):
+            if need <= 0:
+                break
+            found.append(np.flatnonzero(seen.add_many(hashes[i:i + batch_size])) + i)
+            need -= len(found[-1])
+        keep = np.concatenate(found)[:count - written] if found else np.zeros(0, dtype=np.intp)
+        stats_time("dedup", time.perf_counter() - t)
+        if len(keep) < len(hashes):
+            lines = data.split(b"\n")
+            data = b"".join(lines[i] + b"\n" for i in keep.tolist())
+        if len(keep):
+            sink.write_block(data, len(keep))
+        written += len(keep)
+
+    try:
+        for _ in range(2 * workers):
+            submit()
+        next_part = 0
+        while written < count and next_part < len(parts):
+            fut = futures.pop(next_part)
+            while not wait([fut], timeout=PROGRESS_PRINT_INTERVAL).done:
+                if on_progress:
+                    on_progress(written, sink.tell(), seen.nbytes)
+            fut.result()
+            merge(next_part)
+            next_part += 1
+            if written < count:
+                submit()
+            if on_progress:
+                on_progress(written, sink.tell(), seen.nbytes)
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        _remove_parts(parts)
+    return written
+
+# ------------------- Core: WiFi keyspace -------------------
+_WIFI_CLASSES = 4  # upper, lower, digit, special
+
+def _wifi_space_classes(specials):
+    # disjoint character classes; ASCII letters/digits given as specials are
+    # already in their own class, so they never count against the special limit
+    upper = [chr(i) for i in range(ord("A"), ord("Z") + 1)]
+    lower = [chr(i) for i in range(ord("a"), ord("z") + 1)]
+    digits = [str(i) for i in range(10)]
+    own = set(upper + lower + digits)
+    return upper, lower, digits, [c for c in _wifi_specials(specials) if c not in own]
+
+class WifiSpace:
+    """
+    Exact keyspace of the WIFI GENERATOR rules: length min_len..max_len, at
+    most min(2, length - 2) specials, at least one upper and one lower
+    letter, no character three times in a row. Every password the random
+    engines can produce is in here, and nothing else.
+
+    Candidates are ordered by length, then position by position in
+    alphabet order (A-Z, a-z, 0-9, specials). A DP over (specials used,
+    has upper, has lower, class of the last char, its run length) counts
+    the completions of every prefix, so unrank/rank walk one position at a
+    time, one step per class, without generating anything.
+    """
+
+    def __init__(self, specials=DEFAULT_SPECIALS, min_len=WIFI_MIN_LEN, max_len=WIFI_MAX_LEN):
+        self.classes = _wifi_space_classes(specials)
+        self.alphabet = [c for chars in self.classes for c in chars]
+        self._where = {c: (k, j) for k, chars in enumerate(self.classes) for j, c in enumerate(chars)}
+        self.min_len = max(min_len, 0)
+        self.max_len = max_len
+        self.lengths = list(range(self.min_len, max_len + 1))
+        self._tables = {L: self._completions(L) for L in self.lengths}
+        self.counts = {L: self._tables[L][L][(0, False, False, -1, 0)] for L in self.lengths}
+        self._cum = [0]
+        for L in self.lengths:
+            self._cum.append(self._cum[-1] + self.counts[L])
+        self.total = self._cum[-1]
+
+    @staticmethod
+    def _step(state, k, same, max_specials):
+        # state after appending a char of class k (same: the previous char again)
+        specials, has_upper, has_lower, last, run = state
+        specials += k == 3
+        if specials > max_specials or (same and run >= 2):
+            return None
+        return specials, has_upper or k == 0, has_lower or k == 1, k, run + 1 if same else 1
+
+    def _completions(self, L):
+        # f[r][state]: valid ways to add r more chars to a prefix in `state`
+        max_specials = min(2, L - 2)
+        sizes = [len(chars) for chars in self.classes]
+        states = [(s, u, l, k, run) for s in range(3) for u in (False, True) for l in (False, True)
+                  for k in range(-1, _WIFI_CLASSES) for run in range(3)]
+        f = [{st: int(st[0] <= max_specials and st[1] and st[2]) for st in states}]
+        for _ in range(L):
+            prev, row = f[-1], {}
+            for st in states:
+                n = 0
+                for k in range(_WIFI_CLASSES):
+                    nxt = self._step(st, k, False, max_specials)
+                    if nxt is not None:
+                        n += (sizes[k] - (k == st[3])) * prev[nxt]
+                if st[3] >= 0:
+                    nxt = self._step(st, st[3], True, max_specials)
+                    if nxt is not None:
+                        n += prev[nxt]
+                row[st] = n
+            f.append(row)
+        return f
+
+    def _moves(self, f, r, state, k, max_specials):
+        # (per-char count, same-char count) for class k with r chars left after it
+        nxt = self._step(state, k, False, max_specials)
+        diff = f[r][nxt] if nxt is not None else 0
+        same = 0
+        if k == state[3]:
+            nxt_same = self._step(state, k, True, max_specials)
+            same = f[r][nxt_same] if nxt_same is not None else 0
+        return diff, same
+
+    def unrank(self, n):
+        # the n-th password (0-based)
+        if not 0 <= n < self.total:
+            raise IndexError(f"indeks aralik disinda: {n} (toplam {self.total})")
+        i = bisect.bisect_right(self._cum, n) - 1
+        n -= self._cum[i]
+        L = self.lengths[i]
+        f, max_specials = self._tables[L], min(2, L - 2)
+        state, last_j, out = (0, False, False, -1, 0), -1, []
+        for pos in range(L):
+            r = L - pos - 1
+            for k, chars in enumerate(self.classes):
+                diff, same = self._moves(f, r, state, k, max_specials)
+                if k != state[3]:
+                    block = len(chars) * diff
+                    if n >= block:
+                        n -= block
+                        continue
+                    j, n = divmod(n, diff)
+                    is_same = False
+                else:
+                    block = (len(chars) - 1) * diff + same
+                    if n >= block:
+                        n -= block
+                        continue
+                    # chars before last_j, then last_j itself, then the rest
+                    head = last_j * diff
+                    if n < head:
+                        j, n = divmod(n, diff)
+                        is_same = False
+                    elif n < head + same:
+                        j, n, is_same = last_j, n - head, True
+                    else:
+                        j, n = divmod(n - head - same, diff)
+                        j += last_j + 1
+                        is_same = False
+                break
+            state = self._step(state, k, is_same, max_specials)
+            last_j = j
+            out.append(chars[j])
+        return "".join(out)
+
+    def rank(self, password):
+        # inverse of unrank; ValueError if the password breaks a rule
+        L = len(password)
+        if L not in self._tables:
+            raise ValueError("uzunluk araliginin disinda")
+        f, max_specials = self._tables[L], min(2, L - 2)
+        r_total = self._cum[self.lengths.index(L)]
+        state, last_j = (0, False, False, -1, 0), -1
+        for pos, c in enumerate(password):
+            if c not in self._where:
+                raise ValueError(f"alfabe disi karakter: {c!r}")
+            k, j = self._where[c]
+            r = L - pos - 1
+            for k2 in range(k):
+                diff, same = self._moves(f, r, state, k2, max_specials)
+                r_total += (len(self.classes[k2]) - (k2 == state[3])) * diff + same
+            diff, same = self._moves(f, r, state, k, max_specials)
+            is_same = k == state[3] and j == last_j
+            if k != state[3] or j < last_j:
+                r_total += j * diff
+            elif is_same:
+                r_total += last_j * diff
+            else:
+                r_total += (j - 1) * diff + same
+            state = self._step(state, k, is_same, max_specials)
+            if state is None:
+                raise ValueError("aday kurallara uymuyor")
+            last_j = j
+        if not (state[1] and state[2]):
+            raise ValueError("aday kurallara uymuyor")
+        return r_total
+
+    def __contains__(self, password):
+        try:
+            self.rank(password)
+        except ValueError:
+            return False
+        return True
+
+    def iter_range(self, start, count=None):
+        # passwords start, start+1, ... in keyspace order
+        stop = self.total if count is None else min(self.total, start + max(count, 0))
+        for n in range(start, stop):
+            yield self.unrank(n)
+
+    def _permutation(self, seed):
+        """
+        A bijection on range(total) keyed by seed: a 4-round Feistel network
+        over the next even bit width, cycle-walked back into range. Maps
+        0, 1, 2, ... to distinct indices, so no dedup set is needed.
+        """
+        bits = max(2, (self.total - 1).bit_length())
+        bits += bits & 1
+        half = bits // 2
+        mask = (1 << half) - 1
+        key = hashlib.blake2b(str(seed).encode(), digest_size=16).digest()
+        width = (half + 7) // 8 or 1
+
+        def round_fn(rnd, x):
+            h = hashlib.blake2b(x.to_bytes(width, "little"), key=key, digest_size=8, salt=bytes([rnd]) * 16)
+            return int.from_bytes(h.digest(), "little") & mask
+
+        def permute(x):
+            while True:
+                left, right = x >> half, x & mask
+                for rnd in range(4):
+                    left, right = right, left ^ round_fn(rnd, right)
+                x = (left << half) | right
+                if x < self.total:
+                    return x
+        return permute
+
+    def sample(self, count, seed=None):
+        """
+        Yields min(count, total) distinct passwords in a seed-dependent
+        random order, by unranking a keyed permutation of the index range:
+        no rejected candidates and no dedup memory.
+        """
+        if self.total == 0 or count <= 0:
+            return
+        permute = self._permutation(new_wifi_seed() if seed is None else seed)
+        for i in range(min(count, self.total)):
+            yield self.unrank(permute(i))
+
+# ------------------- Library API -------------------
+# Everything below is usable without the terminal UI:
+#
+#   import generatekey as gk
+#   for pw in gk.generate_wordlist("omer faruk", "19 90", "!", 4, 12):
+#       ...
+#   gk.run_wordlist(gk.build_pool(["omer"], ["1990"], ["!"])[0], 4, 12, "out.txt")
+#   for pw in gk.generate_wifi_passwords(1000):
+#       ...
+def _as_tokens(value):
+    # accepts "omer faruk", ["omer", "faruk"] or None
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return parse_tokens(value)
+    return [t for t in value if t != ""]
+
+def _case_policy(case):
+    # case / case_expand arguments: True means CASE_POLICY, a string names a policy
+    return CASE_POLICY if case is True else case
+
+def build_pool(words=(), numbers=(), specials=(), case_expand=False):
+    """
+    Flattens the token classes into the ordered, de-duplicated pool the
+    generator walks. Returns (tokens, expansion_info) where expansion_info
+    lists (original token, number of variants). case_expand (True or a
+    policy name) puts every variant into the pool; run_wordlist(case=...)
+    expands lazily instead and is much cheaper for long tokens.
+    """
+    original_tokens = _as_tokens(words) + _as_tokens(numbers) + _as_tokens(specials)
+    expanded = []
+    expansion_info = []
+    for t in original_tokens:
+        v = case_policy_variants(t, _case_policy(case_expand)) if case_expand else [t]
+        expanded.extend(v)
+        expansion_info.append((t, len(v)))
+    return list(dict.fromkeys(expanded)), expansion_info
+
+def generate_wordlist(words=(), numbers=(), specials=(), min_len=4, max_len=12, case_expand=False, dedup=None,
+                      rules=None, templates=None, repeat=None, best_first=False, weights=None, top=None,
+                      constraints=None, exclude=None):
+    # yields the unique candidates in the same order the wordlist file gets them;
+    # case_expand (True or a policy name) is applied lazily, see CaseExpander;
+    # rules (hashcat-style strings) mangle every candidate, see RuleStage;
+    # templates ("{word}{number}") replace the orderings, see TemplateSpace;
+    # best_first (or top) yields the most likely lines first, see BestFirst;
+    # constraints (a PasswordPolicy) keeps only the lines that comply;
+    # exclude (an ExcludeIndex, see open_exclude) drops lines of reference lists
+    if exclude is not None:
+        lines = generate_wordlist(words, numbers, specials, min_len, max_len, case_expand, dedup, rules, templates,
+                                  repeat, best_first or top is not None, weights, None, constraints)
+        yield from itertools.islice(exclude.filter(lines), top)
+        return
+    tokens, _ = build_pool(words, numbers, specials)
+    if not tokens:
+        return
+    if best_first or top is not None:
+        best = BestFirst(words, numbers, specials, min_len, max_len, templates, case_expand, rules, weights, repeat)
+        for _, line in itertools.islice(_compliant(best, constraints), best.limit(top)):
+            yield line
+        return
+    # rules can change any class: the walk is left alone and the stage checks
+    walk_constraints = None if rules else constraints
+    if templates:
+        spaces = template_spaces(templates, _as_tokens(words), _as_tokens(numbers), _as_tokens(specials), min_len,
+                                 max_len, repeat, case_expand)
+        # with rules the RuleStage drops the repeats
+        lines = itertools.chain.from_iterable(spaces) if rules else iter_templates(spaces)
+        if walk_constraints is not None:
+            lines = filter(walk_constraints.check, lines)
+    elif not case_expand:
+        lines = _iter_wordlist(tokens, min_len, max_len, dedup, walk_constraints)
+    else:
+        exp = CaseExpander(tokens, _case_policy(case_expand), constraints=walk_constraints)
+        if _dedup_mode(dedup) in ("set", "external"):
+            lines = exp.expand_all(_iter_wordlist(exp.pool, min_len, max_len, dedup))
+        else:
+            lines = exp.lines(min_len, max_len)
+    if not rules:
+        yield from lines
+        return
+    stage = RuleStage(rules, min_len, max_len, constraints=constraints)
+    for line in lines:
+        yield from stage.apply_many((line,))
+
+def _iter_wordlist(tokens, min_len, max_len, dedup, constraints=None):
+    mode = _dedup_mode(dedup)
+    if mode == "external":
+        with _external_dedup(dedup) as ext:
+            for s in iter_sequences(tokens, min_len, max_len, constraints=constraints):
+                ext.add(s.encode("utf-8"))
+            for line in ext.iter_unique():
+                yield line.decode("utf-8")
+        return
+    if mode != "set":
+        yield from iter_sequences(tokens, min_len, max_len, unique=True, constraints=constraints)
+        return
+    seen = set()
+    for s in iter_sequences(tokens, min_len, max_len, constraints=constraints):
+        if s not in seen:
+            seen.add(s)
+            yield s
+
+def estimate_wordlist(tokens, min_len, max_len, case=None, rules=None, constraints=None):
+    """
+    Pre-run numbers for run_wordlist with the same arguments: returns
+    (sequences, counts, line_bytes, exact); counts/line_bytes are per length
+    as in count_unique_strings, exact False means they are upper bounds.
+    """
+    with stats_phase("counting"):
+        return _estimate_wordlist(tokens, min_len, max_len, case, rules, constraints)
+
+def _estimate_wordlist(tokens, min_len, max_len, case, rules, constraints=None):
+    # with rules the policy is checked after mangling, so only a bound is known
+    walk_constraints = None if rules else constraints
+    if case:
+        counts, line_bytes, exact = count_case_expanded(tokens, _case_policy(case), min_len, max_len,
+                                                        walk_constraints)
+        # skeleton sequences weighted by their variants
+        sequences = sum(counts)
+    else:
+        sequences = count_sequence_combinations([len(t) for t in tokens], min_len, max_len, walk_constraints,
+                                                tokens)
+        counts, line_bytes, exact = count_unique_strings(tokens, min_len, max_len, constraints=walk_constraints)
+    if rules:
+        counts, line_bytes, exact = count_with_rules(counts, line_bytes, exact, rules, min_len, max_len)
+        exact = exact and constraints is None
+        sequences *= len(rules)
+    return sequences, counts, line_bytes, exact
+
+def _dedup_mode(dedup):
+    # dedup: None (DEDUP_MODE), "canonical", "set", "external" or an ExternalDedup
+    if isinstance(dedup, ExternalDedup):
+        return "external"
+    return dedup or DEDUP_MODE
+
+def _external_dedup(dedup):
+    return dedup if isinstance(dedup, ExternalDedup) else ExternalDedup()
+
+def _wordlist_job(tokens, min_len, max_len, workers, dedup, case=None, rules=None, constraints=None, exclude=None,
+                  case_cache=None):
+    # shards are deduped structurally, a per-process set would miss cross-shard repeats
+    unique = _dedup_mode(dedup) not in ("set", "external") or workers > 1
+    # ASCII-only pools run on bytes end to end: no per-line encode on output
+    raw = all(t.isascii() for t in tokens) and all(r.isascii() for r in rules or ())
+    expander = stage = None
+    extra = {}
+    # the walk prunes on the policy unless rules mangle the lines afterwards
+    walk_constraints = constraints
+    if constraints is not None:
+        extra["constraints"] = constraints.describe()
+    if exclude is not None:
+        extra["exclude"] = exclude.fingerprint()
+    if rules:
+        stage = RuleStage(rules, min_len, max_len, raw, constraints=constraints)
+        extra["rules"] = stage.rules
+        walk_constraints = None
+    if case:
+        # the walk runs on the skeleton pool, variants are added per line
+        expander = CaseExpander(tokens, _case_policy(case), raw, walk_constraints, case_cache)
+        pool = expander.pool
+        extra["case"] = expander.policy
+    else:
+        pool = [t.encode("ascii") for t in tokens] if raw else list(tokens)
+    fingerprint = job_fingerprint(pool, min_len=min_len, max_len=max_len, unique=unique, workers=workers,
+                                  shards=PARALLEL_SHARDS_PER_WORKER, ordered=PARALLEL_MERGE_ORDERED, **extra)
+    return pool, raw, unique, fingerprint, expander, stage, walk_constraints
+
+def find_wordlist_checkpoint(tokens, min_len, max_len, out_path, workers=1, dedup=None, case=None, rules=None,
+                             constraints=None, exclude=None):
+    # the checkpoint run_wordlist(..., resume=True) would continue from, or None
+    if not is_resumable_target(out_path) or not os.path.exists(out_path):
+        return None
+    fingerprint = _wordlist_job(tokens, min_len, max_len, workers, dedup, case, rules, constraints, exclude)[3]
+    return load_checkpoint(checkpoint_path_for(out_path), fingerprint)
+
+def run_wordlist(tokens, min_len, max_len, out_path, workers=1, dedup=None, resume=False, on_progress=None,
+                 case=None, rules=None, constraints=None, exclude=None, split=None):
+    """
+    Writes the wordlist for a token pool (see build_pool) to out_path.
+    on_progress(written, attempted, bytes) is called about every
+    PROGRESS_PRINT_INTERVAL seconds. With resume=True a matching checkpoint
+    is continued; otherwise any old one is dropped. On Ctrl+C a checkpoint
+    is left behind and KeyboardInterrupt is re-raised.
+    out_path "-" (or a named pipe) streams the candidates; there is nothing
+    to seek back into, so streams never checkpoint or resume. Neither do
+    compressed targets (.gz, .zst, ... see OUTPUT_CODECS).
+    dedup="external" (or an ExternalDedup with its own limits) spills to
+    temp files and writes the output only after the merge; no checkpoints.
+    case (True or a policy name, see CASE_POLICY) adds case variants of the
+    plain `tokens` per emitted line instead of through the pool.
+    rules (hashcat-style rule strings, see load_rules) mangle every line
+    on the way out; see RuleStage.
+    constraints (a PasswordPolicy) writes only compliant lines; the walk
+    skips the branches that cannot comply (see iter_sequences).
+    exclude (an ExcludeIndex, see open_exclude) keeps lines that are in
+    the reference lists out of the output; written counts what is left.
+    split (an OutputSplit) spreads the output over several files, see
+    SplitSink; without a plan it gets one from estimate_wordlist. A split
+    run never checkpoints.
+    Returns (written, bytes).
+    """
+    with stats_phase("expansion"):
+        pool, raw, unique, fingerprint, expander, stage, walk = _wordlist_job(tokens, min_len, max_len, workers,
+                                                                              dedup, case, rules, constraints,
+                                                                              exclude)
+    if split is not None and split.plan is None:
+        split = split.with_plan(*estimate_wordlist(tokens, min_len, max_len, case, rules, constraints)[1:])
+    external = workers <= 1 and _dedup_mode(dedup) == "external"
+    ckpt = state = None
+    if is_resumable_target(out_path) and not external and split is None:
+        ckpt = checkpoint_path_for(out_path)
+        state = (find_wordlist_checkpoint(tokens, min_len, max_len, out_path, workers, dedup, case, rules,
+                                          constraints, exclude) if resume else None)
+        if state is None:
+            remove_checkpoint(ckpt)
+
+    if external:
+        with stats_phase("enumeration"):
+            return _run_wordlist_external(pool, raw, min_len, max_len, out_path, _external_dedup(dedup), on_progress,
+                                          expander, stage, walk, exclude, split)
+    if workers > 1:
+        progress = (lambda n, b: on_progress(n, n, b)) if on_progress else None
+        with stats_phase("enumeration"):
+            return generate_wordlist_parallel(pool, min_len, max_len, out_path, workers, raw=raw,
+                                              ordered=PARALLEL_MERGE_ORDERED, on_progress=progress,
+                                              checkpoint=ckpt, fingerprint=fingerprint, resume_state=state,
+                                              expander=expander, stage=stage, constraints=walk, exclude=exclude,
+                                              split=split)
+
+    written = attempted = 0
+    after = None
+    seen = None if unique else set()
+    if state:
+        truncate_output(out_path, state["offset"])
+        written, attempted, after = state["written"], state["attempted"], state["path"]
+        if seen is not None and stage is None:
+            lines = read_lines(out_path, raw)
+            # the set holds skeletons; a lower-cased line is its skeleton
+            seen.update((l.lower() for l in lines) if expander else lines)
+        elif seen is not None:
+            # mangled lines are not skeletons: walk the tree again up to the checkpoint
+            last = (b"" if raw else "").join(pool[i] for i in after)
+            for s in iter_sequences(pool, min_len, max_len, constraints=None if expander else walk):
+                seen.add(s)
+                if s == last:
+                    break
+        if stage is not None:
+            stage.prime(read_lines(out_path, raw))
+    stream = iter_sequences(pool, min_len, max_len, unique=unique, resume_after=after,
+                            constraints=None if expander else walk)
+    expand = None
+    plain = expander is None and stage is None
+    if expander:
+        # (skeleton, variants); the set mode only expands the skeletons it keeps
+        expand = expander.expand
+        stream = expander.walk(min_len, max_len, resume_after=after) if unique else ((s, None) for s in stream)
+    last_written = None
+    writes_since = 0
+    last_print = last_ckpt = time.time()
+    sink = open_sink(out_path, raw=raw, append=state is not None, exclude=exclude, split=split)
+
+    def write_checkpoint():
+        if ckpt is None or last_written is None:
+            return
+        sink.sync()
+        save_checkpoint(ckpt, {"fingerprint": fingerprint, "mode": "single",
+                               "path": canonical_parse(last_written, pool), "offset": sink.tell(),
+                               "written": written - sink.excluded, "attempted": attempted})
+
+    with sink, stats_phase("enumeration"):
+        try:
+            write = sink.write
+            for curr in stream:
+                attempted += 1
+                if expand is not None:
+                    curr, variants = curr
+                if seen is None or curr not in seen:
+                    if plain:
+                        write(curr)
+                        written += 1
+                        writes_since += 1
+                    else:
+                        # a skeleton's spellings (and their mangles) go into the buffer in one step
+                        if expand is not None:
+                            variants = variants or list(expand(curr))
+                        else:
+                            variants = [curr]
+                        attempted += max(len(variants), 1) - 1
+                        if stage is not None:
+                            attempted += len(variants) * (len(stage.rules) - 1)
+                            variants = stage.apply_many(variants)
+                        n = len(variants)
+                        if n == 1:
+                            write(variants[0])
+                        elif n:
+                            sink.write_many(variants)
+                        written += n
+                        writes_since += n
+                    if seen is not None:
+                        seen.add(curr)
+                    last_written = curr
+                # time.time() is not free; only look at the clock every 256 candidates (or lines,
+                # attempted can step over a multiple of 256), and push progress only once per interval
+                if writes_since >= 0x100 or not (attempted & 0xFF):
+                    writes_since = 0
+                    now = time.time()
+                    if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                        if on_progress:
+                            on_progress(written - sink.excluded, attempted, sink.tell())
+                        last_print = now
+                    if now - last_ckpt >= CHECKPOINT_INTERVAL:
+                        write_checkpoint()
+                        last_ckpt = now
+        except KeyboardInterrupt:
+            write_checkpoint()
+            if on_progress:
+                on_progress(written - sink.excluded, attempted, sink.tell())
+            raise
+        sink.flush()
+        if on_progress:
+            on_progress(written - sink.excluded, attempted, sink.tell())
+    remove_checkpoint(ckpt)
+    return written - sink.excluded, sink.tell()
+
+def _run_wordlist_external(pool, raw, min_len, max_len, out_path, ext, on_progress, expander=None, stage=None,
+                           constraints=None, exclude=None, split=None):
+    # spill phase reports (0, attempted, 0); the write phase reports the real output
+    attempted = written = 0
+    last_print = time.time()
+    with ext, open_sink(out_path, raw=True, exclude=exclude, split=split) as sink:
+        for curr in iter_sequences(pool, min_len, max_len, constraints=None if expander else constraints):
+            ext.add(curr if raw else curr.encode("utf-8"))
+            attempted += 1
+            if on_progress and not (attempted & 0xFF):
+                now = time.time()
+                if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                    on_progress(0, attempted, 0)
+                    last_print = now
+        write = sink.write
+        lines = ext.iter_unique()
+        if expander:
+            # only skeletons went through the merge
+            lines = expander.expand_all(l if raw else l.decode("utf-8") for l in lines)
+            if not raw:
+                lines = (l.encode("utf-8") for l in lines)
+        if stage:
+            lines = _mangled(stage, lines, raw)
+        for line in lines:
+            write(line)
+            written += 1
+            if on_progress and not (written & 0xFF):
+                now = time.time()
+                if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                    on_progress(written - sink.excluded, attempted, sink.tell())
+                    last_print = now
+        sink.flush()
+        if on_progress:
+            on_progress(written - sink.excluded, attempted, sink.tell())
+    return written - sink.excluded, sink.tell()
+
+def _mangled(stage, lines, raw):
+    # encoded lines through a RuleStage
+    for line in lines:
+        for w in stage.apply_many((line if raw else line.decode("utf-8"),)):
+            yield w if raw else w.encode("utf-8")
+
+def _template_fingerprint(spaces, stage=None, constraints=None, exclude=None):
+    sp = spaces[0]
+    options = {cls: [v for v, _ in opts] for s in spaces for cls, opts in s.options.items()}
+    extra = {"rules": stage.rules} if stage is not None else {}
+    if constraints is not None:
+        extra["constraints"] = constraints.describe()
+    if exclude is not None:
+        extra["exclude"] = exclude.fingerprint()
+    return job_fingerprint([s.template for s in spaces], options=options, min_len=sp.min_len, max_len=sp.max_len,
+                           repeat=sp.repeat, mode="template", **extra)
+
+def estimate_templates(spaces, rules=None):
+    """
+    Pre-run numbers for run_templates: returns (per_template, counts,
+    line_bytes, exact) with per_template the exact (template, fillings)
+    pairs. Different fillings may spell the same line, so the totals are
+    upper bounds (exact False) like the other estimates; a policy is not
+    counted in, the fillings it drops are still part of the bound.
+    """
+    max_len = max(s.max_len for s in spaces)
+    counts = [0] * (max_len + 1)
+    line_bytes = [0] * (max_len + 1)
+    for s in spaces:
+        for L, (c, b) in enumerate(zip(s.counts, s.line_bytes)):
+            counts[L] += c
+            line_bytes[L] += b
+    exact = False
+    if rules:
+        counts, line_bytes, exact = count_with_rules(counts, line_bytes, exact, rules, spaces[0].min_len, max_len)
+    return [(s.template, s.total) for s in spaces], counts, line_bytes, exact
+
+def find_template_checkpoint(spaces, out_path, rules=None, constraints=None, exclude=None):
+    # the checkpoint run_templates(..., resume=True) would continue from, or None
+    if not is_resumable_target(out_path) or not os.path.exists(out_path):
+        return None
+    stage = RuleStage(rules, spaces[0].min_len, spaces[0].max_len) if rules else None
+    return load_checkpoint(checkpoint_path_for(out_path), _template_fingerprint(spaces, stage, constraints, exclude))
+
+def run_templates(spaces, out_path, resume=False, on_progress=None, rules=None, dedup=None, constraints=None,
+                  exclude=None, split=None):
+    """
+    Writes the candidates of template_spaces(...) to out_path, template by
+    template. on_progress, resume and Ctrl+C work as in run_wordlist;
+    attempted counts slot fillings (see estimate_templates). A line two
+    fillings spell is written once: dedup names the hash backend
+    (TEMPLATE_DEDUP), with rules the RuleStage filters instead.
+    constraints (a PasswordPolicy) drops the lines that do not comply,
+    exclude (an ExcludeIndex) the ones in the reference lists. split as
+    in run_wordlist, planned from estimate_templates.
+    Returns (written, bytes).
+    """
+    min_len, max_len = spaces[0].min_len, spaces[0].max_len
+    stage = RuleStage(rules, min_len, max_len, dedup=dedup, constraints=constraints) if rules else None
+    fingerprint = _template_fingerprint(spaces, stage, constraints, exclude)
+    if split is not None and split.plan is None:
+        split = split.with_plan(*estimate_templates(spaces, rules)[1:])
+    ckpt = state = None
+    if is_resumable_target(out_path) and split is None:
+        ckpt = checkpoint_path_for(out_path)
+        state = find_template_checkpoint(spaces, out_path, rules, constraints, exclude) if resume else None
+        if state is None:
+            remove_checkpoint(ckpt)
+
+    seen = make_dedup(dedup or TEMPLATE_DEDUP) if stage is None else None
+    written = attempted = 0
+    if state:
+        truncate_output(out_path, state["offset"])
+        written, attempted = state["written"], state["attempted"]
+        lines = read_lines(out_path, False)
+        if stage is not None:
+            stage.prime(lines)
+        else:
+            for line in lines:
+                seen.add(_hash64(line))
+    # the fillings stream is deterministic: a resumed run skips what it already tried
+    stream = itertools.islice(itertools.chain.from_iterable(spaces), attempted, None)
+    last_print = last_ckpt = time.time()
+    sink = open_sink(out_path, append=state is not None, exclude=exclude, split=split)
+
+    def write_checkpoint():
+        if ckpt is None:
+            return
+        sink.sync()
+        save_checkpoint(ckpt, {"fingerprint": fingerprint, "mode": "template", "offset": sink.tell(),
+                               "written": written - sink.excluded, "attempted": attempted})
+
+    check = constraints.check if constraints is not None and stage is None else None
+    with sink, stats_phase("enumeration"):
+        try:
+            write, add = sink.write, (seen.add if seen is not None else None)
+            for s in stream:
+                attempted += 1
+                if stage is not None:
+                    out = stage.apply_many((s,))
+                    if out:
+                        sink.write_many(out)
+                        written += len(out)
+                elif (check is None or check(s)) and add(_hash64(s)):
+                    write(s)
+                    written += 1
+                if not (attempted & 0xFF):
+                    now = time.time()
+                    if on_progress and (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                        on_progress(written - sink.excluded, attempted, sink.tell())
+                        last_print = now
+                    if now - last_ckpt >= CHECKPOINT_INTERVAL:
+                        write_checkpoint()
+                        last_ckpt = now
+        except KeyboardInterrupt:
+            write_checkpoint()
+            if on_progress:
+                on_progress(written - sink.excluded, attempted, sink.tell())
+            raise
+        sink.flush()
+        if on_progress:
+            on_progress(written - sink.excluded, attempted, sink.tell())
+    remove_checkpoint(ckpt)
+    return written - sink.excluded, sink.tell()
+
+def _compliant(best, constraints):
+    # (cost, line) pairs of a BestFirst that meet the policy
+    if constraints is None:
+        return best
+    check = constraints.check
+    return ((cost, line) for cost, line in best if check(line))
+
+def run_best_first(best, out_path, top=None, on_progress=None, constraints=None, exclude=None, split=None):
+    """
+    Writes the lines of a BestFirst to out_path, most likely first; top
+    stops after that many (None: best.limit(), BEST_FIRST_TOP unless the
+    BestFirst keeps no repeat table). on_progress(written, attempted, bytes) as in
+    run_wordlist (attempted is the written count here). No checkpoints:
+    the order is deterministic, a rerun writes the same head again.
+    constraints (a PasswordPolicy) skips lines that do not comply and
+    exclude (an ExcludeIndex) the ones in the reference lists; top counts
+    the written ones. split (an OutputSplit) as in run_wordlist, without a
+    plan: the files keep the most likely first order.
+    Returns (written, bytes).
+    """
+    written = 0
+    last_print = time.time()
+    top = best.limit(top)
+    lines = _compliant(best, constraints)
+    if exclude is not None:
+        lines = exclude.filter(lines, key=lambda pair: pair[1])
+    with open_sink(out_path, split=split) as sink, stats_phase("enumeration"):
+        write = sink.write
+        for _, line in itertools.islice(lines, top):
+            write(line)
+            written += 1
+            if on_progress and not (written & 0xFF):
+                now = time.time()
+                if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                    on_progress(written, written, sink.tell())
+                    last_print = now
+        if on_progress:
+            on_progress(written, written, sink.tell())
+    return written, sink.tell()
+
+# ------------------- Batch -------------------
+# Many targets in one run: a profile file lists them, run_batch schedules all
+# their shards on one process pool. JSON is a list of targets or
+# {"defaults": {...}, "targets": [...]}; CSV has a header row. Fields:
+#   name, words, numbers, specials, min, max, case, policy, output
+_BATCH_FIELDS = ("name", "words", "numbers", "specials", "min", "max", "case", "policy", "output")
+_BATCH_ALIASES = {"min_len": "min", "max_len": "max"}
+
+def load_batch_profiles(path, out_dir=None):
+    """
+    Reads the target profiles of a JSON or CSV file (see above) and returns
+    them checked and normalised: dicts with name, words, numbers, specials,
+    min_len, max_len, case, constraints and output. Relative outputs (by
+    default <name>.txt) go into out_dir. Raises ValueError on a bad profile.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            targets, defaults = list(csv.DictReader(f)), {}
+        else:
+            data = json.load(f)
+            if isinstance(data, dict):
+                targets, defaults = data.get("targets", []), data.get("defaults", {})
+            else:
+                targets, defaults = data, {}
+    if not isinstance(targets, list) or not all(isinstance(t, dict) for t in [defaults] + targets):
+        raise ValueError(f"gecersiz profil dosyasi: {path}")
+    profiles = [_batch_profile({**defaults, **t}, i, out_dir) for i, t in enumerate(targets)]
+    if not profiles:
+        raise ValueError(f"profil dosyasinda hedef yok: {path}")
+    seen = {}
+    for p in profiles:
+        other = seen.setdefault(os.path.abspath(p["output"]), p["name"])
+        if other != p["name"]:
+            raise ValueError(f"{other} ve {p['name']} ayni cikti dosyasini kullaniyor: {p['output']}")
+    return profiles
+
+def _batch_profile(raw, i, out_dir):
+    fields = {}
+    for key, value in raw.items():
+        key = _BATCH_ALIASES.get(str(key).strip().lower(), str(key).strip().lower())
+        if key not in _BATCH_FIELDS:
+            raise ValueError(f"hedef {i + 1}: bilinmeyen alan: {key}")
+        if value not in (None, ""):
+            fields[key] = value
+    name = str(fields.get("name", f"hedef{i + 1}"))
+    profile = {"name": name}
+    for key in ("words", "numbers", "specials"):
+        profile[key] = _as_tokens(fields.get(key))
+    if not (profile["words"] or profile["numbers"] or profile["specials"]):
+        raise ValueError(f"{name}: en az bir token girilmelidir")
+    try:
+        profile["min_len"] = int(fields.get("min", 4))
+        profile["max_len"] = int(fields.get("max", 12))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}: min/max tam sayi olmalidir") from None
+    if not 0 < profile["min_len"] <= profile["max_len"]:
+        raise ValueError(f"{name}: gecersiz uzunluk araligi {profile['min_len']}-{profile['max_len']}")
+    case = fields.get("case")
+    if isinstance(case, int) and case in (0, 1):  # bool dahil
+        case = CASE_POLICY if case else None
+    elif isinstance(case, str):
+        if case.strip().lower() in ("false", "no", "0", "hayir", "h"):
+            case = None
+        elif case.strip().lower() in ("true", "yes", "1", "evet", "e"):
+            case = CASE_POLICY
+    elif case is not None:
+        raise ValueError(f"{name}: case true/false ya da bir politika adi olmalidir: {case!r}")
+    policy = fields.get("policy")
+    try:
+        if case:
+            case_policy_variants("a", case)
+        profile["constraints"] = PasswordPolicy(**policy) if isinstance(policy, dict) else parse_policy(policy)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"{name}: {e}") from None
+    profile["case"] = case or None
+    output = output_path_for(str(fields.get("output", name + ".txt")))
+    if is_stream_target(output):
+        raise ValueError(f"{name}: toplu modda cikti bir dosya olmalidir")
+    profile["output"] = os.path.join(out_dir, output) if out_dir else output
+    return profile
+
+def _run_batch_shard(*args):
+    # _run_shard plus how long it ran, for the per-target timing
+    started = time.perf_counter()
+    n = _run_shard(*args)
+    return n, time.perf_counter() - started
+
+def run_batch(profiles, workers=None, on_progress=None, exclude=None):
+    """
+    Writes the wordlists of many targets (profiles as returned by
+    load_batch_profiles) on one pool of `workers` processes. Targets are
+    queued largest first by count_sequence_combinations, each split into
+    shards in proportion to its size (at least BATCH_MIN_SHARD lines per
+    shard), so small targets fill the gaps behind big ones. Every
+    target's parts are merged into its output in tree order, identical to
+    a run_wordlist of that profile. Case variants are expanded once per
+    token for all targets, and targets with the same job (pool, lengths,
+    case, policy) are generated once and copied.
+    on_progress(done, total, written, bytes) is called about every
+    PROGRESS_PRINT_INTERVAL seconds; exclude is an ExcludeIndex for all.
+    No checkpoints: on Ctrl+C finished outputs stay, the rest is removed.
+    Returns one dict per profile (in profile order): name, output, lines,
+    bytes, seconds (worker time spent on its shards), weight, same_as.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    cache = {}
+    jobs = []
+    by_fingerprint = {}
+    with stats_phase("expansion"):
+        for p in profiles:
+            tokens, _ = build_pool(p["words"], p["numbers"], p["specials"])
+            pool, raw, _, fingerprint, expander, _, walk = _wordlist_job(
+                tokens, p["min_len"], p["max_len"], workers, None, p["case"], None, p["constraints"], exclude,
+                case_cache=cache)
+            # every spelling counts as a token of its own: the weight is the number of lines before dedup
+            lens = [len(v) for vs in expander.variants for v in vs] if expander else [len(t) for t in pool]
+            job = {"profile": p, "pool": pool, "raw": raw, "expander": expander, "walk": walk,
+                   "weight": count_sequence_combinations(lens, p["min_len"], p["max_len"]),
+                   "same_as": None, "lines": 0, "bytes": 0, "seconds": 0.0}
+            first = by_fingerprint.setdefault((fingerprint, output_codec(p["output"])), job)
+            if first is not job:
+                job["same_as"] = first
+            jobs.append(job)
+    queue_order = sorted((j for j in jobs if j["same_as"] is None), key=lambda j: -j["weight"])
+    for job in queue_order:
+        p = job["profile"]
+        target = min(workers * PARALLEL_SHARDS_PER_WORKER, max(1, job["weight"] // BATCH_MIN_SHARD))
+        job["shards"], job["shard_weights"] = plan_shards(job["pool"], p["min_len"], p["max_len"], target)
+        job["parts"] = [f"{p['output']}.part{k:05d}" for k in range(len(job["shards"]))]
+        job["finished_parts"] = {}
+        job["next_part"] = 0
+        job["out"] = None
+
+    written = multiprocessing.Value("Q", 0)
+    nbytes = multiprocessing.Value("Q", 0)
+    stop = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                   initargs=(written, nbytes, stop))
+    done = 0
+
+    def finish(job):
+        nonlocal done
+        job["out"].close()
+        job["out"] = None
+        done += 1
+        for twin in jobs:
+            if twin["same_as"] is job:
+                started = time.perf_counter()
+                shutil.copyfile(job["profile"]["output"], twin["profile"]["output"])
+                twin.update(lines=job["lines"], bytes=job["bytes"], seconds=time.perf_counter() - started)
+                done += 1
+
+    try:
+        futures = {}
+        for job in queue_order:
+            p = job["profile"]
+            for k in sorted(range(len(job["shards"])), key=lambda k: -job["shard_weights"][k]):
+                prefix, subtree = job["shards"][k]
+                fut = executor.submit(_run_batch_shard, job["pool"], p["min_len"], p["max_len"], prefix, subtree,
+                                      job["parts"][k], job["raw"], job["expander"], None, job["walk"], exclude)
+                futures[fut] = (job, k)
+        pending = set(futures)
+        with stats_phase("enumeration"):
+            while pending:
+                ready, pending = wait(pending, timeout=PROGRESS_PRINT_INTERVAL)
+                for fut in ready:
+                    n, seconds = fut.result()
+                    job, k = futures[fut]
+                    job["seconds"] += seconds
+                    job["finished_parts"][k] = n
+                    while job["next_part"] in job["finished_parts"]:
+                        if job["out"] is None:
+                            job["out"] = _open_output_file(job["profile"]["output"])
+                        part = job["next_part"]
+                        job["lines"] += job["finished_parts"].pop(part)
+                        job["bytes"] += os.path.getsize(job["parts"][part])
+                        _append_part(job["out"], job["parts"][part])
+                        job["next_part"] += 1
+                    if job["next_part"] == len(job["parts"]):
+                        finish(job)
+                if on_progress:
+                    on_progress(done, len(jobs), written.value, nbytes.value)
+    except BaseException:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for job in queue_order:
+            if job["out"] is not None:
+                job["out"].close()
+                os.remove(job["profile"]["output"])
+            for part in job["parts"]:
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
+        raise
+    executor.shutdown()
+    return [{"name": j["profile"]["name"], "output": j["profile"]["output"], "lines": j["lines"],
+             "bytes": j["bytes"], "seconds": j["seconds"], "weight": j["weight"], "same_as": j["same_as"]["profile"]["name"] if j["same_as"] else None}
+            for j in jobs]
+
+def batch_summary(results, elapsed):
+    # table rows for the results of run_batch (per target: worker seconds
+    # and lines per worker second), last row the totals over wall time
+    rows = [f"{'Hedef':<16} {'Satir':>13} {'Boyut':>12} {'Isci sn':>8} {'Satir/s':>12}  Cikti"]
+    for r in results:
+        rate = f"{r['lines'] / r['seconds'] if r['seconds'] > 0 else 0.0:,.0f}" if not r["same_as"] else "kopya"
+        same = f" (= {r['same_as']})" if r["same_as"] else ""
+        rows.append(f"{r['name'][:16]:<16} {r['lines']:>13,} {format_mb(r['bytes']):>12} {r['seconds']:>7.2f}s "
+                    f"{rate:>12}  {r['output']}{same}")
+    lines = sum(r["lines"] for r in results)
+    rate = lines / elapsed if elapsed > 0 else 0.0
+    rows.append(f"{'Toplam':<16} {lines:>13,} {format_mb(sum(r['bytes'] for r in results)):>12} {elapsed:>7.2f}s "
+                f"{rate:>12,.0f}  {len(results)} hedef")
+    return rows
+
+def _wifi_exact_space(exact, count, specials, min_len, max_len):
+    # the WifiSpace to sample from, or None to draw random candidates;
+    # exact=None switches over once count is a sizeable share of the keyspace
+    if exact is False:
+        return None
+    space = WifiSpace(specials, min_len, max_len)
+    if exact or count > space.total * WIFI_EXACT_FRACTION:
+        return space
+    return None
+
+def generate_wifi_passwords(count, specials=DEFAULT_SPECIALS, min_len=WIFI_MIN_LEN, max_len=WIFI_MAX_LEN,
+                            dedup=None, seed=None, exact=None):
+    """
+    Yields up to `count` unique random WiFi-style passwords following the
+    WIFI GENERATOR rules. Stops early (fewer than count) if the attempt cap
+    is hit. Uses the NumPy batch engine when it can (see iter_wifi_blocks).
+    dedup picks the repeat filter: "table", "bloom", "set", a backend
+    from make_dedup, or "external" / an ExternalDedup to spill to disk.
+    The same seed always yields the same passwords (per engine).
+    exact=True samples distinct keyspace indices instead (WifiSpace.sample):
+    no rejection, no dedup, and all of the keyspace if count exceeds it.
+    """
+    specials = _wifi_specials(specials)
+    space = _wifi_exact_space(exact, count, specials, min_len, max_len)
+    if space is not None:
+        yield from space.sample(count, seed)
+        return
+    if _dedup_mode(dedup or WIFI_DEDUP) == "external":
+        with _external_dedup(dedup) as ext:
+            for line in _iter_wifi_external(count, specials, min_len, max_len, ext, seed):
+                yield line.decode("utf-8")
+        return
+    if _wifi_batched(specials):
+        for block, _ in iter_wifi_blocks(count, specials, min_len, max_len, seed=seed, dedup=dedup):
+            yield from block.decode("ascii").split("\n")[:-1]
+        return
+    yield from _iter_wifi_scalar(count, specials, min_len, max_len, dedup, seed)
+
+def _iter_wifi_scalar(count, specials, min_len, max_len, dedup=None, seed=None):
+    # one candidate at a time on the random module; reference for the batch engine
+    rng = random if seed is None else random.Random(seed)
+    uppercase = [chr(i) for i in range(ord("A"), ord("Z")+1)]
+    lowercase = [chr(i) for i in range(ord("a"), ord("z")+1)]
+    digits = [str(i) for i in range(10)]
+    pool_others = uppercase + lowercase + digits
+
+    written = checked = 0
+    seen = make_dedup(dedup, count)
+    attempts_total = 0
+    # safety: cap attempts to avoid infinite loop if pool impossible
+    max_attempts = max(10 * count, 10_000_000)
+    try:
+        while written < count and attempts_total < max_attempts:
+            attempts_total += 1
+            length = rng.randint(min_len, max_len)
+            # ensure room for at least 1 upper and 1 lower
+            max_specials_allowed = min(2, length - 2)
+            num_specials = rng.randint(0, max_specials_allowed) if max_specials_allowed >= 0 else 0
+            # choose positions
+            positions = list(range(length))
+            special_positions = set(rng.sample(positions, num_specials)) if num_specials > 0 else set()
+            non_special_positions = [p for p in positions if p not in special_positions]
+            # ensure at least one upper and one lower among non-special positions
+            if len(non_special_positions) < 2:
+                continue  # try again with different num_specials/length
+            upper_pos = rng.choice(non_special_positions)
+            lower_pos = rng.choice([p for p in non_special_positions if p != upper_pos])
+            chars = [""] * length
+            for i in range(length):
+                if i in special_positions:
+                    chars[i] = rng.choice(specials)
+                elif i == upper_pos:
+                    chars[i] = rng.choice(uppercase)
+                elif i == lower_pos:
+                    chars[i] = rng.choice(lowercase)
+                else:
+                    chars[i] = rng.choice(pool_others)
+            candidate = "".join(chars)
+            # enforce no triple repeats
+            if _has_triple_repeat(candidate):
+                continue
+            # 64-bit hash against the dedup backend
+            checked += 1
+            if not seen.add(_hash64(candidate)):
+                continue
+            # accept
+            written += 1
+            yield candidate
+    finally:
+        stats_count("candidates", checked)
+
+def _round_seed(seed, r):
+    # top-up round r needs a stream of its own, still fixed by the seed
+    if seed is None or r == 0:
+        return seed
+    return int.from_bytes(hashlib.blake2b(f"{seed}:{r}".encode(), digest_size=8).digest(), "little") >> 1
+
+def _iter_wifi_external(count, specials, min_len, max_len, ext, seed=None):
+    # everything goes through ExternalDedup; top up rounds replace the few repeats
+    batched = _wifi_batched(specials)
+    need, have = count, -1
+    for r in itertools.count():
+        if need <= 0:
+            break
+        if batched:
+            for data, _ in iter_wifi_blocks(need, specials, min_len, max_len, seed=_round_seed(seed, r),
+                                            dedup=_KeepAll()):
+                ext.add_many(data.split(b"\n")[:-1])
+        else:
+            for candidate in _iter_wifi_scalar(need, specials, min_len, max_len, _KeepAll(), _round_seed(seed, r)):
+                ext.add(candidate.encode("utf-8"))
+        prev, have = have, ext.unique_count()
+        if have == prev:
+            break
+        need = count - have
+    yield from ext.iter_unique(limit=count)
+
+def write_wifi_passwords(out_path, count, specials=DEFAULT_SPECIALS, on_progress=None, dedup=None, fp_rate=None,
+                         seed=None, workers=1, exact=None):
+    """
+    Writes generate_wifi_passwords(count, specials) to out_path.
+    on_progress(written, bytes, dedup_bytes) is called about every
+    PROGRESS_PRINT_INTERVAL; dedup_bytes is what the repeat filter holds.
+    dedup/fp_rate choose the filter (see make_dedup); "external" spills to
+    disk and writes the output after the merge. With workers > 1 the NumPy
+    engine runs on a process pool (write_wifi_parallel); a given seed
+    gives the same file for a given worker count. exact: see
+    generate_wifi_passwords.
+    Returns (written, bytes).
+    """
+    with stats_phase("counting"):
+        space = _wifi_exact_space(exact, count, _wifi_specials(specials), WIFI_MIN_LEN, WIFI_MAX_LEN)
+    with stats_phase("enumeration"):
+        return _write_wifi_passwords(out_path, count, specials, on_progress, dedup, fp_rate, seed, workers, space)
+
+def _write_wifi_passwords(out_path, count, specials, on_progress, dedup, fp_rate, seed, workers, space):
+    written = 0
+    last_print = time.time()
+    specials = _wifi_specials(specials)
+    if space is not None:
+        with OutputSink(out_path) as sink:
+            for candidate in space.sample(count, seed):
+                sink.write(candidate)
+                written += 1
+                if on_progress and not (written & 0xFF):
+                    now = time.time()
+                    if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                        on_progress(written, sink.tell(), 0)
+                        last_print = now
+            if on_progress:
+                on_progress(written, sink.tell(), 0)
+        return written, sink.tell()
+    if _dedup_mode(dedup or WIFI_DEDUP) == "external":
+        with _external_dedup(dedup) as ext, OutputSink(out_path, raw=True) as sink:
+            for line in _iter_wifi_external(count, specials, WIFI_MIN_LEN, WIFI_MAX_LEN, ext, seed):
+                sink.write(line)
+                written += 1
+                if on_progress and not (written & 0xFF):
+                    now = time.time()
+                    if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                        on_progress(written, sink.tell(), ext.buffered_bytes)
+                        last_print = now
+            if on_progress:
+                on_progress(written, sink.tell(), ext.buffered_bytes)
+        return written, sink.tell()
+    batched = _wifi_batched(specials)
+    seen = make_dedup(dedup, count + (WIFI_BATCH_SIZE if batched else 0), fp_rate)
+    with OutputSink(out_path) as sink:
+        try:
+            if batched and workers > 1:
+                written = write_wifi_parallel(sink, count, specials, workers,
+                                              new_wifi_seed() if seed is None else seed, seen,
+                                              on_progress=on_progress)
+            elif batched:
+                for data, lines in iter_wifi_blocks(count, specials, seed=seed, dedup=seen):
+                    sink.write_block(data, lines)
+                    written += lines
+                    if on_progress:
+                        now = time.time()
+                        if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                            on_progress(written, sink.tell(), seen.nbytes)
+                            last_print = now
+            else:
+                for candidate in generate_wifi_passwords(count, specials, dedup=seen, seed=seed):
+                    sink.write(candidate)
+                    written += 1
+                    if on_progress and not (written & 0xFF):
+                        now = time.time()
+                        if (now - last_print) >= PROGRESS_PRINT_INTERVAL:
+                            on_progress(written, sink.tell(), seen.nbytes)
+                            last_print = now
+        finally:
+            if on_progress:
+                on_progress(written, sink.tell(), seen.nbytes)
+    return written, sink.tell()
+
+# ------------------- Flow -------------------
+def input_form():
+    clear()
+    banner()
+    draw_box(
+        [
+            f"{C.BRIGHT_GREEN}Kelimeler{C.RESET}: boslukla ayirin (orn: omer faruk toptas)",
+            f"{C.BRIGHT_GREEN}Sayilar{C.RESET}: boslukla ayirin (orn: 19 90 2025)",
+            f"{C.BRIGHT_GREEN}Ozel{C.RESET}: tek parca girerseniz her karakter tek tek alinabilir (orn: !@#$)",
+        ],
+        title="INPUT GUIDE",
+        color=C.BRIGHT_BLUE
+    )
+
+    words_raw = ask("Kelimeler")
+    numbers_raw = ask("Sayilar")
+    specials_raw = ask("Ozel karakterler (bos birakilabilir)")
+
+    words = parse_tokens(words_raw)
+    numbers = parse_tokens(numbers_raw)
+    specials = parse_tokens(specials_raw)
+
+    print()
+    draw_box(
+        [
+            "Uzunluk araligi icin sayi giriniz.",
+            "Ornek: min=4, max=12"
+        ],
+        title="LENGTH",
+        color=C.BRIGHT_MAGENTA
+    )
+    try:
+        min_len = int(ask("Minimum uzunluk", "4"))
+        max_len = int(ask("Maksimum uzunluk", "12"))
+    except ValueError:
+        print(center(C.BRIGHT_RED + "Hata: uzunluk degerleri sayi olmali." + C.RESET))
+        sys.exit(1)
+
+    print()
+    draw_box(
+        [
+            "Tokenler icin buyuk/kucuk harf varyantlari uret?",
+            "Evet icin 'E' yazin, aksi halde Enter'a basin."
+        ],
+        title="CASE VARIANTS",
+        color=C.BRIGHT_YELLOW
+    )
+    case_ans = ask("Varyant uret (E/h)", "h").strip().lower()
+    case_expand = False
+    if case_ans.startswith("e"):
+        case_expand = ask("Politika (all / first / simple / upper:K)", CASE_POLICY).strip() or CASE_POLICY
+        try:
+            case_policy_variants("a", case_expand)
+        except ValueError:
+            print(center(C.BRIGHT_YELLOW + f"Gecersiz politika, {CASE_POLICY} kullanilacak." + C.RESET))
+            case_expand = CASE_POLICY
+
+    print()
+    templates = ask("Sablonlar (opsiyonel, orn: {word}{number}{special} {w}{w}{n})", "").split()
+    try:
+        for t in templates:
+            parse_template(t)
+    except ValueError as e:
+        print(center(C.BRIGHT_YELLOW + f"Gecersiz sablon, tum siralamalar kullanilacak: {e}" + C.RESET))
+        templates = []
+
+    print()
+    best_first = ask("En olasi adaylar once uretilsin mi? (E/h)", "h").strip().lower().startswith("e")
+    top = None
+    if best_first:
+        try:
+            top = int(ask(f"Ilk kac satir (bos = hepsi, tekrar olabilen havuzda en fazla {BEST_FIRST_TOP:,})", "")
+                      .strip() or 0) or None
+        except ValueError:
+            top = None
+        if top is not None and top < 0:
+            top = None
+
+    print()
+    rules = []
+    rules_path = ask("Kural dosyasi (hashcat/john, opsiyonel)", "").strip()
+    if rules_path:
+        try:
+            rules = load_rules(rules_path)
+        except (OSError, ValueError) as e:
+            print(center(C.BRIGHT_YELLOW + f"Kurallar okunamadi, kuralsiz devam: {e}" + C.RESET))
+
+    print()
+    constraints = None
+    try:
+        constraints = parse_policy(ask("Parola politikasi (opsiyonel, orn: sinif=3 zorunlu=buyuk,rakam tekrar=2 ozel=1)",
+                                       ""))
+    except ValueError as e:
+        print(center(C.BRIGHT_YELLOW + f"Gecersiz politika, politikasiz devam: {e}" + C.RESET))
+
+    print()
+    exclude = []
+    for source in ask("Haric tutulacak listeler (opsiyonel, orn: rockyou.txt)", "").split():
+        if os.path.isfile(source):
+            exclude.append(source)
+        else:
+            print(center(C.BRIGHT_YELLOW + f"Liste bulunamadi, atlaniyor: {source}" + C.RESET))
+
+    print()
+    out_path = ask("Kayit yolu (.gz/.zst/.xz ile sikistirilir)", DEFAULT_OUTPUT) or DEFAULT_OUTPUT
+    # the menu draws on stdout itself; "-" is for the CLI (a named pipe still works here)
+    if out_path == STDOUT_TARGET:
+        out_path = DEFAULT_OUTPUT
+    note = output_fallback_note(out_path)
+    if note:
+        print(center(C.BRIGHT_YELLOW + note + C.RESET))
+        out_path = output_path_for(out_path)
+    split = None
+    if not is_stream_target(out_path):
+        try:
+            split = parse_split(ask("Ciktiyi bol (orn: uzunluk satir=1000000 mb=500; bos = tek dosya)", ""))
+        except ValueError as e:
+            print(center(C.BRIGHT_YELLOW + f"Gecersiz bolme, tek dosyaya yaziliyor: {e}" + C.RESET))
+
+    cpus = os.cpu_count() or 1
+    try:
+        workers = max(1, int(ask(f"Paralel islem sayisi (1-{cpus})", "1")))
+    except ValueError:
+        workers = 1
+
+    return (words, numbers, specials, min_len, max_len, case_expand, out_path, workers, rules, templates, best_first,
+            top, constraints, exclude, split)
+
+def generate_wordlist_ui(words, numbers, specials, min_len, max_len, case_expand, out_path, workers=1, rules=(),
+                         templates=(), best_first=False, top=None, constraints=None, exclude=(), split=None,
+                         resume=None):
+    clear()
+    banner()
+    draw_box(
+        [
+            f"Kelimeler: {', '.join(words) if words else '-'}",
+            f"Sayilar  : {', '.join(numbers) if numbers else '-'}",
+            f"Ozel     : {''.join(specials) if specials else '-'}",
+            f"Min/Max  : {min_len}/{max_len}",
+            f"Varyant  : {_case_policy(case_expand) if case_expand else 'Hayir'}",
+            f"Kurallar : {len(rules) if rules else '-'}",
+            f"Politika : {constraints if constraints else '-'}",
+            f"Haric    : {', '.join(exclude) if exclude else '-'}",
+            f"Sablon   : {' '.join(templates) if templates else '-'}",
+            f"Sira     : {('olasilik' + (f' (ilk {top:,})' if top else '')) if best_first else 'sirali'}",
+            f"Islem    : {workers if not (templates or best_first) else 1}",
+            f"Dosya    : {out_path}",
+            f"Bolme    : {split if split else '-'}"
+        ],
+        title="SUMMARY",
+        color=C.BRIGHT_BLUE
+    )
+
+    spinner("Hazirlaniyor...", 0.8)
+
+    exclude = _exclude_ui(exclude)
+    if best_first:
+        _best_first_wordlist_ui(words, numbers, specials, min_len, max_len, case_expand, out_path, rules, templates,
+                                top, constraints, exclude, split)
+        return
+    if templates:
+        _template_wordlist_ui(words, numbers, specials, min_len, max_len, case_expand, out_path, rules, templates,
+                              resume, constraints, exclude, split)
+        return
+
+    # variants are added per line while writing, the pool keeps the plain tokens
+    tokens, _ = build_pool(words, numbers, specials)
+    _, expansion_info = build_pool(words, numbers, specials, case_expand)
+    if not tokens:
+        print(center(C.BRIGHT_RED + "En az bir token girilmelidir." + C.RESET))
+        sys.exit(1)
+
+    print()
+    info_lines = [f"'{orig}' -> {count} variant" for (orig, count) in expansion_info]
+    draw_box(info_lines or ["(no tokens)"], title="TOKEN VARIANTS", color=C.BRIGHT_MAGENTA)
+    print(center(f"{C.DIM}Pool size (unique): {len(tokens)}{C.RESET}"))
+    if case_expand and _case_policy(case_expand) == "all":
+        print(center(f"{C.DIM}MAX_VARIANTS_PER_TOKEN = {MAX_VARIANTS_PER_TOKEN}{C.RESET}"))
+    print()
+
+    total_sequences, unique_counts, unique_bytes, exact = estimate_wordlist(tokens, min_len, max_len, case_expand,
+                                                                            rules, constraints)
+    if total_sequences == 0:
+        reason = "min/max ya da politika uyusmuyor" if constraints else "min/max uyusmuyor"
+        print(center(C.BRIGHT_YELLOW + f"Uretilebilecek kombinasyon yok ({reason})." + C.RESET))
+        sys.exit(1)
+
+    total_unique = sum(unique_counts)
+    projected_bytes = sum(unique_bytes)
+
+    print(center(f"Tahmini dizilim sayisi: {C.BRIGHT_WHITE}{total_sequences:,}{C.RESET}"))
+    if exact:
+        print(center(f"Benzersiz satir sayisi: {C.BRIGHT_WHITE}{total_unique:,}{C.RESET} (kesin)"))
+        print(center(f"Tahmini dosya boyutu : {C.BRIGHT_WHITE}{format_mb(projected_bytes)}{C.RESET}"))
+    else:
+        print(center(f"Benzersiz satir sayisi: en fazla {C.BRIGHT_WHITE}{total_unique:,}{C.RESET}"))
+        print(center(f"Tahmini dosya boyutu : en fazla {C.BRIGHT_WHITE}{format_mb(projected_bytes)}{C.RESET}"))
+        print(center(C.DIM + "Not: Havuz cok buyuk, kesin sayim yerine ust sinir gosteriliyor." + C.RESET))
+    if split:
+        split = split.with_plan(unique_counts, unique_bytes, exact)
+        _split_plan_ui(split)
+    print()
+
+    unique = DEDUP_MODE not in ("set", "external") or workers > 1
+    # canonical mode only yields unique lines, so measure against that count;
+    # the sequence DP also counts the empty sequence, which is never written
+    progress_total = total_unique if (unique and exact) else total_sequences
+    offset = 1 if (progress_total == total_sequences and min_len <= 0) else 0
+
+    def progress_line(values, rate, eta):
+        written, attempted, bytes_written = values
+        pct = ((attempted + offset) / progress_total) * 100 if progress_total else 100.0
+        line = (f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} | Tamamlandi: {pct:.2f}% | "
+                f"{progress_rate_text(rate, eta)}")
+        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+    reporter = ProgressReporter(progress_line, progress_total - offset, key=1)
+
+    if resume is not False and split is None:
+        state = find_wordlist_checkpoint(tokens, min_len, max_len, out_path, workers, case=case_expand or None,
+                                         rules=rules or None, constraints=constraints, exclude=exclude)
+        if state and resume is None:
+            ans = ask(f"Yarim kalan calisma bulundu ({state['written']:,} satir). Devam edilsin mi? (E/h)", "e")
+            resume = ans.strip().lower().startswith("e")
+        resume = bool(state) and resume
+        if resume:
+            print(center(C.BRIGHT_GREEN + f"Kaldigi yerden devam ediliyor: {state['written']:,} satir" + C.RESET))
+
+    dedup = None
+    if DEDUP_MODE == "external" and workers <= 1:
+        def phase_line(phase, ext):
+            line = f"Harici dedup: {phase} | Parca: {ext.spills:,} | Gecici: {format_mb(ext.temp_bytes)}"
+            print("\r" + center(C.BRIGHT_MAGENTA + line + C.RESET), end="", flush=True)
+        dedup = ExternalDedup(on_phase=phase_line)
+
+    try:
+        with reporter:
+            written, nbytes = run_wordlist(tokens, min_len, max_len, out_path, workers=workers, dedup=dedup,
+                                           resume=resume, on_progress=stats_wrap_wordlist(reporter),
+                                           case=case_expand or None, rules=rules or None, constraints=constraints,
+                                           exclude=exclude, split=split)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        written, attempted, bytes_written = reporter.values or (0, 0, 0)
+        print()
+        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu." + C.RESET))
+        pct = ((attempted + offset) / progress_total) * 100 if progress_total else 100.0
+        print(center(f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} | Tamamlandi: {pct:.2f}%"))
+        if os.path.exists(checkpoint_path_for(out_path)):
+            print(center(C.DIM + "Ayni ayarlarla tekrar calistirinca kaldigi yerden devam eder." + C.RESET))
+        sys.exit(1)
+
+    _wordlist_done_box(out_path, written, progress_total, progress_total, split)
+
+def _template_wordlist_ui(words, numbers, specials, min_len, max_len, case_expand, out_path, rules, templates,
+                          resume, constraints=None, exclude=None, split=None):
+    spaces = template_spaces(templates, words, numbers, specials, min_len, max_len, case=case_expand)
+    per_template, counts, line_bytes, _ = estimate_templates(spaces, rules)
+    total = sum(n for _, n in per_template)
+    print()
+    draw_box([f"{t}  ->  {n:,}" for t, n in per_template], title="TEMPLATES", color=C.BRIGHT_MAGENTA)
+    print(center(f"{C.DIM}Tekrar siniri: {', '.join(f'{k}={v}' for k, v in TEMPLATE_REPEAT.items())}{C.RESET}"))
+    if total == 0:
+        print(center(C.BRIGHT_YELLOW + "Uretilebilecek kombinasyon yok (sablon/uzunluk uyusmuyor)." + C.RESET))
+        sys.exit(1)
+    print(center(f"Sablon kombinasyonu   : {C.BRIGHT_WHITE}{total:,}{C.RESET} (kesin)"))
+    print(center(f"Benzersiz satir sayisi: en fazla {C.BRIGHT_WHITE}{sum(counts):,}{C.RESET}"))
+    print(center(f"Tahmini dosya boyutu : en fazla {C.BRIGHT_WHITE}{format_mb(sum(line_bytes))}{C.RESET}"))
+    if split:
+        split = split.with_plan(counts, line_bytes, False)
+        _split_plan_ui(split)
+    print()
+
+    def progress_line(values, rate, eta):
+        written, attempted, bytes_written = values
+        line = (f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} | "
+                f"Tamamlandi: {attempted / total * 100:.2f}% | {progress_rate_text(rate, eta)}")
+        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+    reporter = ProgressReporter(progress_line, total, key=1)
+
+    if resume is not False and split is None:
+        state = find_template_checkpoint(spaces, out_path, rules or None, constraints, exclude)
+        if state and resume is None:
+            ans = ask(f"Yarim kalan calisma bulundu ({state['written']:,} satir). Devam edilsin mi? (E/h)", "e")
+            resume = ans.strip().lower().startswith("e")
+        resume = bool(state) and resume
+
+    try:
+        with reporter:
+            written, nbytes = run_templates(spaces, out_path, resume=resume, on_progress=stats_wrap_wordlist(reporter),
+                                            rules=rules or None, constraints=constraints, exclude=exclude,
+                                            split=split)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        written, attempted, bytes_written = reporter.values or (0, 0, 0)
+        print()
+        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu." + C.RESET))
+        print(center(f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} | "
+                     f"Tamamlandi: {attempted / total * 100:.2f}%"))
+        if os.path.exists(checkpoint_path_for(out_path)):
+            print(center(C.DIM + "Ayni ayarlarla tekrar calistirinca kaldigi yerden devam eder." + C.RESET))
+        sys.exit(1)
+
+    _wordlist_done_box(out_path, written, total, total, split)
+
+def _best_first_wordlist_ui(words, numbers, specials, min_len, max_len, case_expand, out_path, rules, templates,
+                            top, constraints=None, exclude=None, split=None):
+    best = BestFirst(words, numbers, specials, min_len, max_len, templates, case_expand, rules)
+    if templates:
+        counts = estimate_templates(template_spaces(templates, words, numbers, specials, min_len, max_len,
+                                                    case=case_expand), rules)[1]
+    else:
+        counts = estimate_wordlist(build_pool(words, numbers, specials)[0], min_len, max_len, case_expand, rules,
+                                   constraints)[1]
+    capped = top is None and best.limit() is not None
+    top = best.limit(top)
+    target = min(top, sum(counts)) if top else sum(counts)
+    print()
+    weights = ", ".join(f"{k}={v:g}" for k, v in BEST_FIRST_WEIGHTS.items())
+    print(center(f"{C.DIM}Agirliklar: {weights}, case={BEST_FIRST_CASE_WEIGHT:g}{C.RESET}"))
+    if capped and target == top:
+        print(center(f"{C.DIM}Tekrar tablosu icin en fazla BEST_FIRST_TOP = {top:,} satir yazilir{C.RESET}"))
+    if target == 0:
+        print(center(C.BRIGHT_YELLOW + "Uretilebilecek kombinasyon yok (min/max uyusmuyor)." + C.RESET))
+        sys.exit(1)
+    print(center(f"Yazilacak satir: en fazla {C.BRIGHT_WHITE}{target:,}{C.RESET} (en olasilar once)"))
+    print()
+
+    def progress_line(values, rate, eta):
+        written, _, bytes_written = values
+        line = (f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} | "
+                f"Tamamlandi: {written / target * 100:.2f}% | {progress_rate_text(rate, eta)}")
+        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+    reporter = ProgressReporter(progress_line, target)
+
+    try:
+        with reporter:
+            written, nbytes = run_best_first(best, out_path, top, on_progress=stats_wrap_wordlist(reporter),
+                                             constraints=constraints, exclude=exclude, split=split)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        written, _, bytes_written = reporter.values or (0, 0, 0)
+        print()
+        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu." + C.RESET))
+        print(center(f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} (en olasi satirlar basta)"))
+        sys.exit(1)
+
+    _wordlist_done_box(out_path, written, target, target, split)
+
+def _exclude_ui(sources):
+    # opens (building on first use) the exclusion indexes with a progress line
+    if not sources:
+        return None
+
+    drawn = False
+
+    def end_line():
+        nonlocal drawn
+        if drawn:
+            print()
+            drawn = False
+
+    def on_build(source):
+        end_line()
+        print(center(C.BRIGHT_MAGENTA + f"Indeks kuruluyor (bir kez): {source}" + C.RESET))
+
+        def progress(lines):
+            nonlocal drawn
+            drawn = True
+            print("\r" + center(C.BRIGHT_MAGENTA + f"Okunan: {lines:,} satir" + C.RESET), end="", flush=True)
+        return progress
+    try:
+        index = open_exclude(sources, on_build=on_build)
+    except (OSError, ValueError) as e:
+        end_line()
+        print(center(C.BRIGHT_YELLOW + f"Dislama listesi acilamadi, listesiz devam: {e}" + C.RESET))
+        return None
+    end_line()
+    print(center(f"{C.DIM}Dislama: {index.count:,} satir; tahminler dislama oncesi ust sinirdir{C.RESET}"))
+    return index
+
+def _split_plan_ui(split):
+    # how many files the plan expects, per length when split by length
+    planned = split.planned_files()
+    total = sum(planned.values())
+    print(center(f"Bolunmus cikti: {C.BRIGHT_WHITE}{total:,}{C.RESET} dosya ({split})"))
+    if split.by_length and planned:
+        per_length = ", ".join(f"{length}:{n}" for length, n in sorted(planned.items()))
+        print(center(f"{C.DIM}Uzunluk:dosya -> {per_length}{C.RESET}"))
+    if total > split.max_open:
+        print(center(f"{C.DIM}Ayni anda en fazla {split.max_open} dosya acik tutulur{C.RESET}"))
+
+def _wordlist_done_box(out_path, written, attempted, progress_total, split=None):
+    pct = (attempted / progress_total) * 100 if progress_total else 100.0
+    if split:
+        manifest = split_manifest_path(out_path)
+        with open(manifest, encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        where = [f"Kayit: {manifest}", f"Dosyalar: {len(files):,} ({files[0]['path'] if files else '-'} ...)"]
+        size = sum(os.path.getsize(os.path.join(os.path.dirname(manifest), f["path"])) for f in files)
+    else:
+        where = [f"Kayit: {out_path}"]
+        size = os.path.getsize(out_path) if os.path.exists(out_path) else 0
+    print()
+    print()
+    draw_box(
+        where + [
+            f"Toplam satir (unique): {written:,}",
+            f"Dosya boyutu: {format_mb(size)}",
+            f"Tahmini tamamlanma: {pct:.2f}%"
+        ],
+        title="DONE",
+        color=C.BRIGHT_GREEN
+    )
+    print(center(C.DIM + "Ipuclari: Tokenleri akilli secin, uzunluk araligini dar tutun." + C.RESET))
+    print()
+
+def generate_wifi_passwords_ui():
+    clear()
+    banner()
+    draw_box(
+        [
+            f"WiFi sifresi uretici",
+            "Kurallar:",
+            "- Uzunluk: 10 ile 12 karakter (rastgele secilir)",
+            "- Ozel karakter: en fazla 2 tane (bazilarinda 0 olabilir)",
+            "- Her sifrede en az bir buyuk harf ve bir kucuk harf olacak",
+            "- Aynı karakter 3 defadan fazla yan yana olamaz",
+            "- Benzersiz satırlar olusturulur"
+        ],
+        title="WIFI GENERATOR",
+        color=C.BRIGHT_BLUE
+    )
+
+    try:
+        count = int(ask("Kac satir uretmek istiyorsunuz?", "1000"))
+        if count <= 0:
+            print(center(C.BRIGHT_RED + "Sayi pozitif olmalidir." + C.RESET))
+            time.sleep(1.2)
+            return
+    except ValueError:
+        print(center(C.BRIGHT_RED + "Gecerli bir sayi giriniz." + C.RESET))
+        time.sleep(1.2)
+        return
+
+    if count >= 100000:
+        confirm = ask(f"{count:,} satir uretilecek. Devam etmek istiyor musunuz? (E/h)", "h").strip().lower()
+        if not confirm.startswith("e"):
+            print(center(C.BRIGHT_YELLOW + "Iptal edildi." + C.RESET))
+            time.sleep(1.0)
+            return
+
+    out_path = ask("Kayit yolu (.gz/.zst/.xz ile sikistirilir)", DEFAULT_WIFI_OUTPUT) or DEFAULT_WIFI_OUTPUT
+    if out_path == STDOUT_TARGET:
+        out_path = DEFAULT_WIFI_OUTPUT
+    note = output_fallback_note(out_path)
+    if note:
+        print(center(C.BRIGHT_YELLOW + note + C.RESET))
+        out_path = output_path_for(out_path)
+
+    specials_raw = ask(f"Ozel karakterler (opsiyonel, default: {DEFAULT_SPECIALS})", DEFAULT_SPECIALS)
+    specials = specials_raw.strip() or DEFAULT_SPECIALS
+
+    seed_raw = ask("Seed (bos birakilirsa rastgele)", "").strip()
+    try:
+        seed = int(seed_raw) if seed_raw else new_wifi_seed()
+    except ValueError:
+        seed = new_wifi_seed()
+    cpus = os.cpu_count() or 1
+    try:
+        workers = max(1, int(ask(f"Paralel islem sayisi (1-{cpus})", "1")))
+    except ValueError:
+        workers = 1
+
+    def print_progress(values, rate, eta):
+        written, bytes_written, dedup_bytes = values
+        pct = (written / count) * 100 if count > 0 else 100.0
+        line = f"Yazilan: {written:,} | Dosya: {output_size_text(out_path, bytes_written)} | Bellek: {format_mb(dedup_bytes)} | Hedef: {count:,} | %Tamamlandi: {pct:.2f}% | {progress_rate_text(rate, eta)}"
+        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+
+    try:
+        with ProgressReporter(print_progress, count) as reporter:
+            written, nbytes = write_wifi_passwords(out_path, count, specials, on_progress=stats_wrap_wifi(reporter),
+                                                   seed=seed, workers=workers)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        print()
+        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu." + C.RESET))
+        return
+
+    if written < count:
+        print()
+        print(center(C.BRIGHT_YELLOW + f"Uyari: hedefe ulasilamadi. Uretilen: {written:,}" + C.RESET))
+    else:
+        print()
+        print(center(C.BRIGHT_GREEN + f"Tamamlandi: {written:,} satir uretildi -> {out_path}" + C.RESET))
+    print(center(C.DIM + f"Seed: {seed} (ayni seed ve islem sayisi ayni listeyi verir)" + C.RESET))
+    print()
+
+def batch_wordlist_ui():
+    clear()
+    banner()
+    draw_box(
+        [
+            "Bir profil dosyasindaki tum hedefler tek calismada uretilir.",
+            "JSON: [{\"name\": \"ali\", \"words\": \"ali veli\", \"numbers\": \"1990\", \"output\": \"ali.txt\"}, ...]",
+            "CSV : name,words,numbers,specials,min,max,case,policy,output",
+            "Buyuk hedefler once baslar, tum cekirdekler paylasilir."
+        ],
+        title="TOPLU WORDLIST",
+        color=C.BRIGHT_BLUE
+    )
+    path = ask("Profil dosyasi (.json/.csv)", "hedefler.json")
+    out_dir = ask("Cikti dizini (goreli cikti yollari icin)", ".") or "."
+    try:
+        profiles = load_batch_profiles(path, out_dir)
+    except (OSError, ValueError) as e:
+        print(center(C.BRIGHT_RED + f"Profil okunamadi: {e}" + C.RESET))
+        return
+    os.makedirs(out_dir, exist_ok=True)
+    cpus = os.cpu_count() or 1
+    try:
+        workers = max(1, int(ask(f"Paralel islem sayisi (1-{cpus})", str(cpus))))
+    except ValueError:
+        workers = cpus
+    exclude = [p for p in ask("Haric tutulacak listeler (opsiyonel, orn: rockyou.txt)", "").split() if os.path.isfile(p)]
+
+    rows = []
+    for p in profiles:
+        # the order run_batch queues them in: spellings count as tokens of their own
+        tokens, _ = build_pool(p["words"], p["numbers"], p["specials"], p["case"] or False)
+        weight = count_sequence_combinations([len(t) for t in tokens], p["min_len"], p["max_len"])
+        rows.append((weight, f"{p['name'][:16]:<16} {len(tokens):>4} token  {p['min_len']}-{p['max_len']}  "
+                             f"~{weight:,} aday{'  +harf' if p['case'] else ''}"))
+    rows.sort(key=lambda r: -r[0])
+    print()
+    draw_box([text for _, text in rows], title=f"{len(profiles)} HEDEF (buyukten kucuge)", color=C.BRIGHT_MAGENTA)
+    if not ask("Baslatilsin mi? (E/h)", "e").strip().lower().startswith("e"):
+        print(center(C.BRIGHT_YELLOW + "Iptal edildi." + C.RESET))
+        return
+
+    index = _exclude_ui(exclude)
+    start_time = time.time()
+
+    def progress(values, rate, eta):
+        done, total, written, nbytes = values
+        line = f"Hedef: {done}/{total} | Yazilan: {written:,} | Boyut: {format_mb(nbytes)} | {progress_rate_text(rate, eta)}"
+        print("\r" + center(C.BRIGHT_CYAN + line + C.RESET), end="", flush=True)
+
+    try:
+        with ProgressReporter(progress, sum(r[0] for r in rows), key=2) as reporter:
+            results = run_batch(profiles, workers, on_progress=reporter, exclude=index)
+    except KeyboardInterrupt:
+        print()
+        print(center(C.BRIGHT_YELLOW + "Islem kullanici tarafindan durduruldu; biten hedeflerin dosyalari duruyor."
+                     + C.RESET))
+        return
+    except OSError as e:
+        print()
+        print(center(C.BRIGHT_RED + f"Hata: {e}" + C.RESET))
+        return
+    lines = sum(r["lines"] for r in results)
+    stats_result(lines, sum(r["bytes"] for r in results), lines)
+    print()
+    print()
+    draw_box(batch_summary(results, time.time() - start_time), title="OZET", color=C.BRIGHT_GREEN)
+
+# ------------------- Flow: Menu -------------------
+def main_menu():
     while True:
         clear()
         banner()
@@ -669,7 +5803,8 @@ def main_menu():
             [
                 f"{C.BRIGHT_GREEN}[1]{C.RESET} SpecialWordList (wordlist olustur)",
                 f"{C.BRIGHT_GREEN}[2]{C.RESET} WiFi sifresi olustur (random, kurallı)",
-                f"{C.BRIGHT_GREEN}[3]{C.RESET} Cikis"
+                f"{C.BRIGHT_GREEN}[3]{C.RESET} Toplu wordlist (profil dosyasi, cok hedef)",
+                f"{C.BRIGHT_GREEN}[4]{C.RESET} Cikis"
             ],
             title="MENU",
             color=C.BRIGHT_BLUE
@@ -677,12 +5812,18 @@ def main_menu():
         choice = ask("Seciminiz", "1")
         if choice == "1":
             params = input_form()
-            generate_wordlist_ui(*params)
+            with _ui_stats("wordlist"):
+                generate_wordlist_ui(*params)
             input(center(C.DIM + "Devam icin Enter'a basin..." + C.RESET))
         elif choice == "2":
-            generate_wifi_passwords_ui()
+            with _ui_stats("wifi"):
+                generate_wifi_passwords_ui()
             input(center(C.DIM + "Devam icin Enter'a basin..." + C.RESET))
         elif choice == "3":
+            with _ui_stats("batch"):
+                batch_wordlist_ui()
+            input(center(C.DIM + "Devam icin Enter'a basin..." + C.RESET))
+        elif choice == "4":
             clear()
             banner()
             print(center(C.BRIGHT_GREEN + "Tesekkurler! Gule gule." + C.RESET))
@@ -692,9 +5833,523 @@ def main_menu():
             print(center(C.BRIGHT_YELLOW + "Gecersiz secim." + C.RESET))
             time.sleep(1.1)
 
-if __name__ == "__main__":
+# ------------------- CLI (non-interactive) -------------------
+# No banner, clear() or spinner here: a batch run only pays for the work.
+#
+#   generatekey.py                                  -> interaktif menu
+#   generatekey.py wordlist -w omer faruk -n 19 90 -s '!@' --min 4 --max 12 -o out.txt
+#   generatekey.py wifi -c 100000 -o wifi.txt
+#   generatekey.py index rockyou.txt                -> --exclude icin indeksi onceden kur
+#   generatekey.py batch hedefler.json -j 8         -> profil dosyasindaki tum hedefler, tek havuz
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="generatekey.py",
+        description="Hedefe ozel wordlist ve WiFi sifresi uretici. Arguman verilmezse interaktif menu acilir.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    w = sub.add_parser("wordlist", help="token'lardan hedefe ozel wordlist uret")
+    w.add_argument("-w", "--words", nargs="*", default=[], help="kelimeler (orn: omer faruk)")
+    w.add_argument("-n", "--numbers", nargs="*", default=[], help="sayilar (orn: 19 90 2025)")
+    w.add_argument("-s", "--specials", nargs="*", default=[],
+                   help="ozel karakterler; tek parca verilirse her karakter ayri token olur (orn: '!@#')")
+    w.add_argument("--min", dest="min_len", type=int, default=4, help="minimum uzunluk (varsayilan 4)")
+    w.add_argument("--max", dest="max_len", type=int, default=12, help="maksimum uzunluk (varsayilan 12)")
+    w.add_argument("--case", nargs="?", const=CASE_POLICY, default=None, metavar="POLITIKA",
+                   help=f"buyuk/kucuk harf varyantlarini uret: all, first, simple, upper:K (varsayilan {CASE_POLICY})")
+    w.add_argument("-r", "--rules", action="append", default=[], metavar="DOSYA",
+                   help="hashcat/john tarzi kural dosyasi (satir basina bir kural, tekrar verilebilir)")
+    w.add_argument("--rule", action="append", default=[], metavar="KURAL",
+                   help="tek bir kural, orn: 'sa@ so0 $1' (tekrar verilebilir)")
+    w.add_argument("-t", "--template", action="append", default=[], metavar="SABLON",
+                   help="tum siralamalar yerine sadece bu kalip, orn: '{word}{number}{special}' "
+                        "(tekrar verilebilir; -j, --dedup ve --skip kullanilmaz)")
+    w.add_argument("--repeat", action="append", default=[], metavar="SINIF=K",
+                   help="sablonda ayni token'in bir adaydaki en fazla tekrari, orn: word=2 "
+                        f"(varsayilan {', '.join(f'{k}={v}' for k, v in TEMPLATE_REPEAT.items())})")
+    w.add_argument("--best-first", action="store_true",
+                   help="en olasi adaylar once (agirliklara gore); checkpoint yok, -j ve --dedup kullanilmaz")
+    w.add_argument("--weight", action="append", default=[], metavar="AD=W",
+                   help="--best-first agirligi: sinif (word=3), token (omer=2), sablon, kural ya da case=0.2")
+    w.add_argument("--top", type=int, default=None, metavar="N",
+                   help="en olasi N satiri yaz ve dur (--best-first'i acar)")
+    w.add_argument("--min-classes", type=int, default=0, metavar="K",
+                   help="parola politikasi: en az K karakter sinifi (kucuk/buyuk/rakam/ozel)")
+    w.add_argument("--require", action="append", default=[], metavar="SINIF[,SINIF]",
+                   help="parola politikasi: bulunmasi zorunlu siniflar, orn: upper,digit (lower/upper/digit/special)")
+    w.add_argument("--max-repeat", type=int, default=None, metavar="N",
+                   help="parola politikasi: ayni karakter en fazla N kez ust uste")
+    w.add_argument("--max-specials", type=int, default=None, metavar="N",
+                   help="parola politikasi: en fazla N ozel karakter")
+    w.add_argument("-x", "--exclude", action="append", default=[], metavar="LISTE",
+                   help=f"bu listede olan adaylari yazma (orn: rockyou.txt; ilk kullanimda yanina {EXCLUDE_INDEX_SUFFIX} "
+                        "indeksi kurulur, tekrar verilebilir)")
+    w.add_argument("--rebuild-index", action="store_true", help="--exclude indekslerini yeniden kur")
+    w.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help=f"cikti dosyasi, '-' = stdout, .gz/.bz2/.xz/.zst/.lz4 = sikistirilmis (varsayilan {DEFAULT_OUTPUT})")
+    w.add_argument("--split-length", action="store_true",
+                   help="her uzunluk ayri dosyaya: out.len08.txt (yanina out.manifest.json yazilir)")
+    w.add_argument("--split-lines", type=int, default=None, metavar="N",
+                   help="N satirda bir yeni parca: out.0001.txt, out.0002.txt ...")
+    w.add_argument("--split-size", type=float, default=None, metavar="MB",
+                   help="parca basina en fazla MB (sikistirmadan once)")
+    w.add_argument("--max-open", type=int, default=None, metavar="N",
+                   help=f"bolunmus ciktida ayni anda acik en fazla dosya (varsayilan {SPLIT_MAX_OPEN})")
+    w.add_argument("-j", "--workers", type=int, default=1, help="paralel islem sayisi")
+    w.add_argument("--dedup", choices=("canonical", "set", "external"), default=None,
+                   help=f"tekrar eleme yontemi (varsayilan {DEDUP_MODE})")
+    w.add_argument("--resume", action="store_true", help="checkpoint varsa kaldigi yerden devam et")
+    w.add_argument("--skip", type=int, default=None,
+                   help="dizilim akisinda bu indeksten basla (tekrar elemesiz ham akis, rank/unrank)")
+    w.add_argument("--take", type=int, default=None, help="--skip ile birlikte: en fazla bu kadar aday yaz")
+    w.add_argument("--estimate", action="store_true", help="sadece sayim/boyut tahminini yaz ve cik")
+    w.add_argument("-q", "--quiet", action="store_true", help="ilerleme satirini gosterme")
+    _add_external_args(w)
+    _add_stats_args(w)
+
+    f = sub.add_parser("wifi", help="kurallara uygun rastgele WiFi sifreleri uret")
+    f.add_argument("-c", "--count", type=int, default=1000, help="uretilecek satir sayisi (varsayilan 1000)")
+    f.add_argument("-o", "--output", default=DEFAULT_WIFI_OUTPUT,
+                   help=f"cikti dosyasi, '-' = stdout, .gz/.zst/... = sikistirilmis (varsayilan {DEFAULT_WIFI_OUTPUT})")
+    f.add_argument("--specials", default=DEFAULT_SPECIALS, help="ozel karakter havuzu (varsayilan %(default)s)")
+    f.add_argument("--dedup", choices=list(DEDUP_BACKENDS) + ["external"], default=None,
+                   help=f"tekrar filtresi (varsayilan {WIFI_DEDUP})")
+    f.add_argument("--fp-rate", type=float, default=None, dest="fp_rate",
+                   help=f"bloom yanlis pozitif orani (varsayilan {DEDUP_BLOOM_FP})")
+    f.add_argument("--seed", type=int, default=None, help="tekrarlanabilir cikti icin seed (varsayilan rastgele)")
+    f.add_argument("-j", "--workers", type=int, default=1, help="paralel islem sayisi (NumPy gerekir)")
+    f.add_argument("--exact", action="store_true",
+                   help="anahtar uzayindan tekrarsiz indeks ornekle (reddetme ve tekrar filtresi yok)")
+    f.add_argument("--keyspace", action="store_true", help="sadece kurallara uyan toplam sifre sayisini yaz ve cik")
+    f.add_argument("-q", "--quiet", action="store_true", help="ilerleme satirini gosterme")
+    _add_external_args(f)
+    _add_stats_args(f)
+
+    b = sub.add_parser("batch", help="profil dosyasindaki (JSON/CSV) tum hedefler icin wordlist uret, tek islem havuzu")
+    b.add_argument("profiles", metavar="PROFIL",
+                   help="hedef profilleri: JSON listesi ya da CSV (name,words,numbers,specials,min,max,case,policy,output)")
+    b.add_argument("-d", "--out-dir", default=None, metavar="DIZIN", help="goreli cikti yollarinin dizini")
+    b.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                   help="paralel islem sayisi, tum hedefler paylasir (varsayilan cekirdek sayisi)")
+    b.add_argument("-x", "--exclude", action="append", default=[], metavar="LISTE",
+                   help="bu listede olan adaylari hicbir hedefe yazma (tekrar verilebilir)")
+    b.add_argument("--rebuild-index", action="store_true", help="--exclude indekslerini yeniden kur")
+    b.add_argument("--estimate", action="store_true", help="sadece hedef basina sayim/boyut tahminini yaz ve cik")
+    b.add_argument("--json", action="store_true", help="ozet tablosu yerine hedef basina JSON satirlari yaz")
+    b.add_argument("-q", "--quiet", action="store_true", help="ilerleme satirini gosterme")
+    _add_stats_args(b)
+
+    x = sub.add_parser("index", help="--exclude icin referans listelerin indeksini kur (bir kez, sonra tekrar kullanilir)")
+    x.add_argument("lists", nargs="+", metavar="LISTE", help="referans wordlist dosyalari")
+    x.add_argument("--rebuild", action="store_true", help="guncel olsa bile yeniden kur")
+    x.add_argument("-q", "--quiet", action="store_true", help="ilerleme satirini gosterme")
+    return parser
+
+def _add_stats_args(p):
+    p.add_argument("--stats", nargs="?", const=STDOUT_TARGET, default=None, metavar="DOSYA",
+                   help="faz sureleri, hiz, bellek zirvesi ve dedup oranini JSON satirlari olarak yaz "
+                        "(dosya verilmezse stderr)")
+    p.add_argument("--profile", default=None, metavar="DOSYA", help="cProfile istatistiklerini bu dosyaya yaz (pstats)")
+    p.add_argument("--trace-memory", action="store_true",
+                   help="tracemalloc: bellek zirvesi ve en cok ayiran satirlar ozete eklenir")
+
+def _cli_stats(args):
+    # a RunStats for the flags, or a no-op context
+    if not (args.stats or args.profile or args.trace_memory):
+        return contextlib.nullcontext()
+    params = {k: v for k, v in vars(args).items() if k not in ("stats", "profile", "trace_memory")}
+    return RunStats(args.stats, args.command, params, profile=args.profile, trace_memory=args.trace_memory)
+
+def _ui_stats(command):
+    # the menu has no flags: STATS_FILE / STATS_PROFILE / STATS_TRACE_MEMORY turn it on
+    if not (STATS_FILE or STATS_PROFILE or STATS_TRACE_MEMORY):
+        return contextlib.nullcontext()
+    return RunStats(STATS_FILE, command, profile=STATS_PROFILE, trace_memory=STATS_TRACE_MEMORY)
+
+def _add_external_args(p):
+    p.add_argument("--mem-limit", type=float, default=None, metavar="MB",
+                   help=f"--dedup external: bellek butcesi (varsayilan {format_mb(EXTERNAL_DEDUP_MEMORY)})")
+    p.add_argument("--tmp-dir", default=None, help="--dedup external: gecici dosya dizini")
+    p.add_argument("--tmp-limit", type=float, default=None, metavar="MB",
+                   help="--dedup external: gecici disk kullanimi ust siniri")
+
+def _cli_dedup(args):
+    # --dedup external becomes a configured ExternalDedup; anything else passes through
+    if args.dedup != "external":
+        return args.dedup
+    on_phase = None
+    if not args.quiet:
+        names = {"spill": "diske dokuluyor", "merge": "birlestiriliyor", "order": "siralaniyor", "write": "yaziliyor"}
+
+        def on_phase(phase, ext):
+            _status(f"\rFaz: {names[phase]} | Parca: {ext.spills:,} | Gecici: {format_mb(ext.temp_bytes)}", end="")
+
+    def mb(value):
+        return int(value * 1024 * 1024) if value is not None else None
+    return ExternalDedup(memory=mb(args.mem_limit), tmp_dir=args.tmp_dir, disk_limit=mb(args.tmp_limit),
+                         on_phase=on_phase)
+
+def _cli_constraints(args):
+    # the policy flags as a PasswordPolicy, or None when none is given
+    require = [c for item in args.require for c in item.split(",") if c]
+    if not (args.min_classes or require or args.max_repeat is not None or args.max_specials is not None):
+        return None
+    return PasswordPolicy(args.min_classes, require, args.max_repeat, args.max_specials)
+
+def _cli_exclude(sources, rebuild=False, quiet=False):
+    # open_exclude with build progress on stderr; None without sources
+    if not sources:
+        return None
+    drawn = False
+
+    def end_line():
+        # the "\r" progress line stays open until the next message ends it
+        nonlocal drawn
+        if drawn:
+            _status("")
+            drawn = False
+
+    def on_build(source):
+        if quiet:
+            return None
+        end_line()
+        _status(f"Indeks kuruluyor: {source} -> {exclude_index_path(source)}")
+
+        def progress(lines):
+            nonlocal drawn
+            drawn = True
+            _status(f"\rOkunan: {lines:,} satir", end="")
+        return progress
+    try:
+        index = open_exclude(sources, rebuild, on_build)
+    finally:
+        end_line()
+    if not quiet:
+        _status(f"Dislama: {index.count:,} satir ({len(sources)} liste)")
+    return index
+
+def _cli_index(args):
+    try:
+        for source in args.lists:
+            index = _cli_exclude([source], args.rebuild, args.quiet)
+            print(json.dumps({"list": source, "index": index.paths[0], "lines": index.count}))
+            index.close()
+    except (OSError, ValueError) as e:
+        _status(f"Hata: {e}")
+        return 2
+    return 0
+
+def _cli_reporter(args, render, total=None, key=0):
+    # a ProgressReporter drawing the status line, or nothing with -q
+    if args.quiet:
+        return contextlib.nullcontext()
+    return ProgressReporter(render, total, key)
+
+def _status(msg, end="\n"):
+    # CLI status goes to stderr so stdout stays clean for scripts
+    print(msg, end=end, file=sys.stderr, flush=True)
+
+def _cli_batch(args):
+    try:
+        profiles = load_batch_profiles(args.profiles, args.out_dir)
+        if args.estimate:
+            for p in profiles:
+                tokens, _ = build_pool(p["words"], p["numbers"], p["specials"])
+                sequences, counts, line_bytes, exact = estimate_wordlist(tokens, p["min_len"], p["max_len"],
+                                                                         p["case"], None, p["constraints"])
+                print(json.dumps({"name": p["name"], "output": p["output"], "pool": len(tokens),
+                                  "sequences": sequences, "unique": sum(counts), "bytes": sum(line_bytes),
+                                  "exact": exact and not args.exclude}))
+            return 0
+        exclude = _cli_exclude(args.exclude, args.rebuild_index, args.quiet)
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+    except (OSError, ValueError) as e:
+        _status(f"Hata: {e}")
+        return 2
+
+    def progress(values, rate, eta):
+        done, total, written, nbytes = values
+        _status(f"\rHedef: {done}/{total} | Yazilan: {written:,} | Boyut: {format_mb(nbytes)} | "
+                f"{progress_rate_text(rate, eta)}", end="")
+
+    start = time.time()
+    try:
+        with _cli_reporter(args, progress, key=2) as reporter:
+            results = run_batch(profiles, args.workers, on_progress=reporter, exclude=exclude)
+    except KeyboardInterrupt:
+        _status("")
+        _status("Durduruldu. Biten hedeflerin dosyalari duruyor.")
+        return 130
+    lines = sum(r["lines"] for r in results)
+    stats_result(lines, sum(r["bytes"] for r in results), lines)
+    if not args.quiet:
+        _status("")
+    if args.json:
+        for r in results:
+            print(json.dumps(r))
+    else:
+        print("\n".join(batch_summary(results, time.time() - start)))
+    return 0
+
+def _cli_wordlist(args):
+    words = parse_tokens(" ".join(args.words))
+    numbers = parse_tokens(" ".join(args.numbers))
+    specials = parse_tokens(" ".join(args.specials))
+    tokens, _ = build_pool(words, numbers, specials)
+    if not tokens:
+        _status("Hata: en az bir token girilmelidir.")
+        return 2
+    if args.case:
+        try:
+            case_policy_variants("a", args.case)
+        except ValueError as e:
+            _status(f"Hata: {e}")
+            return 2
+
+    rules = list(args.rule)
+    try:
+        for path in args.rules:
+            rules.extend(load_rules(path))
+        for rule in args.rule:
+            compile_rule(rule)
+        constraints = _cli_constraints(args)
+        split = _cli_split(args)
+        exclude = None if args.estimate else _cli_exclude(args.exclude, args.rebuild_index, args.quiet)
+    except (OSError, ValueError) as e:
+        _status(f"Hata: {e}")
+        return 2
+
+    if (args.best_first or args.top is not None) and not args.estimate:
+        if args.top is not None and args.top <= 0:
+            _status("Hata: --top pozitif olmalidir.")
+            return 2
+        try:
+            best = BestFirst(words, numbers, specials, args.min_len, args.max_len, args.template, args.case,
+                             rules, parse_weights(args.weight), parse_repeat(args.repeat))
+        except ValueError as e:
+            _status(f"Hata: {e}")
+            return 2
+        return _cli_best_first(args, best, constraints, exclude, split)
+
+    if args.template:
+        try:
+            spaces = template_spaces(args.template, words, numbers, specials, args.min_len, args.max_len,
+                                     parse_repeat(args.repeat), args.case)
+        except ValueError as e:
+            _status(f"Hata: {e}")
+            return 2
+        return _cli_templates(args, spaces, rules, constraints, exclude, split)
+
+    if args.estimate:
+        total_sequences, counts, line_bytes, exact = estimate_wordlist(tokens, args.min_len, args.max_len, args.case,
+                                                                       rules, constraints)
+        # what the exclusion lists take out is only known while writing
+        print(json.dumps({"pool": len(tokens), "sequences": total_sequences, "unique": sum(counts),
+                          "bytes": sum(line_bytes), "exact": exact and not args.exclude,
+                          "policy": constraints.describe() if constraints else None,
+                          **_split_estimate(split, counts, line_bytes, exact)}))
+        return 0
+
+    def progress(values, rate, eta):
+        written, _, bytes_written = values
+        _status(f"\rYazilan: {written:,} | Dosya: {output_size_text(args.output, bytes_written)} | "
+                f"{progress_rate_text(rate, eta)}", end="")
+
+    if args.skip is not None or args.take is not None:
+        if constraints is not None:
+            _status("Hata: --skip/--take parola politikasi ile kullanilamaz.")
+            return 2
+        # ranks address the plain sequence stream, so variants go into the pool here
+        space = SequenceSpace(build_pool(words, numbers, specials, args.case)[0], args.min_len, args.max_len)
+        start = args.skip or 0
+        written = 0
+        with open_sink(args.output, exclude=exclude, split=split) as sink:
+            if start < space.total:
+                for s in space.iter_range(start, args.take):
+                    sink.write(s)
+                    written += 1
+        stats_result(written - sink.excluded, sink.tell(), written)
+        written -= sink.excluded
+        if not args.quiet:
+            _status(f"Yazilan: {written:,} | Dosya: {output_size_text(args.output, sink.tell())} | Aralik: {start:,}+ / {space.total:,}")
+        return 0
+
+    try:
+        with _cli_reporter(args, progress) as reporter:
+            written, nbytes = run_wordlist(tokens, args.min_len, args.max_len, args.output,
+                                           workers=max(1, args.workers), dedup=_cli_dedup(args), resume=args.resume,
+                                           on_progress=stats_wrap_wordlist(reporter), case=args.case,
+                                           rules=rules or None, constraints=constraints, exclude=exclude, split=split)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        _status("")
+        if not is_resumable_target(args.output) or split:
+            _status("Durduruldu.")
+        else:
+            _status("Durduruldu. --resume ile kaldigi yerden devam edebilirsiniz.")
+        return 130
+    if not args.quiet:
+        _status(f"\rYazilan: {written:,} | Dosya: {output_size_text(args.output, nbytes)} -> {_cli_target(args, split)}")
+    return 0
+
+def _cli_templates(args, spaces, rules, constraints=None, exclude=None, split=None):
+    if args.estimate:
+        per_template, counts, line_bytes, exact = estimate_templates(spaces, rules)
+        print(json.dumps({"templates": [{"template": t, "count": n} for t, n in per_template],
+                          "sequences": sum(n for _, n in per_template), "unique": sum(counts),
+                          "bytes": sum(line_bytes), "exact": exact,
+                          **_split_estimate(split, counts, line_bytes, exact)}))
+        return 0
+    if args.skip is not None or args.take is not None:
+        _status("Hata: --skip/--take sablon moduyla kullanilamaz.")
+        return 2
+
+    def progress(values, rate, eta):
+        written, _, bytes_written = values
+        _status(f"\rYazilan: {written:,} | Dosya: {output_size_text(args.output, bytes_written)} | "
+                f"{progress_rate_text(rate, eta)}", end="")
+    try:
+        with _cli_reporter(args, progress) as reporter:
+            written, nbytes = run_templates(spaces, args.output, resume=args.resume,
+                                            on_progress=stats_wrap_wordlist(reporter), rules=rules or None,
+                                            constraints=constraints, exclude=exclude, split=split)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        _status("")
+        if not is_resumable_target(args.output) or split:
+            _status("Durduruldu.")
+        else:
+            _status("Durduruldu. --resume ile kaldigi yerden devam edebilirsiniz.")
+        return 130
+    if not args.quiet:
+        _status(f"\rYazilan: {written:,} | Dosya: {output_size_text(args.output, nbytes)} -> {_cli_target(args, split)}")
+    return 0
+
+def _cli_best_first(args, best, constraints=None, exclude=None, split=None):
+    def progress(values, rate, eta):
+        written, _, bytes_written = values
+        _status(f"\rYazilan: {written:,} | Dosya: {output_size_text(args.output, bytes_written)} | "
+                f"{progress_rate_text(rate, eta)}", end="")
+    top = best.limit(args.top)
+    if top != args.top and not args.quiet:
+        _status(f"Not: --top verilmedi, tekrar tablosu icin en fazla {top:,} satir (BEST_FIRST_TOP)")
+    try:
+        with _cli_reporter(args, progress, top) as reporter:
+            written, nbytes = run_best_first(best, args.output, top, on_progress=stats_wrap_wordlist(reporter),
+                                             constraints=constraints, exclude=exclude, split=split)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        _status("")
+        _status("Durduruldu.")
+        return 130
+    if not args.quiet:
+        _status(f"\rYazilan: {written:,} | Dosya: {output_size_text(args.output, nbytes)} -> {_cli_target(args, split)}")
+    return 0
+
+def _cli_split(args):
+    # --split-length/--split-lines/--split-size -> OutputSplit or None
+    if not args.split_length and args.split_lines is None and args.split_size is None:
+        if args.max_open is not None:
+            raise ValueError("--max-open yalnizca --split-* ile kullanilir")
+        return None
+    if is_stream_target(args.output):
+        raise ValueError("--split-* stdout/pipe ciktisiyla kullanilamaz")
+    if args.resume:
+        raise ValueError("--resume bolunmus ciktiyla kullanilamaz")
+    max_bytes = int(args.split_size * 1024**2) if args.split_size is not None else None
+    return OutputSplit(args.split_length, args.split_lines, max_bytes, args.max_open)
+
+def _split_estimate(split, counts, line_bytes, exact):
+    # --estimate fields for a split output: the planned files
+    if split is None:
+        return {}
+    planned = split.with_plan(counts, line_bytes, exact).planned_files()
+    return {"files": sum(planned.values()),
+            "files_per_length": {str(k): n for k, n in sorted(planned.items())} if split.by_length else None}
+
+def _cli_target(args, split):
+    # where the output went: the file, or the manifest of a split output
+    return split_manifest_path(output_path_for(args.output)) if split else args.output
+
+def _cli_wifi(args):
+    if args.keyspace:
+        space = WifiSpace(args.specials)
+        print(json.dumps({"keyspace": space.total, "by_length": space.counts}))
+        return 0
+    if args.count <= 0:
+        _status("Hata: sayi pozitif olmalidir.")
+        return 2
+    seed = args.seed if args.seed is not None else new_wifi_seed()
+    if not args.quiet:
+        _status(f"Seed: {seed}")
+
+    def progress(values, rate, eta):
+        written, bytes_written, dedup_bytes = values
+        _status(f"\rYazilan: {written:,} / {args.count:,} | Dosya: {output_size_text(args.output, bytes_written)}"
+                f" | Bellek: {format_mb(dedup_bytes)} | {progress_rate_text(rate, eta)}", end="")
+    try:
+        with _cli_reporter(args, progress, args.count) as reporter:
+            written, nbytes = write_wifi_passwords(args.output, args.count, args.specials,
+                                                   on_progress=stats_wrap_wifi(reporter), dedup=_cli_dedup(args),
+                                                   fp_rate=args.fp_rate, seed=seed, workers=max(1, args.workers),
+                                                   exact=args.exact or None)
+        stats_result(written, nbytes)
+    except KeyboardInterrupt:
+        _status("")
+        _status("Durduruldu.")
+        return 130
+    if not args.quiet:
+        _status("")
+    if written < args.count:
+        _status(f"Uyari: hedefe ulasilamadi. Uretilen: {written:,}")
+        return 1
+    return 0
+
+def _silence_stdout():
+    # the reader is gone (e.g. `| head`); point fd 1 at devnull so the
+    # interpreter's own flush at exit doesn't trip over the pipe again
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+    except (OSError, ValueError):
+        pass
+
+def cli_main(argv):
+    args = build_arg_parser().parse_args(argv)
+    if args.command == "index":
+        return _cli_index(args)
+    note = output_fallback_note(args.output) if args.command != "batch" else None
+    if note:
+        _status(f"Not: {note}")
+        args.output = output_path_for(args.output)
+    try:
+        with _cli_stats(args):
+            if args.command == "wordlist":
+                return _cli_wordlist(args)
+            if args.command == "batch":
+                return _cli_batch(args)
+            return _cli_wifi(args)
+    except BrokenPipeError:
+        # consumer closed the stream early: that's a normal way to stop
+        _silence_stdout()
+        return 0
+    except OSError as e:
+        if e.errno != errno.ENOSPC:
+            raise
+        _status("")
+        _status(f"Hata: {e.strerror}")
+        return 1
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return cli_main(argv)
     try:
         main_menu()
     except KeyboardInterrupt:
         print(C.SHOW_CURSOR)
-        print()
\ No newline at end of file
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file